@@ -1,10 +1,88 @@
-from .monobank import MonoPublic, MonoPersonal
+"""
+Asynchronous Monobank API client.
+
+Public names are imported on first access (PEP 562), so `import aiomonobank` stays cheap and only
+the parts in use pay for their dependencies (e.g. numpy for CurrencyConverter, sqlite3 for the stores).
+"""
+import importlib
+import importlib.util
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .analytics import StatementAggregator
+    from .cluster import WebhookCluster
+    from .converter import CurrencyConverter
+    from .dedup import WebhookDeduplicator
+    from .export import StatementExport, export_statement
+    from .monobank import MonoPublic, MonoPersonal
+    from .offload import DecodeExecutor
+    from .policy import RequestPolicy, Timeouts
+    from .pool import MonoPersonalPool
+    from .reconciler import WebhookReconciler
+    from .scheduler import RateScheduler
+    from .store import StatementStore
+    from .sync import SyncMonobank
+    from .webhook import WebhookReceiver
+
+_MODULES = {
+    'CurrencyConverter': '.converter',
+    'DecodeExecutor': '.offload',
+    'MonoPublic': '.monobank',
+    'MonoPersonal': '.monobank',
+    'MonoPersonalPool': '.pool',
+    'RateScheduler': '.scheduler',
+    'RequestPolicy': '.policy',
+    'StatementAggregator': '.analytics',
+    'StatementExport': '.export',
+    'StatementStore': '.store',
+    'SyncMonobank': '.sync',
+    'Timeouts': '.policy',
+    'WebhookCluster': '.cluster',
+    'WebhookDeduplicator': '.dedup',
+    'WebhookReceiver': '.webhook',
+    'WebhookReconciler': '.reconciler',
+    'export_statement': '.export',
+}
 
 __all__ = (
     '__version__',
+    'CurrencyConverter',
+    'DecodeExecutor',
     'MonoPublic',
     'MonoPersonal',
+    'MonoPersonalPool',
+    'RateScheduler',
+    'RequestPolicy',
+    'StatementAggregator',
+    'StatementExport',
+    'StatementStore',
+    'SyncMonobank',
+    'Timeouts',
+    'WebhookCluster',
+    'WebhookDeduplicator',
+    'WebhookReceiver',
+    'WebhookReconciler',
+    'export_statement',
 )
 
 
 __version__ = "1.0.2"
+
+
+def __getattr__(name: str):
+    module = _MODULES.get(name)
+    if module is not None:
+        value = getattr(importlib.import_module(module, __name__), name)
+    elif not name.startswith('_') and importlib.util.find_spec(f'.{name}', __name__) is not None:
+        # Submodules (types, utils, api, ...) used to be bound by the eager imports
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,294 @@
+"""
+Grouped sums, counts, minimums and maximums of statements by calendar bucket and category.
+
+    aggregator = StatementAggregator(by=('month', 'mcc'), direction='debit')
+    aggregator.add(await client.get_statement())
+    for row in aggregator.rows():
+        print(row['month'], row['mcc'], row['sum'] / 100)
+
+Statements may be pydantic Statement models, raw API items (RawDecoder) or msgspec structs (MsgspecDecoder).
+A transaction added while on hold is replaced when its settled version arrives.
+Sums are kept in minimal currency units (kopiykas, cents), so they are exact. Calendar buckets are computed
+in local time of the timezone in one pass: the zone object is created once and its UTC offset is cached
+per hour (hours with a transition are resolved per transaction), so rows don't convert datetimes.
+"""
+import functools
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Hashable, Iterable, Optional, Sequence
+from zoneinfo import ZoneInfo
+
+CALENDAR_BUCKETS = ('hour', 'day', 'week', 'month', 'year')
+"""Calendar buckets in local time; a week starts on Monday"""
+GROUP_FIELDS = ('mcc', 'original_mcc', 'counter_iban', 'currency_code')
+"""Statement fields statements can be grouped by"""
+VALUE_FIELDS = ('amount', 'operation_amount', 'cashback_amount', 'commission_rate', 'balance')
+"""Statement sums that can be aggregated"""
+
+_API_KEYS = {
+    'mcc': 'mcc',
+    'original_mcc': 'originalMcc',
+    'counter_iban': 'counterIban',
+    'currency_code': 'currencyCode',
+    'amount': 'amount',
+    'operation_amount': 'operationAmount',
+    'cashback_amount': 'cashbackAmount',
+    'commission_rate': 'commissionRate',
+    'balance': 'balance',
+    'hold': 'hold',
+}
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+_HOUR = 3600
+_MIXED = -1 << 31
+_DAY = 86400
+
+
+@functools.lru_cache(maxsize=None)
+def get_zone(name: str) -> ZoneInfo:
+    """
+    The get_zone function returns the zone object of the timezone, created once per process.
+
+    :param name: str: IANA timezone name, e.g. Europe/Kyiv
+    :return: A timezone object
+    """
+    return ZoneInfo(name)
+
+
+class LocalCalendar:
+    """
+    Maps unix timestamps to calendar buckets of a timezone, caching UTC offsets per hour
+    and buckets per local day.
+    """
+
+    def __init__(self, timezone: str = 'Europe/Kyiv') -> None:
+        """
+        :param timezone: str: IANA timezone name
+        """
+        self.zone = get_zone(timezone)
+        self._offsets: dict[int, int] = {}
+        self._days: dict[tuple[str, int], date] = {}
+
+    def local(self, timestamp: int) -> int:
+        """
+        The local function shifts a unix timestamp by the UTC offset of the timezone at that moment.
+
+        :param timestamp: int: Unix timestamp
+        :return: Seconds since 1970-01-01 00:00 local time
+        """
+        hour = timestamp // _HOUR
+        offset = self._offsets.get(hour)
+        if offset is None:
+            offset = self._offset(hour * _HOUR)
+            if offset != self._offset(hour * _HOUR + _HOUR - 1):
+                offset = _MIXED
+            self._offsets[hour] = offset
+
+        if offset == _MIXED:
+            # The offset changes within this hour
+            offset = self._offset(timestamp)
+
+        return timestamp + offset
+
+    def _offset(self, timestamp: int) -> int:
+        return int(datetime.fromtimestamp(timestamp, self.zone).utcoffset().total_seconds())
+
+    def bucket(self, bucket: str, timestamp: int) -> date | datetime:
+        """
+        The bucket function returns the calendar bucket the timestamp falls in.
+
+        :param bucket: str: One of CALENDAR_BUCKETS
+        :param timestamp: int: Unix timestamp
+        :return: The local start of the bucket: a datetime for hours, a date otherwise
+        """
+        local = self.local(timestamp)
+        day = local // _DAY
+
+        if bucket == 'hour':
+            return datetime.fromordinal(_EPOCH_ORDINAL + day) + timedelta(hours=local % _DAY // _HOUR)
+
+        key = (bucket, day)
+        start = self._days.get(key)
+        if start is None:
+            start = date.fromordinal(_EPOCH_ORDINAL + day)
+            if bucket == 'week':
+                start -= timedelta(days=start.weekday())
+            elif bucket == 'month':
+                start = start.replace(day=1)
+            elif bucket == 'year':
+                start = start.replace(month=1, day=1)
+            elif bucket != 'day':
+                raise ValueError(f"Unknown calendar bucket {bucket!r}, expected one of {CALENDAR_BUCKETS}")
+            self._days[key] = start
+
+        return start
+
+
+@dataclass(slots=True)
+class Aggregate:
+    """Aggregated values in minimal currency units"""
+    count: int = 0
+    sum: int = 0
+    min: Optional[int] = None
+    max: Optional[int] = None
+
+    def add(self, value: int) -> None:
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def remove(self, value: int) -> None:
+        # min and max can't be restored without all the values, they keep the removed one
+        self.count -= 1
+        self.sum -= value
+
+
+def _fields(statement: Any, names: Sequence[str]) -> tuple[str, int, list]:
+    """Returns id, unix time and the named fields in API units (sums in minimal units)"""
+    if isinstance(statement, dict):
+        return statement['id'], statement['time'], [statement.get(_API_KEYS[name]) for name in names]
+
+    time = statement.time
+    if isinstance(time, datetime):
+        # pydantic Statement keeps sums divided by 100
+        return statement.id, int(time.timestamp()), [
+            round(getattr(statement, name) * 100) if name in VALUE_FIELDS else getattr(statement, name)
+            for name in names
+        ]
+
+    return statement.id, time, [getattr(statement, name) for name in names]
+
+
+class StatementAggregator:
+    """
+    Incremental aggregation of statements. `add` can be called with every new page or webhook event;
+    transactions already added (by id) are skipped, so overlapping statement periods are safe. A transaction
+    added on hold is replaced by its settled version (its min/max contribution stays). The last `max_seen` ids
+    are remembered, older repeats are counted again.
+    """
+
+    def __init__(self,
+                 by: Sequence[str] = ('month', 'mcc'),
+                 timezone: str = 'Europe/Kyiv',
+                 value: str = 'amount',
+                 direction: Optional[str] = None,
+                 max_seen: int = 100_000) -> None:
+        """
+        :param by: Sequence[str]: Grouping keys, any of CALENDAR_BUCKETS and GROUP_FIELDS
+        :param timezone: str: Timezone of the calendar buckets
+        :param value: str: Sum to aggregate, one of VALUE_FIELDS
+        :param direction: str: 'debit' to aggregate only spending (negative amounts), 'credit' only income
+        :param max_seen: int: Number of the latest transaction ids remembered to skip repeats
+        """
+        for key in by:
+            if key not in CALENDAR_BUCKETS and key not in GROUP_FIELDS:
+                raise ValueError(f"Unknown grouping key {key!r}, expected one of {CALENDAR_BUCKETS + GROUP_FIELDS}")
+        if value not in VALUE_FIELDS:
+            raise ValueError(f"Unknown value {value!r}, expected one of {VALUE_FIELDS}")
+        if direction not in (None, 'debit', 'credit'):
+            raise ValueError(f"Unknown direction {direction!r}, expected 'debit' or 'credit'")
+
+        self.by = tuple(by)
+        self.value = value
+        self.direction = direction
+        self.calendar = LocalCalendar(timezone)
+
+        self.max_seen = max_seen
+
+        self.groups: dict[tuple[Hashable, ...], Aggregate] = {}
+        # Transaction id -> (group key or None if filtered out, value, hold), least recently seen first
+        self._seen: OrderedDict[str, tuple[Optional[tuple], int, bool]] = OrderedDict()
+
+    def add(self, statements: Iterable[Any]) -> int:
+        """
+        The add function aggregates new statements.
+
+        :param statements: Iterable: Statement models, raw statement items or msgspec structs
+        :return: The number of statements added or settled (not skipped as already seen or by direction)
+        """
+        added = 0
+        # Fields read from every statement: the grouping fields, then the value, the amount for direction and hold
+        names = [name for name in self.by if name in GROUP_FIELDS] + [self.value, 'amount', 'hold']
+        buckets = [(index, name) for index, name in enumerate(self.by) if name in CALENDAR_BUCKETS]
+        debit = self.direction == 'debit'
+        bucket = self.calendar.bucket
+
+        for statement in statements:
+            statement_id, time, values = _fields(statement, names)
+            *key, value, amount, hold = values
+            hold = bool(hold)
+
+            seen = self._seen.get(statement_id)
+            if seen is not None:
+                self._seen.move_to_end(statement_id)
+                seen_key, seen_value, seen_hold = seen
+                if not seen_hold or hold:
+                    continue
+
+                # The settled version replaces the one on hold
+                if seen_key is not None:
+                    group = self.groups[seen_key]
+                    group.remove(seen_value)
+                    if not group.count:
+                        del self.groups[seen_key]
+
+            if self.direction is not None and (amount < 0) != debit:
+                self._remember(statement_id, None, value, hold)
+                continue
+
+            for index, name in buckets:
+                key.insert(index, bucket(name, time))
+            key = tuple(key)
+
+            group = self.groups.get(key)
+            if group is None:
+                group = self.groups[key] = Aggregate()
+            group.add(value)
+            self._remember(statement_id, key, value, hold)
+            added += 1
+
+        return added
+
+    def _remember(self, statement_id: str, key: Optional[tuple], value: int, hold: bool) -> None:
+        self._seen[statement_id] = (key, value, hold)
+        if len(self._seen) > self.max_seen:
+            self._seen.popitem(last=False)
+
+    def rows(self) -> list[dict]:
+        """
+        The rows function returns the groups sorted by key, one dict per group:
+        {<grouping key>: ..., 'count': ..., 'sum': ..., 'min': ..., 'max': ...}.
+
+        :return: A list of dicts
+        """
+        def order(item) -> tuple:
+            return tuple((part is None, part if part is not None else 0) for part in item[0])
+
+        return [
+            {**dict(zip(self.by, key)), 'count': group.count, 'sum': group.sum, 'min': group.min, 'max': group.max}
+            for key, group in sorted(self.groups.items(), key=order)
+        ]
+
+
+def aggregate(statements: Iterable[Any],
+              by: Sequence[str] = ('month', 'mcc'),
+              timezone: str = 'Europe/Kyiv',
+              value: str = 'amount',
+              direction: Optional[str] = None) -> list[dict]:
+    """
+    The aggregate function groups statements at once, see StatementAggregator.
+
+    :param statements: Iterable: Statement models, raw statement items or msgspec structs
+    :param by: Sequence[str]: Grouping keys, any of CALENDAR_BUCKETS and GROUP_FIELDS
+    :param timezone: str: Timezone of the calendar buckets
+    :param value: str: Sum to aggregate, one of VALUE_FIELDS
+    :param direction: str: 'debit' to aggregate only spending (negative amounts), 'credit' only income
+    :return: A list of dicts, see StatementAggregator.rows
+    """
+    aggregator = StatementAggregator(by, timezone, value, direction)
+    aggregator.add(statements)
+
+    return aggregator.rows()
@@ -1,16 +1,25 @@
+import asyncio
 import logging
+import time
 from dataclasses import dataclass
 from http import HTTPStatus, HTTPMethod  # noqa
 import json
+from typing import Any, AsyncIterator, Callable, Optional
 from urllib.parse import urljoin
 
 import aiohttp
+from aiohttp import hdrs
 
+from .decoders import JSONArrayParser
+from .metrics import RequestRecord
 from .utils import exceptions
 
 # Main aiomonobank logger
 log = logging.getLogger('aiomonobank')
 
+STREAM_CHUNK_SIZE = 16 * 1024
+"""Maximum bytes parsed at once by stream_request, bounds the memory of a streamed response"""
+
 
 @dataclass(frozen=True)
 class MonobankAPIServer:
@@ -67,7 +76,12 @@ def check_token(token: str) -> bool:
     return True
 
 
-def check_result(api_path: str, content_type: str, status_code: int, body: str) -> dict:
+def check_result(api_path: str,
+                 content_type: str,
+                 status_code: int,
+                 body: bytes | str,
+                 decode: Optional[Callable[[bytes | str], Any]] = None,
+                 retry_after: Optional[int] = None) -> Any:
     """
     The check_result function is used to check the response from Monobank API.
     It checks if the content type of the response is application/json, and if it's not - raises a NetworkError exception.
@@ -77,7 +91,9 @@ def check_result(api_path: str, content_type: str, status_code: int, body: str)
     :param api_path: str: Specify the path to the api method
     :param content_type: str: Check the content type of the response
     :param status_code: int: Check the status code of the response
-    :param body: str: Pass the body of the response from monobank api
+    :param body: bytes | str: Pass the body of the response from monobank api
+    :param decode: Callable: Decode the body of a successful response (json.loads by default)
+    :param retry_after: int: Value of the Retry-After header, if any
     :return: The dictionary with the following keys if the status code is 200
     """
     log.debug('Response for %s: [%d] "%r"', api_path, status_code, body)
@@ -85,13 +101,23 @@ def check_result(api_path: str, content_type: str, status_code: int, body: str)
     if content_type != 'application/json':
         raise exceptions.NetworkError(f"Invalid response with content type {content_type}: \"{body}\"")
 
+    if status_code == HTTPStatus.OK:
+        try:
+            return (decode or json.loads)(body)
+        except (ValueError, TypeError) as e:
+            # Invalid JSON or a document the models don't accept (msgspec and pydantic errors are ValueErrors)
+            raise exceptions.NetworkError(f"Invalid response for {api_path}: {e.__class__.__name__}: {e}") from e
+
+    if isinstance(body, bytes):
+        body = body.decode(errors='replace')
+
     try:
         result_json = json.loads(body)
     except ValueError:
         result_json = {}
 
-    if status_code == HTTPStatus.OK:
-        return result_json
+    if not isinstance(result_json, dict):
+        result_json = {}
 
     error_description = result_json.get('errorDescription') or body
 
@@ -100,9 +126,11 @@ def check_result(api_path: str, content_type: str, status_code: int, body: str)
     if status_code in (HTTPStatus.FORBIDDEN, HTTPStatus.UNAUTHORIZED):
         raise exceptions.Unauthorized.detect(error_description)
     elif status_code == HTTPStatus.TOO_MANY_REQUESTS:
-        raise exceptions.RetryAfter
+        raise exceptions.RetryAfter(retry_after) if retry_after else exceptions.RetryAfter
     elif error_description == "webHookUrl timeout":  # most likely the status code of this error is 408, but this is not accurate
         raise exceptions.WebhookUrlError(error_description)
+    elif status_code >= HTTPStatus.INTERNAL_SERVER_ERROR:
+        raise exceptions.ServerError(f"{error_description} [{status_code}]")
 
     raise exceptions.MonobankError(f"{error_description} [{status_code}]")
 
@@ -112,8 +140,10 @@ async def make_request(
         server: MonobankAPIServer,
         http_method: HTTPMethod,
         api_path: str,
+        decode: Optional[Callable[[bytes], Any]] = None,
+        record: Optional[RequestRecord] = None,
         **kwargs
-) -> dict:
+) -> Any:
     """
     The make_request function is a helper function that makes an HTTP request to the server.
     It takes in the following parameters:
@@ -127,6 +157,8 @@ async def make_request(
     :param server: MonobankAPIServer: Get the url of the api endpoint
     :param http_method: HTTPStatus: Specify the http method to use
     :param api_path: str: Log the request and response
+    :param decode: Callable: Decode the body of a successful response (json.loads by default)
+    :param record: RequestRecord: Record the phase durations, status and size of the response into
     :param **kwargs: Pass a variable number of keyword arguments to the function
     :return: A dictionary
     """
@@ -134,8 +166,133 @@ async def make_request(
 
     url = server.api_url(api_path=api_path)
 
+    if record is None:
+        try:
+            async with session.request(http_method, url, **kwargs) as response:
+                body = await response.read()
+        except aiohttp.ClientError as e:
+            raise exceptions.NetworkError(f"aiohttp client throws an error: {e.__class__.__name__}: {e}")
+        except asyncio.TimeoutError:
+            raise exceptions.NetworkError(f"Request to {api_path} timed out")
+
+        return check_result(api_path, response.content_type, response.status, body, decode,
+                            retry_after=_parse_retry_after(response.headers.get(hdrs.RETRY_AFTER)))
+
+    started = time.perf_counter()
+    try:
+        async with session.request(http_method, url, trace_request_ctx=record, **kwargs) as response:
+            headers_received = time.perf_counter()
+            record.status = response.status
+            # The connection time recorded by the trace config is not a part of the time to first byte
+            record.add('ttfb', headers_received - started - record.phases.get('connect', 0)
+                       - record.phases.get('dns', 0))
+
+            body = await response.read()
+            record.add('body', time.perf_counter() - headers_received)
+            record.bytes = len(body)
+    except aiohttp.ClientError as e:
+        raise exceptions.NetworkError(f"aiohttp client throws an error: {e.__class__.__name__}: {e}")
+    except asyncio.TimeoutError:
+        raise exceptions.NetworkError(f"Request to {api_path} timed out")
+
+    decode_started = time.perf_counter()
+    try:
+        return check_result(api_path, response.content_type, response.status, body, decode,
+                            retry_after=_parse_retry_after(response.headers.get(hdrs.RETRY_AFTER)))
+    finally:
+        if response.status == HTTPStatus.OK:
+            # Everything that is not JSON parsing is building the objects
+            record.add('model', time.perf_counter() - decode_started - record.phases.get('json', 0))
+
+
+async def stream_request(
+        session: aiohttp.ClientSession,
+        server: MonobankAPIServer,
+        http_method: HTTPMethod,
+        api_path: str,
+        decode_item: Callable[[Any], Any],
+        record: Optional[RequestRecord] = None,
+        **kwargs
+) -> AsyncIterator[Any]:
+    """
+    The stream_request function makes a request whose answer is a JSON array and yields its elements
+    as soon as their bytes arrive, without reading the whole body first.
+    Error answers are read completely and raise the same exceptions as make_request,
+    and elements that decode_item rejects raise NetworkError.
+
+    :param session: aiohttp.ClientSession: Make the request
+    :param server: MonobankAPIServer: Get the url of the api endpoint
+    :param http_method: HTTPMethod: Specify the http method to use
+    :param api_path: str: Path of the api method
+    :param decode_item: Callable: Build the yielded object from a parsed array element
+    :param record: RequestRecord: Record the phase durations, status and size of the response into
+    :param **kwargs: Pass a variable number of keyword arguments to the request
+    :return: An async iterator over the decoded elements
+    """
+    log.debug('Make streaming request: "%s"', api_path)
+
+    url = server.api_url(api_path=api_path)
+    if record is not None:
+        kwargs['trace_request_ctx'] = record
+
+    started = time.perf_counter()
     try:
         async with session.request(http_method, url, **kwargs) as response:
-            return check_result(api_path, response.content_type, response.status, await response.text())
+            if record is not None:
+                record.status = response.status
+                record.add('ttfb', time.perf_counter() - started - record.phases.get('connect', 0)
+                           - record.phases.get('dns', 0))
+
+            if response.status != HTTPStatus.OK or response.content_type != 'application/json':
+                body = await response.read()
+                check_result(api_path, response.content_type, response.status, body,
+                             retry_after=_parse_retry_after(response.headers.get(hdrs.RETRY_AFTER)))
+
+            parser = JSONArrayParser()
+            chunks = response.content.iter_chunked(STREAM_CHUNK_SIZE)
+            while True:
+                waiting = time.perf_counter()
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    chunk = None
+
+                parsing = time.perf_counter()
+                try:
+                    items = parser.close() if chunk is None else parser.feed(chunk)
+                except ValueError as e:
+                    raise exceptions.NetworkError(f"Invalid JSON array in the response for {api_path}: {e}") from e
+
+                if record is not None:
+                    record.add('body', parsing - waiting)
+                    record.add('json', time.perf_counter() - parsing)
+                    record.bytes += len(chunk or b'')
+
+                for item in items:
+                    building = time.perf_counter()
+                    try:
+                        decoded = decode_item(item)
+                    except (ValueError, TypeError) as e:
+                        # Same as check_result does for buffered responses
+                        raise exceptions.NetworkError(
+                            f"Invalid response for {api_path}: {e.__class__.__name__}: {e}"
+                        ) from e
+
+                    if record is not None:
+                        record.add('model', time.perf_counter() - building)
+                    yield decoded
+
+                if chunk is None:
+                    return
     except aiohttp.ClientError as e:
         raise exceptions.NetworkError(f"aiohttp client throws an error: {e.__class__.__name__}: {e}")
+    except asyncio.TimeoutError:
+        raise exceptions.NetworkError(f"Request to {api_path} timed out")
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[int]:
+    # Only the delay-seconds form is expected from the API
+    try:
+        return max(int(value), 1) if value else None
+    except ValueError:
+        return None
@@ -1,14 +1,183 @@
+import asyncio
+import functools
 import json
 import ssl
-import certifi
-from typing import Optional
+import time
+import weakref
+
+from typing import Any, AsyncIterator, Awaitable, Callable, Generic, Hashable, Optional, TypeVar, TYPE_CHECKING
 from http import HTTPMethod  # noqa
 
 import aiohttp
 from aiohttp import hdrs
 
 from . import api
-from .api import MonobankAPIServer, MONOBANK_PRODUCTION
+from .api import MonobankAPIServer, MONOBANK_PRODUCTION, log
+from .decoders import BaseDecoder, PydanticDecoder
+from .metrics import RequestObserver, RequestRecord, current_record, endpoint_name, trace_config
+from .policy import RequestPolicy, DEFAULT_POLICY
+from .scheduler import RateScheduler
+from .utils import exceptions
+
+if TYPE_CHECKING:
+    from .offload import DecodeExecutor
+
+T = TypeVar('T')
+
+# Settings of the connector shared by clients created with share_connector=True
+SHARED_CONNECTOR_SETTINGS = dict(
+    limit=100,
+    ttl_dns_cache=300,
+    keepalive_timeout=60,
+    enable_cleanup_closed=True,
+)
+
+
+class _SharedRequest:
+    """A GET request in flight and the number of callers waiting for it"""
+    __slots__ = ('task', 'waiters')
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+# Identical GET requests in flight, see BaseMonobank.request
+_in_flight: dict[tuple, _SharedRequest] = {}
+
+
+def _decode_key(decode: Optional[Callable]) -> Hashable:
+    # Bound methods of equal decoders must share requests, so the decoder class is used instead of the instance
+    if hasattr(decode, '__self__') and hasattr(decode, '__func__'):
+        return type(decode.__self__), decode.__func__
+
+    return decode
+
+
+def _forget_in_flight(key: tuple, task: asyncio.Task) -> None:
+    shared = _in_flight.get(key)
+    if shared is not None and shared.task is task:
+        del _in_flight[key]
+
+    if not task.cancelled():
+        # All callers may have been cancelled, don't let the exception be reported as never retrieved
+        task.exception()
+
+
+@functools.lru_cache(maxsize=None)
+def get_ssl_context() -> ssl.SSLContext:
+    """
+    The get_ssl_context function returns the process-wide SSL context with the certifi CA bundle.
+    The bundle is parsed once, on the first call.
+
+    :return: An SSL context for connections to the Monobank API
+    """
+    import certifi
+
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+class LoopLocal(Generic[T]):
+    """
+    Objects bound to an event loop (sessions, connectors), one per loop, weakly keyed by the loop.
+
+    Objects are closed by their owners in their own loops (BaseMonobank.close, close_shared_connector).
+    Objects of loops that were closed meanwhile are dropped the next time the registry is used: their close
+    coroutine runs in the running loop, where it only releases the references to the dead connections.
+    """
+
+    def __init__(self, close: Callable[[T], Awaitable[None]]) -> None:
+        """
+        :param close: Callable: Coroutine function that closes an object
+        """
+        self._close = close
+        self._objects: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, T] = weakref.WeakKeyDictionary()
+        self._closing: set[asyncio.Task] = set()
+
+    def get(self, loop: asyncio.AbstractEventLoop) -> Optional[T]:
+        """
+        The get function returns the object of the loop.
+
+        :param loop: AbstractEventLoop: Event loop
+        :return: The object, None if there is none
+        """
+        return self._objects.get(loop)
+
+    def set(self, loop: asyncio.AbstractEventLoop, value: T) -> T:
+        """
+        The set function registers the object of the running loop.
+
+        :param loop: AbstractEventLoop: The running event loop
+        :param value: Object bound to the loop
+        :return: The object
+        """
+        self.prune()
+        self._objects[loop] = value
+
+        return value
+
+    def pop(self, loop: asyncio.AbstractEventLoop) -> Optional[T]:
+        """
+        The pop function forgets the object of the loop without closing it.
+
+        :param loop: AbstractEventLoop: Event loop
+        :return: The object, None if there was none
+        """
+        return self._objects.pop(loop, None)
+
+    def items(self) -> list[tuple[asyncio.AbstractEventLoop, T]]:
+        """
+        The items function returns the loops and their objects.
+
+        :return: A list of (loop, object) pairs
+        """
+        return list(self._objects.items())
+
+    def prune(self) -> None:
+        """
+        Drop the objects of closed loops, must be called in a running loop
+        """
+        for loop in [loop for loop in self._objects if loop.is_closed()]:
+            task = asyncio.get_running_loop().create_task(self._close(self._objects.pop(loop)))
+            # The task is referenced until it is done, or it could be collected before it runs
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+
+async def _close_connector(connector: aiohttp.BaseConnector) -> None:
+    await connector.close()
+
+
+_shared_connectors: LoopLocal[aiohttp.TCPConnector] = LoopLocal(_close_connector)
+
+
+def get_shared_connector() -> aiohttp.TCPConnector:
+    """
+    The get_shared_connector function returns the TCP connector of the running event loop shared by all clients
+    created with share_connector=True. It keeps DNS answers and keep-alive connections between the clients.
+    Every event loop has its own connector, see close_shared_connector.
+
+    :return: The shared TCP connector
+    """
+    loop = asyncio.get_running_loop()
+    connector = _shared_connectors.get(loop)
+
+    if connector is None or connector.closed:
+        connector = _shared_connectors.set(
+            loop, aiohttp.TCPConnector(ssl=get_ssl_context(), **SHARED_CONNECTOR_SETTINGS)
+        )
+
+    return connector
+
+
+async def close_shared_connector() -> None:
+    """
+    Close the shared connector of the running event loop and all its connections
+    """
+    connector = _shared_connectors.pop(asyncio.get_running_loop())
+
+    if connector is not None:
+        await connector.close()
 
 
 class BaseMonobank:
@@ -17,13 +186,28 @@ class BaseMonobank:
             token: str,
             validate_token: Optional[bool] = True,
             connections_limit: Optional[int] = None,
-            server: MonobankAPIServer = MONOBANK_PRODUCTION
+            server: MonobankAPIServer = MONOBANK_PRODUCTION,
+            scheduler: Optional[RateScheduler] = None,
+            share_connector: bool = False,
+            prewarm_connections: int = 0,
+            decoder: Optional[BaseDecoder] = None,
+            policy: RequestPolicy = DEFAULT_POLICY,
+            observer: Optional[RequestObserver] = None,
+            executor: Optional['DecodeExecutor'] = None
     ) -> None:
         """
         Create Monobank API token from https://api.monobank.ua/
 
         :param token: str: token from https://api.monobank.ua/
         :param server: MonobankAPIServer: Monobank API Server endpoint.
+        :param scheduler: RateScheduler: queue requests within the API rate limits instead of raising RetryAfter
+        :param share_connector: bool: use the connector shared by all clients of the process
+            (connections_limit is ignored then, see SHARED_CONNECTOR_SETTINGS)
+        :param prewarm_connections: int: number of connections to open in advance on `async with`
+        :param decoder: BaseDecoder: builds the returned objects from responses, pydantic models by default
+        :param policy: RequestPolicy: timeouts and retries of requests
+        :param observer: RequestObserver: receives phase durations, status and size of every request
+        :param executor: DecodeExecutor: decode responses in worker processes instead of the event loop
         :raise aiomonobank.utils.exceptions.ValidationError: when the token is invalid
         """
         # Authentication
@@ -32,19 +216,25 @@ class BaseMonobank:
 
         self._token = token
         self.server = server
+        self.scheduler = scheduler
+        self.decoder = decoder or PydanticDecoder()
+        self.policy = policy
+        self.observer = observer
+        self.executor = executor
 
-        # aiohttp main session
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-
-        self._session: Optional[aiohttp.ClientSession] = None
+        # aiohttp sessions, one per event loop the client is used in
+        self._sessions: LoopLocal[aiohttp.ClientSession] = LoopLocal(aiohttp.ClientSession.close)
         self._connector_class: aiohttp.TCPConnector = aiohttp.TCPConnector  # noqa
-        self._connector_init = dict(limit=connections_limit, ssl=ssl_context)
+        self._connector_init = dict(limit=connections_limit, ssl=get_ssl_context())
+        self._share_connector = share_connector
+        self.prewarm_connections = prewarm_connections
 
     async def get_new_session(self) -> aiohttp.ClientSession:
         """
         The get_new_session function is a coroutine that returns an aiohttp.ClientSession object with the following properties:
-            - The headers are set to accept JSON and include the token for authentication.
-            - The connector is set to use our custom connector class, which we will define in just a moment.
+            - The headers are set to accept JSON. The token is sent with every request (see request),
+              so one session can serve any number of tokens.
+            - The connector is set to use our custom connector class, or the shared one with share_connector=True.
             - json_serialize is set to use Python's built-in json module.
 
         :param self: Access the attributes and methods of the class
@@ -53,38 +243,71 @@ class BaseMonobank:
         return aiohttp.ClientSession(
             headers={
                 hdrs.ACCEPT: "application/json",
-                "X-Token": self._token
             },
-            connector=self._connector_class(**self._connector_init),
-            json_serialize=json.dumps
+            connector=get_shared_connector() if self._share_connector else self._connector_class(**self._connector_init),
+            connector_owner=not self._share_connector,
+            json_serialize=json.dumps,
+            trace_configs=[trace_config()] if self.observer is not None else None
         )
 
     async def get_session(self) -> aiohttp.ClientSession:
         """
-        The get_session function is a coroutine that returns an aiohttp.ClientSession object.
+        The get_session function is a coroutine that returns the aiohttp.ClientSession object of the running loop.
+        A client can be used from several event loops (threads, test runners): every loop gets its own session,
+        which keeps its connections until the client is closed.
 
         :param self: Refer to the current object
         :return: A client session object
         """
-        if self._session is None or self._session.closed:
-            self._session = await self.get_new_session()
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
 
-        if not self._session._loop.is_running():  # noqa
-            await self._session.close()
-            self._session = await self.get_new_session()
+        if session is None or session.closed:
+            session = self._sessions.set(loop, await self.get_new_session())
 
-        return self._session
+        return session
 
     async def close(self):
         """
         Close all client sessions
         """
-        if self._session:
-            await self._session.close()
+        current = asyncio.get_running_loop()
+
+        for loop, session in self._sessions.items():
+            self._sessions.pop(loop)
+            if loop is current or loop.is_closed():
+                # The connections of a closed loop are dead, closing only releases them
+                await session.close()
+            elif loop.is_running():
+                # Sessions can only be closed in their own loops
+                asyncio.run_coroutine_threadsafe(session.close(), loop)
+
+    async def warm_up(self, connections: int = 1) -> None:
+        """
+        The warm_up function opens keep-alive connections to the API server in advance,
+        so the first requests don't pay for DNS resolution and the TLS handshake.
+        Connections are opened with HEAD requests to the server root, errors are ignored.
+        Every request is limited by the connect timeout of the policy (10 seconds if it is disabled).
+
+        :param connections: int: Number of connections to open
+        """
+        session = await self.get_session()
+        timeout = aiohttp.ClientTimeout(total=self.policy.timeouts.connect or 10)
+
+        async def _open() -> None:
+            try:
+                async with session.head(self.server.base_url, timeout=timeout):
+                    pass
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                log.debug('Warm-up connection to %s failed: %r', self.server.base_url, e)
+
+        await asyncio.gather(*(_open() for _ in range(connections)))
 
     async def request(self,
                       http_method: HTTPMethod,
                       path: str,
+                      priority: int = 0,
+                      max_wait: Optional[float] = None,
                       **kwargs) -> dict:
         """
         The request function is a wrapper around the make_request function in
@@ -92,22 +315,258 @@ class BaseMonobank:
         that are required for making the request (such as data or params). The
         request function will then return the response from make_request.
 
+        Identical GET requests with one token (and the same priority and max_wait) that are made at the same time
+        are coalesced: only the first one goes to the API and all of them get its result (or its exception).
+        The shared request is cancelled when all its callers are.
+
+        With a scheduler the request first waits for a free slot of the endpoint,
+        and a 429 answer puts it back into the queue (up to scheduler.max_deferrals times)
+        instead of raising RetryAfter.
+
         :param self: Represent the instance of the class
         :param http_method: HTTPMethod: Specify the type of request that is being made
         :param path: str: Specify the path of the request
+        :param priority: int: Scheduler priority, higher leaves the queue first
+        :param max_wait: float: Scheduler deadline in seconds, None waits as long as needed
         :param **kwargs: Pass in any number of keyword arguments
         :return: A dictionary of data
+        :raise aiomonobank.utils.exceptions.RetryAfter: when the scheduler deadline can't be met
         """
-        return await api.make_request(
-            session=await self.get_session(),
-            server=self.server,
-            http_method=http_method,
-            api_path=path,
-            **kwargs
-        )
+        # Only requests that differ by nothing but the path can be shared
+        if http_method != HTTPMethod.GET or kwargs.keys() - {'decode'}:
+            return await self._scheduled_request(http_method, path, priority, max_wait, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        # Callers with other scheduler settings would get the queue position and deadline of the first one
+        key = (self._token, self.server.base_url, path, _decode_key(kwargs.get('decode')), priority, max_wait)
+
+        shared = _in_flight.get(key)
+        if shared is None or shared.task.get_loop() is not loop:
+            task = loop.create_task(self._scheduled_request(http_method, path, priority, max_wait, **kwargs))
+            task.add_done_callback(functools.partial(_forget_in_flight, key))
+            shared = _in_flight[key] = _SharedRequest(task)
+
+        shared.waiters += 1
+        try:
+            # The shared request keeps running for the others when one of the callers is cancelled
+            return await asyncio.shield(shared.task)
+        finally:
+            shared.waiters -= 1
+            if not shared.waiters and not shared.task.done():
+                # Nobody waits for the result, so the request must not spend the rate budget of the token
+                shared.task.cancel()
+                if _in_flight.get(key) is shared:
+                    del _in_flight[key]
+
+    async def _scheduled_request(self,
+                                 http_method: HTTPMethod,
+                                 path: str,
+                                 priority: int = 0,
+                                 max_wait: Optional[float] = None,
+                                 **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = None if max_wait is None else started + max_wait
+        attempt = 0
+        deferrals = 0
+
+        kwargs.setdefault('timeout', self.policy.timeouts_for(path).client_timeout())
+
+        decode = kwargs.get('decode')
+        if self.executor is not None and decode is not None and decode is not bytes:
+            # The body is decoded by the executor once the request succeeds
+            kwargs['decode'] = bytes
+        else:
+            decode = None
+
+        while True:
+            if self.scheduler is not None:
+                await self.scheduler.acquire(
+                    self._token, path,
+                    priority=priority,
+                    max_wait=None if deadline is None else max(deadline - loop.time(), 0)
+                )
+            try:
+                result = await self._make_request(http_method, path, **kwargs)
+                if decode is None:
+                    return result
+
+                try:
+                    return await self.executor.decode(decode, result)
+                except (ValueError, TypeError) as e:
+                    # Same as api.check_result does for bodies decoded in the event loop
+                    raise exceptions.NetworkError(f"Invalid response for {path}: {e.__class__.__name__}: {e}") from e
+            except (exceptions.RetryAfter, exceptions.NetworkError, exceptions.ServerError) as e:
+                if isinstance(e, exceptions.RetryAfter) and self.scheduler is not None \
+                        and deferrals < self.scheduler.max_deferrals:
+                    # The scheduler puts the request back into the queue
+                    deferrals += 1
+                    self.scheduler.defer(self._token, path, e.timeout)
+                    continue
+
+                delay = self._retry_delay(e, http_method, attempt, loop.time() - started)
+
+            attempt += 1
+            log.debug('Retry %d of %s in %.2f seconds', attempt, path, delay)
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, error: Exception, http_method: HTTPMethod, attempt: int, elapsed: float) -> float:
+        """
+        The _retry_delay function returns the delay before the next attempt of a failed request
+        or raises the error when the policy doesn't allow another attempt.
+
+        :param error: Exception: RetryAfter, NetworkError or ServerError of the attempt
+        :param http_method: HTTPMethod: Method of the request
+        :param attempt: int: Number of the failed attempt, starting from 0
+        :param elapsed: float: Seconds since the first attempt
+        :return: Seconds to wait
+        """
+        policy = self.policy
+
+        if isinstance(error, exceptions.RetryAfter):
+            if error.timeout > policy.retry_after_max:
+                raise error
+            delay = error.timeout
+        elif http_method != HTTPMethod.GET:
+            # Only idempotent requests are safe to repeat
+            raise error
+        else:
+            delay = policy.backoff_delay(attempt)
+
+        if attempt + 1 > policy.retries or elapsed + delay > policy.budget:
+            raise error
+
+        return delay
+
+    async def stream(self,
+                     http_method: HTTPMethod,
+                     path: str,
+                     decode_item: Callable[[Any], Any],
+                     priority: int = 0,
+                     max_wait: Optional[float] = None,
+                     **kwargs) -> AsyncIterator[Any]:
+        """
+        The stream function makes a request whose answer is a JSON array and yields its decoded elements
+        while the body is still being received (see api.stream_request).
+
+        The scheduler, timeouts and retries work as in request, but a failed response is retried only
+        if nothing was yielded from it yet. Streams are never coalesced.
+
+        :param http_method: HTTPMethod: Specify the type of request that is being made
+        :param path: str: Specify the path of the request
+        :param decode_item: Callable: Build the yielded object from a parsed array element
+        :param priority: int: Scheduler priority, higher leaves the queue first
+        :param max_wait: float: Scheduler deadline in seconds, None waits as long as needed
+        :param **kwargs: Pass in any number of keyword arguments
+        :return: An async iterator over the decoded elements
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        deadline = None if max_wait is None else started + max_wait
+        attempt = 0
+        deferrals = 0
+
+        kwargs.setdefault('timeout', self.policy.timeouts_for(path).client_timeout())
+        if self._token:
+            kwargs['headers'] = {"X-Token": self._token, **kwargs.get('headers', {})}
+
+        while True:
+            if self.scheduler is not None:
+                await self.scheduler.acquire(
+                    self._token, path,
+                    priority=priority,
+                    max_wait=None if deadline is None else max(deadline - loop.time(), 0)
+                )
+
+            yielded = False
+            record = None if self.observer is None else \
+                RequestRecord(endpoint=endpoint_name(path), method=str(http_method))
+            request_started = time.perf_counter()
+            try:
+                async for item in self._stream_request(http_method, path, decode_item, record, **kwargs):
+                    yielded = True
+                    yield item
+                return
+            except (exceptions.RetryAfter, exceptions.NetworkError, exceptions.ServerError) as e:
+                if record is not None:
+                    record.error = e
+                if yielded:
+                    raise
+
+                if isinstance(e, exceptions.RetryAfter) and self.scheduler is not None \
+                        and deferrals < self.scheduler.max_deferrals:
+                    deferrals += 1
+                    self.scheduler.defer(self._token, path, e.timeout)
+                    continue
+
+                delay = self._retry_delay(e, http_method, attempt, loop.time() - started)
+            except Exception as e:
+                if record is not None:
+                    record.error = e
+                raise
+            finally:
+                if record is not None:
+                    record.add('total', time.perf_counter() - request_started)
+                    self.observer.on_request(record)
+
+            attempt += 1
+            log.debug('Retry %d of %s in %.2f seconds', attempt, path, delay)
+            await asyncio.sleep(delay)
+
+    async def _stream_request(self,
+                              http_method: HTTPMethod,
+                              path: str,
+                              decode_item: Callable[[Any], Any],
+                              record: Optional[RequestRecord],
+                              **kwargs) -> AsyncIterator[Any]:
+        async for item in api.stream_request(
+                session=await self.get_session(),
+                server=self.server,
+                http_method=http_method,
+                api_path=path,
+                decode_item=decode_item,
+                record=record,
+                **kwargs
+        ):
+            yield item
+
+    async def _make_request(self, http_method: HTTPMethod, path: str, **kwargs) -> dict:
+        if self._token:
+            kwargs['headers'] = {"X-Token": self._token, **kwargs.get('headers', {})}
+
+        if self.observer is None:
+            return await api.make_request(
+                session=await self.get_session(),
+                server=self.server,
+                http_method=http_method,
+                api_path=path,
+                **kwargs
+            )
+
+        record = RequestRecord(endpoint=endpoint_name(path), method=str(http_method))
+        token = current_record.set(record)
+        started = time.perf_counter()
+        try:
+            return await api.make_request(
+                session=await self.get_session(),
+                server=self.server,
+                http_method=http_method,
+                api_path=path,
+                record=record,
+                **kwargs
+            )
+        except Exception as e:
+            record.error = e
+            raise
+        finally:
+            current_record.reset(token)
+            record.add('total', time.perf_counter() - started)
+            self.observer.on_request(record)
 
     async def __aenter__(self):
         await self.get_session()
+        if self.prewarm_connections:
+            await self.warm_up(self.prewarm_connections)
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
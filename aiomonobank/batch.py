@@ -0,0 +1,283 @@
+"""
+Columnar representation of statements for analytics (requires numpy: pip install aiomonobank[numpy]).
+
+Sums are kept in minimal currency units (kopiykas, cents) as int64 and times as unix timestamps,
+exactly as the API sends them, so vectorized sums are exact.
+"""
+import sys
+from typing import Any, Iterable, Iterator, Optional, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("StatementBatch requires numpy: pip install aiomonobank[numpy]") from None
+
+from .types import Statement
+
+_INT_COLUMNS = {
+    'time': ('time', np.int64),
+    'mcc': ('mcc', np.int32),
+    'original_mcc': ('originalMcc', np.int32),
+    'amount': ('amount', np.int64),
+    'operation_amount': ('operationAmount', np.int64),
+    'currency_code': ('currencyCode', np.int32),
+    'commission_rate': ('commissionRate', np.int64),
+    'cashback_amount': ('cashbackAmount', np.int64),
+    'balance': ('balance', np.int64),
+}
+_DICTIONARY_COLUMNS = {
+    'description': 'description',
+    'counter_name': 'counterName',
+    'counter_iban': 'counterIban',
+}
+_OBJECT_COLUMNS = {
+    'id': 'id',
+    'comment': 'comment',
+    'receipt_id': 'receiptId',
+    'invoice_id': 'invoiceId',
+    'counter_edrpou': 'counterEdrpou',
+}
+# Sums that pydantic Statement keeps divided by 100
+_SUM_COLUMNS = ('amount', 'operation_amount', 'commission_rate', 'cashback_amount', 'balance')
+
+
+class DictionaryColumn:
+    """
+    Dictionary-encoded string column: every distinct value is stored once in `categories`,
+    rows keep int32 `codes` (-1 for missing values).
+    """
+    __slots__ = ('codes', 'categories', '_index')
+
+    def __init__(self, codes: np.ndarray, categories: list[str]) -> None:
+        self.codes = codes
+        self.categories = categories
+        self._index: Optional[dict[str, int]] = None
+
+    @classmethod
+    def encode(cls, values: Iterable[Optional[str]]) -> 'DictionaryColumn':
+        index: dict[str, int] = {}
+        codes = [-1 if value is None else index.setdefault(value, len(index)) for value in values]
+
+        return cls(np.fromiter(codes, dtype=np.int32, count=len(codes)), list(index))
+
+    @property
+    def index(self) -> dict[str, int]:
+        if self._index is None:
+            self._index = {value: code for code, value in enumerate(self.categories)}
+
+        return self._index
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            code = self.codes[key]
+            return None if code < 0 else self.categories[code]
+
+        return DictionaryColumn(self.codes[key], self.categories)
+
+    def __eq__(self, value: Optional[str]) -> np.ndarray:  # type: ignore[override]
+        if value is None:
+            return self.codes < 0
+
+        return self.codes == self.index.get(value, -2)
+
+    def __ne__(self, value: Optional[str]) -> np.ndarray:  # type: ignore[override]
+        return ~(self == value)
+
+    __hash__ = None
+
+    def isin(self, values: Iterable[Optional[str]]) -> np.ndarray:
+        """
+        The isin function returns the mask of rows whose value is one of values.
+
+        :param values: Iterable[str]: Values to look for
+        :return: A boolean mask
+        """
+        codes = [-1 if value is None else self.index.get(value, -2) for value in values]
+
+        return np.isin(self.codes, codes)
+
+    def to_numpy(self) -> np.ndarray:
+        """
+        The to_numpy function decodes the column into an object array of strings.
+
+        :return: An object array with None for missing values
+        """
+        lookup = np.array(self.categories + [None], dtype=object)
+
+        return lookup[self.codes]
+
+
+class StatementBatch:
+    """
+    Statements stored column by column.
+
+    Integer columns (time, mcc, original_mcc, amount, operation_amount, currency_code, commission_rate,
+    cashback_amount, balance) and `hold` are numpy arrays, `description`, `counter_name` and `counter_iban`
+    are DictionaryColumn, the rest of strings are object arrays of interned strings.
+
+    Indexing with an int returns a Statement built on demand; indexing with a slice, an index array
+    or a boolean mask returns a new StatementBatch:
+
+        spent = batch[(batch.amount < 0) & (batch.mcc == 5411)].amount.sum()
+    """
+
+    columns = ('id', *_INT_COLUMNS, 'hold', *_DICTIONARY_COLUMNS, *_OBJECT_COLUMNS)
+
+    def __init__(self, **columns: Any) -> None:
+        for name in self.columns:
+            setattr(self, name, columns[name])
+
+    @classmethod
+    def from_items(cls, items: Sequence[dict]) -> 'StatementBatch':
+        """
+        The from_items function builds a batch from raw statement items of the API.
+
+        :param items: Sequence[dict]: Raw statement items
+        :return: A statement batch
+        """
+        count = len(items)
+        columns: dict[str, Any] = {
+            name: np.fromiter((item[key] for item in items), dtype=dtype, count=count)
+            for name, (key, dtype) in _INT_COLUMNS.items()
+        }
+        columns['hold'] = np.fromiter((item['hold'] for item in items), dtype=np.bool_, count=count)
+
+        for name, key in _DICTIONARY_COLUMNS.items():
+            columns[name] = DictionaryColumn.encode(item.get(key) for item in items)
+
+        for name, key in _OBJECT_COLUMNS.items():
+            column = np.empty(count, dtype=object)
+            column[:] = [None if (value := item.get(key)) is None else sys.intern(value) for item in items]
+            columns[name] = column
+
+        return cls(**columns)
+
+    @classmethod
+    def from_statements(cls, statements: Sequence[Statement]) -> 'StatementBatch':
+        """
+        The from_statements function builds a batch from Statement models.
+
+        :param statements: Sequence[Statement]: Statement models, e.g. from MonoPersonal.get_statement
+        :return: A statement batch
+        """
+        return cls.from_items([_to_item(statement) for statement in statements])
+
+    @classmethod
+    def concat(cls, batches: Sequence['StatementBatch']) -> 'StatementBatch':
+        """
+        The concat function joins batches into one, in the given order.
+
+        :param batches: Sequence[StatementBatch]: Batches to join
+        :return: A statement batch
+        """
+        if not batches:
+            return cls.from_items([])
+
+        columns: dict[str, Any] = {}
+        for name in cls.columns:
+            parts = [getattr(batch, name) for batch in batches]
+
+            if isinstance(parts[0], DictionaryColumn):
+                index: dict[str, int] = {}
+                codes = []
+                for part in parts:
+                    remap = np.array([index.setdefault(value, len(index)) for value in part.categories] + [-1],
+                                     dtype=np.int32)
+                    codes.append(remap[part.codes])
+                columns[name] = DictionaryColumn(np.concatenate(codes), list(index))
+            else:
+                columns[name] = np.concatenate(parts)
+
+        return cls(**columns)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray, Sequence[int]]):
+        if isinstance(key, (int, np.integer)):
+            return self.statement(int(key))
+
+        return self.__class__(**{name: getattr(self, name)[key] for name in self.columns})
+
+    def __iter__(self) -> Iterator[Statement]:
+        for index in range(len(self)):
+            yield self.statement(index)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} rows={len(self)}>"
+
+    def item(self, index: int) -> dict:
+        """
+        The item function returns the row as a raw statement item of the API.
+
+        :param index: int: Row number
+        :return: A raw statement item
+        """
+        item = {
+            key: getattr(self, name)[index].item()
+            for name, (key, _) in _INT_COLUMNS.items()
+        }
+        item['hold'] = bool(self.hold[index])
+
+        for name, key in (_DICTIONARY_COLUMNS | _OBJECT_COLUMNS).items():
+            value = getattr(self, name)[index]
+            if value is not None:
+                item[key] = value
+
+        return item
+
+    def statement(self, index: int) -> Statement:
+        """
+        The statement function builds the Statement model of one row.
+
+        :param index: int: Row number
+        :return: A statement object
+        """
+        return Statement(**self.item(index))
+
+    def filter(self, mask: np.ndarray) -> 'StatementBatch':
+        """
+        The filter function returns the rows where mask is True.
+
+        :param mask: np.ndarray: Boolean mask of the batch length
+        :return: A statement batch
+        """
+        return self[np.asarray(mask, dtype=np.bool_)]
+
+    def between(self, from_time: int, to_time: int) -> np.ndarray:
+        """
+        The between function returns the mask of rows with time within [from_time, to_time].
+
+        :param from_time: int: Start of the period as a unix timestamp
+        :param to_time: int: End of the period as a unix timestamp
+        :return: A boolean mask
+        """
+        return (self.time >= from_time) & (self.time <= to_time)
+
+    def sum(self, column: str = 'amount', mask: Optional[np.ndarray] = None) -> int:
+        """
+        The sum function sums an integer column in minimal currency units.
+
+        :param column: str: Column name, amount by default
+        :param mask: np.ndarray: Only sum rows where mask is True
+        :return: The sum in minimal currency units
+        """
+        values = getattr(self, column)
+        if mask is not None:
+            values = values[mask]
+
+        return int(values.sum())
+
+
+def _to_item(statement: Statement) -> dict:
+    item = statement.dict(by_alias=True, exclude_none=True)
+    item['time'] = int(statement.time.timestamp())
+
+    for name in _SUM_COLUMNS:
+        key = _INT_COLUMNS[name][0]
+        item[key] = round(item[key] * 100)
+
+    return item
@@ -0,0 +1,190 @@
+import asyncio
+import functools
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional, Protocol
+
+from .utils import exceptions
+
+log = logging.getLogger('aiomonobank')
+
+
+class CacheBackend(Protocol):
+    """
+    External storage shared by several processes, e.g. an aiocache cache with a serializer that keeps bytes.
+    Values are raw response bodies prefixed with their fetch time; entries must expire after `ttl` seconds.
+    """
+
+    async def get(self, key: str) -> Optional[bytes | str]:
+        ...
+
+    async def set(self, key: str, value: bytes, ttl: float) -> Any:
+        ...
+
+
+def _pack(body: bytes | str) -> bytes:
+    if isinstance(body, str):
+        body = body.encode()
+
+    return b'%.3f\n' % time.time() + body
+
+
+def _unpack(value: Optional[bytes | str]) -> tuple[Optional[bytes], float]:
+    # Returns the body and its age, values without a valid fetch time are treated as missing
+    if value is None:
+        return None, 0.0
+    if isinstance(value, str):
+        value = value.encode()
+
+    fetched_at, _, body = value.partition(b'\n')
+    try:
+        return body, max(time.time() - float(fetched_at), 0.0)
+    except ValueError:
+        return None, 0.0
+
+
+class _Entry:
+    __slots__ = ('value', 'fetched_at')
+
+    def __init__(self, value: Any, fetched_at: float) -> None:
+        self.value = value
+        self.fetched_at = fetched_at
+
+
+class ResponseCache:
+    """
+    Stale-while-revalidate cache of API responses.
+
+    A fresh entry (younger than `ttl`) is returned as is. A stale entry (younger than `ttl + stale_ttl`)
+    is returned as well, while one background request refreshes it. Concurrent misses of one key wait for
+    a single request. Entries hold decoded objects, so hits cost neither pickling nor parsing.
+
+    After a failed background refresh the stale entry is served without new refreshes for `failure_backoff`
+    seconds (or as long as a 429 answer asked, but no longer than `stale_ttl`), so a failing API is not
+    requested on every read.
+
+    With a backend, the raw body fetched by one process is shared with the others for `ttl` seconds
+    since it was fetched: a body taken from the backend is only fresh for the rest of that time.
+    """
+
+    def __init__(self,
+                 ttl: float = 300,
+                 stale_ttl: float = 3600,
+                 backend: Optional[CacheBackend] = None,
+                 failure_backoff: float = 30) -> None:
+        """
+        :param ttl: float: Seconds an entry is fresh
+        :param stale_ttl: float: Seconds a stale entry may still be returned while it is being refreshed
+        :param backend: CacheBackend: External storage of raw bodies shared by several processes
+        :param failure_backoff: float: Seconds without background refreshes after a failed one
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.backend = backend
+        self.failure_backoff = failure_backoff
+        self._entries: dict[str, _Entry] = {}
+        self._refreshing: dict[str, asyncio.Task] = {}
+        # monotonic() until which background refreshes of a key are skipped after a failure
+        self._backoff_until: dict[str, float] = {}
+
+    async def get(self,
+                  key: str,
+                  fetch: Callable[[], Awaitable[bytes]],
+                  decode: Callable[[bytes], Any],
+                  backend_key: Optional[str] = None) -> Any:
+        """
+        The get function returns the cached value of the key, fetching it when it is missing or expired.
+
+        :param key: str: Key of the decoded value
+        :param fetch: Callable: Coroutine function that requests the raw body
+        :param decode: Callable: Builds the value from the raw body
+        :param backend_key: str: Key of the raw body in the backend, `key` by default
+        :return: The cached value
+        """
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            age = time.monotonic() - entry.fetched_at
+
+            if age < self.ttl:
+                return entry.value
+
+            if age < self.ttl + self.stale_ttl:
+                if time.monotonic() >= self._backoff_until.get(key, 0):
+                    self._refresh(key, fetch, decode, backend_key)
+                return entry.value
+
+        return await asyncio.shield(self._refresh(key, fetch, decode, backend_key))
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """
+        Drop the entry of the key, or all entries
+        """
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def _refresh(self,
+                 key: str,
+                 fetch: Callable[[], Awaitable[bytes]],
+                 decode: Callable[[bytes], Any],
+                 backend_key: Optional[str]) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        task = self._refreshing.get(key)
+
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = self._refreshing[key] = loop.create_task(self._load(key, fetch, decode, backend_key or key))
+            task.add_done_callback(functools.partial(self._on_refreshed, key))
+
+        return task
+
+    async def _load(self,
+                    key: str,
+                    fetch: Callable[[], Awaitable[bytes]],
+                    decode: Callable[[bytes], Any],
+                    backend_key: str) -> Any:
+        try:
+            body, age = None, 0.0
+
+            if self.backend is not None:
+                body, age = _unpack(await self.backend.get(backend_key))
+                if age >= self.ttl:
+                    body, age = None, 0.0
+
+            if body is None:
+                body = await fetch()
+
+                if self.backend is not None:
+                    await self.backend.set(backend_key, _pack(body), ttl=self.ttl)
+
+            value = decode(body)
+        except Exception as e:
+            # Recorded before the task is done, so no read in between starts another refresh
+            backoff = e.timeout if isinstance(e, exceptions.RetryAfter) else self.failure_backoff
+            self._backoff_until[key] = time.monotonic() + min(self.stale_ttl, backoff)
+            raise
+
+        self._entries[key] = _Entry(value, time.monotonic() - age)
+        self._backoff_until.pop(key, None)
+
+        return value
+
+    def _on_refreshed(self, key: str, task: asyncio.Task) -> None:
+        if task.cancelled():
+            return
+
+        error = task.exception()
+        if error is None:
+            return
+
+        if key in self._entries:
+            log.warning('Cache refresh of %s failed, serving the stale value for %.1f seconds: %r',
+                        key, max(self._backoff_until.get(key, 0) - time.monotonic(), 0), error)
+        else:
+            # The callers waiting for the value get the exception
+            log.debug('Cache fill of %s failed: %r', key, error)
+
+
+currency_cache = ResponseCache(ttl=300)
+"""Process-wide cache of /bank/currency used by MonoPublic.get_currency by default"""
@@ -0,0 +1,327 @@
+"""
+Multi-process webhook ingestion.
+
+WebhookCluster starts worker processes that all listen on one port with SO_REUSEPORT, so the kernel spreads
+the connections between them. Every worker runs a WebhookReceiver: it acknowledges the events, parses them into
+WebhookData and forwards the batches to the main process through a bounded multiprocessing queue. In the main
+process the events go to the receiver of the cluster (its deduplicator and handlers):
+
+    cluster = WebhookCluster(port=8822, path=f'/{secret}', processes=4)
+
+    @cluster.handler
+    async def save(events: list[WebhookData]) -> None:
+        ...
+
+    if __name__ == '__main__':
+        cluster.run()
+
+Workers report their state every heartbeat_interval seconds (see health) and are restarted when they die.
+A full queue slows the workers down until their receivers answer 503, and Monobank delivers the events again later.
+Requires a platform with SO_REUSEPORT (Linux, BSD, macOS) and the `if __name__ == '__main__':` guard,
+as the workers are spawned.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import queue
+import signal
+import socket
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .webhook import WebhookHandler, WebhookReceiver
+
+log = logging.getLogger('aiomonobank')
+
+
+@dataclass
+class WorkerHealth:
+    """State of a worker process, as of its last heartbeat"""
+    index: int
+    """Number of the worker"""
+    pid: Optional[int] = None
+    """Process id"""
+    alive: bool = False
+    """The process is running"""
+    last_heartbeat: Optional[float] = None
+    """time.monotonic() of the last heartbeat"""
+    forwarded: int = 0
+    """Events forwarded to the main process"""
+    queued: int = 0
+    """Events waiting in the queue of the worker receiver"""
+    restarts: int = 0
+    """Times the worker was restarted after dying"""
+
+    def healthy(self, timeout: float) -> bool:
+        """
+        The healthy function checks that the worker runs and has sent a heartbeat within timeout seconds.
+
+        :param timeout: float: Maximum age of the last heartbeat
+        :return: True if the worker is healthy
+        """
+        return self.alive and self.last_heartbeat is not None and time.monotonic() - self.last_heartbeat <= timeout
+
+
+def _run_worker(index: int, settings: dict, events: multiprocessing.Queue) -> None:
+    # SIGINT goes to the whole process group, the main process decides when the workers stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logging.basicConfig(level=settings['log_level'])
+
+    asyncio.run(_serve_worker(index, settings, events))
+
+
+async def _serve_worker(index: int, settings: dict, events: multiprocessing.Queue) -> None:
+    from aiohttp import web
+
+    loop = asyncio.get_running_loop()
+    stopping = asyncio.Event()
+    loop.add_signal_handler(signal.SIGTERM, stopping.set)
+
+    forwarded = 0
+    receiver = WebhookReceiver(**settings['receiver'])
+
+    @receiver.handler
+    async def forward(batch: list) -> None:
+        nonlocal forwarded
+        # A full queue blocks the thread, not the loop: the receiver keeps acknowledging until its own queue is full
+        await loop.run_in_executor(None, events.put, ('events', index, batch))
+        forwarded += len(batch)
+
+    def report(kind: str) -> tuple:
+        return kind, index, {'pid': os.getpid(), 'forwarded': forwarded, 'queued': receiver.queue.qsize()}
+
+    runner = web.AppRunner(receiver.app(settings['path']), handle_signals=False)
+    await runner.setup()
+    site = web.TCPSite(runner, settings['host'], settings['port'], reuse_port=True, backlog=settings['backlog'])
+    await site.start()
+    log.info('Webhook worker %d (pid %d) listens on %s:%d', index, os.getpid(), settings['host'], settings['port'])
+
+    try:
+        while not stopping.is_set():
+            try:
+                events.put_nowait(report('heartbeat'))
+            except queue.Full:
+                # The main process is busy, the next heartbeat will do
+                pass
+            try:
+                await asyncio.wait_for(stopping.wait(), settings['heartbeat_interval'])
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        # Stops accepting connections, then the receiver forwards the queued events
+        await runner.cleanup()
+        await loop.run_in_executor(None, events.put, report('stopped'))
+        log.info('Webhook worker %d stopped', index)
+
+
+class WebhookCluster:
+    """
+    Webhook receiver that scales across CPU cores: worker processes bound to one port with SO_REUSEPORT
+    parse the events and forward them to the handlers of this process.
+    """
+
+    def __init__(self,
+                 host: str = '0.0.0.0',
+                 port: int = 8080,
+                 path: str = '/',
+                 processes: Optional[int] = None,
+                 queue_size: int = 10_000,
+                 heartbeat_interval: float = 1.0,
+                 backlog: int = 1024,
+                 receiver: Optional[WebhookReceiver] = None,
+                 worker_options: Optional[dict] = None) -> None:
+        """
+        :param host: str: Address to listen on
+        :param port: int: Port shared by the workers
+        :param path: str: Path of the webhook URL, a secret part in it protects from fake events
+        :param processes: int: Number of worker processes, the number of CPUs by default
+        :param queue_size: int: Maximum number of batches on their way to this process
+        :param heartbeat_interval: float: Seconds between the heartbeats of a worker
+        :param backlog: int: Listen backlog of every worker socket
+        :param receiver: WebhookReceiver: Receiver of this process that runs the handlers (with its deduplicator,
+            which sees the events of all workers), a new one by default
+        :param worker_options: dict: Arguments of the WebhookReceiver of every worker (queue_size, workers,
+            batch_size, batch_timeout, ack_timeout)
+        """
+        if not hasattr(socket, 'SO_REUSEPORT'):
+            raise RuntimeError("WebhookCluster requires SO_REUSEPORT, which this platform doesn't support")
+
+        self.host = host
+        self.port = port
+        self.path = path
+        self.processes = processes or os.cpu_count() or 1
+        self.heartbeat_interval = heartbeat_interval
+        self.receiver = receiver or WebhookReceiver()
+
+        self._settings = dict(
+            host=host,
+            port=port,
+            path=path,
+            backlog=backlog,
+            heartbeat_interval=heartbeat_interval,
+            receiver=worker_options or {},
+            log_level=log.getEffectiveLevel(),
+        )
+        # Spawned workers start from a fresh interpreter whatever threads and loops this process runs
+        self._context = multiprocessing.get_context('spawn')
+        self._queue_size = queue_size
+        self._events: Optional[multiprocessing.Queue] = None
+        self._workers: dict[int, multiprocessing.Process] = {}
+        self._health: dict[int, WorkerHealth] = {}
+        self._sink: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def handler(self, func: WebhookHandler) -> WebhookHandler:
+        """
+        Register a coroutine function that receives batches of events from all workers, usable as a decorator
+        """
+        return self.receiver.handler(func)
+
+    def health(self) -> list[WorkerHealth]:
+        """
+        The health function returns the state of every worker.
+
+        :return: A list of WorkerHealth, by worker number
+        """
+        for index, process in self._workers.items():
+            self._health[index].alive = process.is_alive()
+
+        return [self._health[index] for index in sorted(self._health)]
+
+    @property
+    def healthy(self) -> bool:
+        """
+        All workers run and have sent a heartbeat within three intervals
+        """
+        return bool(self._workers) and all(
+            worker.healthy(3 * self.heartbeat_interval) for worker in self.health()
+        )
+
+    def _spawn(self, index: int) -> None:
+        process = self._context.Process(
+            target=_run_worker,
+            args=(index, self._settings, self._events),
+            name=f'aiomonobank-webhook-{index}',
+            daemon=True
+        )
+        process.start()
+
+        self._workers[index] = process
+        health = self._health.setdefault(index, WorkerHealth(index))
+        health.pid, health.alive, health.last_heartbeat = process.pid, True, None
+
+    async def start(self) -> None:
+        """
+        Start the worker processes, the receiver of this process and the task that reads the forwarded events
+        """
+        if self._sink is not None:
+            return
+
+        self._stopping = False
+        self._events = self._context.Queue(self._queue_size)
+        await self.receiver.start()
+
+        for index in range(self.processes):
+            self._spawn(index)
+
+        self._sink = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            try:
+                kind, index, payload = await loop.run_in_executor(
+                    None, self._events.get, True, self.heartbeat_interval
+                )
+            except queue.Empty:
+                kind = None
+            except (EOFError, OSError):
+                break
+
+            if kind == 'events':
+                for event in payload:
+                    await self.receiver.put(event)
+            elif kind is not None:
+                health = self._health[index]
+                health.last_heartbeat = time.monotonic()
+                health.pid, health.forwarded, health.queued = payload['pid'], payload['forwarded'], payload['queued']
+                if kind == 'stopped':
+                    health.alive = False
+
+            if self._stopping:
+                if kind is None and not any(process.is_alive() for process in self._workers.values()):
+                    # Everything sent by the stopped workers has been read
+                    break
+                continue
+
+            self._restart_dead()
+
+    def _restart_dead(self) -> None:
+        for index, process in list(self._workers.items()):
+            if process.is_alive():
+                continue
+
+            log.warning('Webhook worker %d (pid %s) died with exit code %s, restarting it',
+                        index, process.pid, process.exitcode)
+            self._health[index].restarts += 1
+            self._spawn(index)
+
+    async def stop(self, timeout: float = 10) -> None:
+        """
+        Stop the workers gracefully: they stop accepting connections, forward the events they have
+        and exit; then the receiver of this process handles the rest.
+
+        :param timeout: float: Seconds to wait for the workers, the ones still running are killed after that
+        """
+        if self._sink is None:
+            return
+
+        self._stopping = True
+        for process in self._workers.values():
+            if process.is_alive():
+                process.terminate()
+
+        done, _ = await asyncio.wait([self._sink], timeout=timeout)
+        if not done:
+            log.warning('Webhook workers did not stop in %s seconds, killing them', timeout)
+            for process in self._workers.values():
+                if process.is_alive():
+                    process.kill()
+            self._sink.cancel()
+            await asyncio.gather(self._sink, return_exceptions=True)
+
+        for process in self._workers.values():
+            process.join()
+
+        self._sink = None
+        self._events.close()
+        await self.receiver.stop(timeout)
+
+    def run(self) -> None:
+        """
+        Start the cluster and serve until SIGINT or SIGTERM
+        """
+        async def serve() -> None:
+            loop = asyncio.get_running_loop()
+            stop = asyncio.Event()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                loop.add_signal_handler(signum, stop.set)
+
+            await self.start()
+            log.info('Webhook cluster of %d workers listens on %s:%d', self.processes, self.host, self.port)
+            try:
+                await stop.wait()
+            finally:
+                await self.stop()
+
+        asyncio.run(serve())
+
+    async def __aenter__(self) -> 'WebhookCluster':
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        await self.stop()
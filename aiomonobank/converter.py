@@ -0,0 +1,113 @@
+import numbers
+import sys
+from typing import Any, Iterable, Sequence, Union, TYPE_CHECKING
+
+from .utils import exceptions
+
+if TYPE_CHECKING:
+    import numpy as np
+
+UAH = 980
+"""Код гривні відповідно ISO 4217, через неї рахуються крос-курси"""
+
+
+def _rates(currency: Any) -> tuple[int, int, Any, Any, Any]:
+    if isinstance(currency, dict):
+        return (int(currency['currencyCodeA']), int(currency['currencyCodeB']),
+                currency.get('rateBuy'), currency.get('rateSell'), currency.get('rateCross'))
+
+    return (int(currency.currency_code_a), int(currency.currency_code_b),
+            currency.rate_buy, currency.rate_sell, currency.rate_cross)
+
+
+class CurrencyConverter:
+    """
+    Currency conversion by the rates of MonoPublic.get_currency.
+
+    A pair (A, B) converts A to B at the rate the bank buys A (rateBuy) and B to A at the rate it sells A
+    (rateSell), or at rateCross in both directions when there are no buy/sell rates.
+    Pairs missing in the list are converted through UAH. Rates are looked up in a precomputed index.
+    """
+
+    def __init__(self, currencies: Iterable[Any]) -> None:
+        """
+        :param currencies: Iterable: Result of get_currency - Currency models, msgspec structs or raw dicts
+        """
+        self._index: dict[tuple[int, int], float] = {}
+
+        for currency in currencies:
+            code_a, code_b, rate_buy, rate_sell, rate_cross = _rates(currency)
+
+            forward = rate_buy or rate_cross
+            backward = rate_sell or rate_cross
+
+            if forward:
+                self._index[code_a, code_b] = forward
+            if backward:
+                self._index.setdefault((code_b, code_a), 1 / backward)
+
+    def rate(self, from_code: int, to_code: int) -> float:
+        """
+        The rate function returns the factor that converts an amount in from_code currency into to_code currency.
+
+        :param from_code: int: ISO 4217 code of the source currency
+        :param to_code: int: ISO 4217 code of the target currency
+        :return: The conversion factor
+        :raise aiomonobank.utils.exceptions.UnknownCurrencyPair: when there is neither a direct nor a UAH rate
+        """
+        if from_code == to_code:
+            return 1.0
+
+        rate = self._index.get((from_code, to_code))
+        if rate is not None:
+            return rate
+
+        to_uah = self._index.get((from_code, UAH))
+        from_uah = self._index.get((UAH, to_code))
+        if to_uah is None or from_uah is None:
+            raise exceptions.UnknownCurrencyPair(f"No rate to convert {from_code} to {to_code}")
+
+        rate = self._index[from_code, to_code] = to_uah * from_uah
+        return rate
+
+    def convert(self,
+                amounts: Union[float, Sequence[float], 'np.ndarray'],
+                from_codes: Union[int, Sequence[int], 'np.ndarray'],
+                to_code: int = UAH) -> Union[float, list[float], 'np.ndarray']:
+        """
+        The convert function converts amounts in various currencies into one currency.
+        Each distinct source currency is looked up once; numpy arrays are converted without Python loops.
+
+        :param amounts: Amount or amounts to convert
+        :param from_codes: ISO 4217 code of the amounts currency, or a code per amount
+        :param to_code: int: ISO 4217 code of the target currency, UAH by default
+        :return: The converted amount(s): a float, a list or a numpy array, matching amounts
+        :raise aiomonobank.utils.exceptions.UnknownCurrencyPair: when a currency can't be converted
+        """
+        # numpy arrays can only be passed when numpy is already imported, so it is never imported here
+        np = sys.modules.get('numpy')
+
+        # numbers.Integral/Real also match numpy scalars, e.g. an element of a code array
+        if isinstance(from_codes, numbers.Integral):
+            rate = self.rate(int(from_codes), to_code)
+
+            if isinstance(amounts, numbers.Real) or (np is not None and isinstance(amounts, np.ndarray)):
+                return amounts * rate
+
+            return [amount * rate for amount in amounts]
+
+        if np is not None and isinstance(amounts, np.ndarray):
+            codes, inverse = np.unique(np.asarray(from_codes), return_inverse=True)
+            rates = np.array([self.rate(int(code), to_code) for code in codes])
+
+            return amounts * rates[inverse]
+
+        rates: dict[int, float] = {}
+        converted = []
+        for amount, code in zip(amounts, from_codes, strict=True):
+            rate = rates.get(code)
+            if rate is None:
+                rate = rates[code] = self.rate(code, to_code)
+            converted.append(amount * rate)
+
+        return converted
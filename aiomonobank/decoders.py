@@ -0,0 +1,241 @@
+"""
+Decoders turn response bodies of the API into the objects returned by the client methods.
+
+ - PydanticDecoder - pydantic models from aiomonobank.types (default)
+ - RawDecoder - plain dicts and lists exactly as the API sends them
+ - MsgspecDecoder - frozen msgspec structs from aiomonobank.types.structs (requires msgspec)
+
+All decoders parse JSON straight from the response bytes, with orjson when it is installed.
+JSONArrayParser parses an array as its bytes arrive, for streaming statements.
+"""
+import abc
+import codecs
+import json
+import re
+import time
+from typing import Any, TYPE_CHECKING
+
+from .metrics import current_record
+from . import types
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if TYPE_CHECKING:
+    from .types import Statement, Client, Currency
+
+
+def json_loads(body: bytes | str) -> Any:
+    """
+    The json_loads function parses JSON with orjson when it is installed and with the standard library otherwise.
+
+    :param body: bytes | str: JSON document
+    :return: The parsed document
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+
+    return json.loads(body)
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class JSONArrayParser:
+    """
+    Incremental parser of a JSON array: bytes are fed as they arrive and every complete element is returned
+    at once, so only the unparsed tail of the document is kept in memory.
+
+        parser = JSONArrayParser()
+        async for chunk in response.content.iter_any():
+            for item in parser.feed(chunk):
+                ...
+        parser.close()
+    """
+
+    def __init__(self) -> None:
+        self._text = codecs.getincrementaldecoder('utf-8')()
+        self._decode = json.JSONDecoder().raw_decode
+        self._buffer = ''
+        # start - before "[", value - an element is expected, next - "," or "]" is expected, done - after "]"
+        self._state = 'start'
+
+    def feed(self, chunk: bytes) -> list:
+        """
+        The feed function parses the next part of the document.
+
+        :param chunk: bytes: Next bytes of the document
+        :return: Elements completed by the chunk
+        :raise ValueError: when the document is not a JSON array
+        """
+        self._buffer += self._text.decode(chunk)
+        return self._parse(final=False)
+
+    def close(self) -> list:
+        """
+        The close function parses the rest of the document and checks that it is complete.
+
+        :return: Elements completed by the end of the document
+        :raise ValueError: when the document is not a complete JSON array
+        """
+        self._buffer += self._text.decode(b'', final=True)
+        items = self._parse(final=True)
+
+        if self._state != 'done':
+            raise ValueError("Incomplete JSON array")
+
+        return items
+
+    def _parse(self, final: bool) -> list:
+        items = []
+        buffer = self._buffer
+        size = len(buffer)
+        position = 0
+
+        while True:
+            position = _WHITESPACE.match(buffer, position).end()
+            if position == size:
+                break
+
+            char = buffer[position]
+            if self._state == 'start':
+                if char != '[':
+                    raise ValueError(f"Expected a JSON array, got {buffer[position:position + 20]!r}")
+                self._state = 'first'
+                position += 1
+            elif self._state in ('first', 'next') and char == ']':
+                self._state = 'done'
+                position += 1
+            elif self._state == 'next':
+                if char != ',':
+                    raise ValueError(f"Expected ',' or ']' in a JSON array, got {char!r}")
+                self._state = 'value'
+                position += 1
+            elif self._state in ('first', 'value'):
+                try:
+                    item, end = self._decode(buffer, position)
+                except json.JSONDecodeError:
+                    if final:
+                        raise
+                    # The element is not complete yet
+                    break
+                if not final and not isinstance(item, (dict, list, str)):
+                    # A number or a literal is complete only when a delimiter follows it
+                    following = _WHITESPACE.match(buffer, end).end()
+                    if following == size or buffer[following] not in ',]':
+                        break
+                items.append(item)
+                self._state = 'next'
+                position = end
+            else:
+                raise ValueError(f"Unexpected data after a JSON array: {buffer[position:position + 20]!r}")
+
+        self._buffer = buffer[position:]
+        return items
+
+
+class BaseDecoder(abc.ABC):
+    """
+    Base class of decoders. Subclasses implement the object constructors, the `*_list` and `client`
+    functions receive the raw response body, `statement` receives one already parsed statement item.
+    """
+
+    def loads(self, body: bytes | str) -> Any:
+        """
+        The loads function parses a response body into plain Python objects.
+
+        :param body: bytes | str: Response body
+        :return: The parsed document
+        """
+        record = current_record.get()
+        if record is None:
+            return json_loads(body)
+
+        started = time.perf_counter()
+        try:
+            return json_loads(body)
+        finally:
+            record.add('json', time.perf_counter() - started)
+
+    @abc.abstractmethod
+    def statement(self, item: dict) -> Any:
+        ...
+
+    def statement_list(self, body: bytes) -> list:
+        return [self.statement(item) for item in self.loads(body)]
+
+    @abc.abstractmethod
+    def client(self, body: bytes) -> Any:
+        ...
+
+    @abc.abstractmethod
+    def currency_list(self, body: bytes) -> list:
+        ...
+
+
+class PydanticDecoder(BaseDecoder):
+    """Builds the pydantic models from aiomonobank.types"""
+
+    def statement(self, item: dict) -> 'Statement':
+        return types.Statement(**item)
+
+    def client(self, body: bytes) -> 'Client':
+        return types.Client(**self.loads(body))
+
+    def currency_list(self, body: bytes) -> list['Currency']:
+        return [types.Currency(**currency) for currency in self.loads(body)]
+
+
+class RawDecoder(BaseDecoder):
+    """Returns dicts and lists exactly as the API sends them: sums in minimal units, times as unix timestamps"""
+
+    def statement(self, item: dict) -> dict:
+        return item
+
+    def statement_list(self, body: bytes) -> list[dict]:
+        return self.loads(body)
+
+    def client(self, body: bytes) -> dict:
+        return self.loads(body)
+
+    def currency_list(self, body: bytes) -> list[dict]:
+        return self.loads(body)
+
+
+class MsgspecDecoder(BaseDecoder):
+    """
+    Decodes the response bytes straight into typed msgspec structs from aiomonobank.types.structs.
+    Sums stay in minimal units and times stay unix timestamps, as in the API.
+    """
+
+    def __init__(self) -> None:
+        try:
+            import msgspec
+        except ImportError:
+            raise ImportError("MsgspecDecoder requires msgspec: pip install aiomonobank[msgspec]") from None
+
+        from .types import structs
+
+        self._statement = msgspec.convert
+        self._statement_type = structs.StatementStruct
+        self._statement_list = msgspec.json.Decoder(list[structs.StatementStruct])
+        self._client = msgspec.json.Decoder(structs.ClientStruct)
+        self._currency_list = msgspec.json.Decoder(list[structs.CurrencyStruct])
+
+    def __reduce__(self):
+        # Decoders of msgspec are not picklable, the instance is rebuilt instead
+        return self.__class__, ()
+
+    def statement(self, item: dict):
+        return self._statement(item, self._statement_type)
+
+    def statement_list(self, body: bytes) -> list:
+        return self._statement_list.decode(body)
+
+    def client(self, body: bytes):
+        return self._client.decode(body)
+
+    def currency_list(self, body: bytes) -> list:
+        return self._currency_list.decode(body)
@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Protocol
+
+from .types import WebhookData
+
+log = logging.getLogger('aiomonobank')
+
+
+class DedupBackend(Protocol):
+    """Persistent storage of seen event keys, consulted when the in-memory index doesn't know the key"""
+
+    async def add(self, key: int, ttl: float) -> bool:
+        """
+        Remember the key for ttl seconds
+
+        :return: True if the key was not seen before
+        """
+        ...
+
+
+class SQLiteDedupBackend:
+    """Dedup backend in an SQLite database, survives restarts of the receiver"""
+
+    def __init__(self, path: str) -> None:
+        """
+        :param path: str: Path to the SQLite database file
+        """
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aiomonobank-dedup')
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("CREATE TABLE IF NOT EXISTS seen (key INTEGER PRIMARY KEY, expires REAL NOT NULL)")
+        self._added = 0
+
+    def _add(self, key: int, ttl: float) -> bool:
+        now = time.time()
+
+        with self._connection:
+            # Every 10000 keys the expired ones are removed, keeping the table bounded
+            self._added += 1
+            if self._added % 10_000 == 0:
+                self._connection.execute("DELETE FROM seen WHERE expires < ?", (now,))
+
+            cursor = self._connection.execute(
+                "INSERT INTO seen (key, expires) VALUES (?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET expires = excluded.expires WHERE seen.expires < ?",
+                (key, now + ttl, now)
+            )
+
+        return cursor.rowcount == 1
+
+    async def add(self, key: int, ttl: float) -> bool:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._add, key, ttl)
+
+    async def close(self) -> None:
+        """
+        Close the database connection
+        """
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._connection.close)
+        self._executor.shutdown()
+
+
+class WebhookDeduplicator:
+    """
+    Drops webhook events that were already delivered: Monobank retries deliveries after 60 and 600 seconds.
+
+    Events are identified by (account id, statement id, hold), so the settlement of a held transaction
+    is a new event. Keys are 64-bit hashes kept in an in-memory LRU index bounded by `maxsize`
+    and expiring `ttl` seconds after they were last seen; an optional backend remembers them across restarts.
+    When the backend fails, events are checked against the in-memory index only.
+    """
+
+    def __init__(self, maxsize: int = 200_000, ttl: float = 3600, backend: Optional[DedupBackend] = None) -> None:
+        """
+        :param maxsize: int: Maximum number of keys kept in memory
+        :param ttl: float: Seconds a key is remembered after it was last seen
+        :param backend: DedupBackend: Persistent storage of keys, e.g. SQLiteDedupBackend
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.backend = backend
+        self._seen: OrderedDict[int, float] = OrderedDict()
+
+    @staticmethod
+    def key(account_id: str, statement_id: str, hold: bool) -> int:
+        """
+        The key function returns the 64-bit key of an event.
+
+        :param account_id: str: Account identifier
+        :param statement_id: str: Transaction identifier
+        :param hold: bool: Hold status of the transaction
+        :return: The event key
+        """
+        digest = hashlib.blake2b(f"{account_id}\0{statement_id}\0{int(bool(hold))}".encode(), digest_size=8).digest()
+
+        return int.from_bytes(digest, 'big', signed=True)
+
+    @classmethod
+    def event_key(cls, event: dict | WebhookData) -> Optional[int]:
+        """
+        The event_key function returns the key of a parsed request body or a WebhookData,
+        without building the model from the body.
+
+        :param event: dict | WebhookData: Event
+        :return: The event key or None if the event is not a statement item
+        """
+        if isinstance(event, WebhookData):
+            return cls.key(event.data.account_id, event.data.statement.id, event.data.statement.hold)
+
+        try:
+            data = event['data']
+            item = data['statementItem']
+            return cls.key(data['account'], item['id'], item['hold'])
+        except (KeyError, TypeError):
+            return None
+
+    def _seen_in_memory(self, key: int) -> bool:
+        now = time.monotonic()
+        seen = self._seen
+
+        # Keys are ordered by the time they were last seen, so the expired ones are in front
+        while seen:
+            oldest, last_seen = next(iter(seen.items()))
+            if now - last_seen < self.ttl:
+                break
+            del seen[oldest]
+
+        duplicate = key in seen
+        seen[key] = now
+        seen.move_to_end(key)
+
+        if len(seen) > self.maxsize:
+            seen.popitem(last=False)
+
+        return duplicate
+
+    async def is_duplicate(self, event: dict | WebhookData) -> bool:
+        """
+        The is_duplicate function remembers the event and tells whether it was seen before.
+
+        :param event: dict | WebhookData: Parsed request body or event
+        :return: True if the event is a duplicate
+        """
+        key = self.event_key(event)
+        if key is None:
+            return False
+
+        if self._seen_in_memory(key):
+            return True
+
+        if self.backend is not None:
+            try:
+                return not await self.backend.add(key, self.ttl)
+            except Exception as e:  # noqa
+                # The in-memory index has already remembered the key and still drops repeated deliveries
+                log.warning('Dedup backend failed, falling back to the in-memory index: %r', e)
+
+        return False
@@ -0,0 +1,333 @@
+"""
+Streaming export of statements to CSV, JSON Lines or Parquet (requires pyarrow: pip install aiomonobank[parquet]).
+
+Rows are written in chunks as statements arrive, so memory doesn't grow with the export. Every row has
+the COLUMNS in the units of the API: sums in minimal currency units (kopiykas, cents) and time as a unix timestamp.
+
+Exports are incremental: the state file next to the export remembers the newest exported transaction,
+and the next run appends only newer ones:
+
+    exported = await export_statement(client, 'statement.csv', account_id='0')
+
+A run that fails midway leaves the file as it was after the last complete run: CSV and JSON Lines files
+are truncated back to the size saved in the state (again on the next run, if the process died), Parquet runs are written to a new part file
+of the dataset directory which only appears when the run completes.
+"""
+import asyncio
+import csv
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, AsyncIterable, Callable, Iterable, Optional, TypeVar, Union
+
+from .monobank import MonoPersonal, STATEMENT_MAX_PERIOD
+
+log = logging.getLogger('aiomonobank')
+
+T = TypeVar('T')
+
+COLUMNS = (
+    'id', 'time', 'description', 'mcc', 'original_mcc', 'hold', 'amount', 'operation_amount', 'currency_code',
+    'commission_rate', 'cashback_amount', 'balance', 'comment', 'receipt_id', 'invoice_id', 'counter_edrpou',
+    'counter_iban', 'counter_name',
+)
+"""Exported columns, in order"""
+
+EXPORT_OVERLAP = timedelta(minutes=1)
+"""Period before the newest exported transaction fetched again by export_statement, covers clock skew"""
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl', '.parquet': 'parquet'}
+"""Export format by file suffix"""
+
+_API_KEYS = (
+    'id', 'time', 'description', 'mcc', 'originalMcc', 'hold', 'amount', 'operationAmount', 'currencyCode',
+    'commissionRate', 'cashbackAmount', 'balance', 'comment', 'receiptId', 'invoiceId', 'counterEdrpou',
+    'counterIban', 'counterName',
+)
+# Sums that pydantic Statement keeps divided by 100
+_SUM_COLUMNS = frozenset(('amount', 'operation_amount', 'commission_rate', 'cashback_amount', 'balance'))
+
+
+def statement_row(statement: Any) -> tuple:
+    """
+    The statement_row function converts a statement into a row of COLUMNS in the units of the API.
+
+    :param statement: Statement model, raw statement item or msgspec struct
+    :return: A tuple of column values
+    """
+    if isinstance(statement, dict):
+        return tuple(statement.get(key) for key in _API_KEYS)
+
+    if isinstance(statement.time, datetime):
+        return tuple(
+            int(statement.time.timestamp()) if name == 'time'
+            else round(getattr(statement, name) * 100) if name in _SUM_COLUMNS
+            else getattr(statement, name)
+            for name in COLUMNS
+        )
+
+    return tuple(getattr(statement, name) for name in COLUMNS)
+
+
+class _TextWriter:
+    """Appends rows to a CSV or JSON Lines file, truncating what a failed run left behind"""
+
+    def __init__(self, path: Path, format: str, size: int) -> None:
+        self.format = format
+        self._size = size
+
+        self._file = open(path, 'a+', newline='' if format == 'csv' else None, encoding='utf-8')
+        self._file.truncate(size)
+        self._file.seek(size)
+        self._csv = csv.writer(self._file) if format == 'csv' else None
+
+        if format == 'csv' and size == 0:
+            self._csv.writerow(COLUMNS)
+
+    def write(self, rows: list[tuple]) -> None:
+        if self._csv is not None:
+            self._csv.writerows(rows)
+        else:
+            self._file.writelines(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False) + '\n' for row in rows)
+
+    def commit(self) -> int:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        size = self._file.tell()
+        self._file.close()
+
+        return size
+
+    def abort(self) -> None:
+        self._file.flush()
+        self._file.truncate(self._size)
+        self._file.close()
+
+
+class _ParquetWriter:
+    """Writes a run as a new part file of a Parquet dataset directory"""
+
+    def __init__(self, path: Path) -> None:
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet export requires pyarrow: pip install aiomonobank[parquet]") from None
+
+        self._pa = pa
+        self._schema = pa.schema([
+            ('id', pa.string()), ('time', pa.int64()), ('description', pa.string()), ('mcc', pa.int32()),
+            ('original_mcc', pa.int32()), ('hold', pa.bool_()), ('amount', pa.int64()),
+            ('operation_amount', pa.int64()), ('currency_code', pa.int32()), ('commission_rate', pa.int64()),
+            ('cashback_amount', pa.int64()), ('balance', pa.int64()), ('comment', pa.string()),
+            ('receipt_id', pa.string()), ('invoice_id', pa.string()), ('counter_edrpou', pa.string()),
+            ('counter_iban', pa.string()), ('counter_name', pa.string()),
+        ])
+
+        path.mkdir(parents=True, exist_ok=True)
+        self._path = path / f'part-{time.time_ns()}.parquet'
+        # Dataset readers skip hidden files, so an unfinished part is never read
+        self._temporary = path / f'.{self._path.name}.tmp'
+        self._writer = pq.ParquetWriter(self._temporary, self._schema, compression='zstd')
+        self._rows = 0
+
+    def write(self, rows: list[tuple]) -> None:
+        columns = list(zip(*rows))
+        self._writer.write_table(self._pa.table(
+            [self._pa.array(column, type=field.type) for column, field in zip(columns, self._schema)],
+            schema=self._schema
+        ))
+        self._rows += len(rows)
+
+    def commit(self) -> int:
+        self._writer.close()
+        if self._rows:
+            os.replace(self._temporary, self._path)
+        else:
+            self._temporary.unlink()
+
+        return 0
+
+    def abort(self) -> None:
+        self._writer.close()
+        self._temporary.unlink(missing_ok=True)
+
+
+class StatementExport:
+    """
+    Incremental export of statements into one file (CSV, JSON Lines) or Parquet dataset directory.
+
+    The state file (`<path>.state.json` by default) keeps the time and ids of the newest exported transactions;
+    `write` skips everything not newer than them, so statements fetched with an overlap are exported once.
+    """
+
+    def __init__(self,
+                 path: Union[str, os.PathLike],
+                 format: Optional[str] = None,
+                 chunk_size: int = 10_000,
+                 state_path: Union[str, os.PathLike, None] = None) -> None:
+        """
+        :param path: str: Export file, or the directory of a Parquet dataset
+        :param format: str: csv, jsonl or parquet; taken from the suffix of path by default
+        :param chunk_size: int: Rows written at once
+        :param state_path: str: File of the export state
+        """
+        self.path = Path(path)
+        self.format = format or FORMATS.get(self.path.suffix.lower())
+        if self.format not in FORMATS.values():
+            raise ValueError(f"Unknown export format of {self.path}, pass format= csv, jsonl or parquet")
+
+        self.chunk_size = chunk_size
+        self.state_path = Path(state_path) if state_path else self.path.with_name(self.path.name + '.state.json')
+
+        # File writes are blocking, they go to one thread in order
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aiomonobank-export')
+
+    @property
+    def state(self) -> dict:
+        """
+        The export state: last_time (unix time of the newest exported transaction), last_ids (ids exported
+        at that second), rows (exported so far) and size (bytes of the file after the last complete run)
+        """
+        try:
+            state = json.loads(self.state_path.read_text())
+        except FileNotFoundError:
+            return {'last_time': None, 'last_ids': [], 'rows': 0, 'size': 0}
+
+        if self.format != 'parquet' and (not self.path.exists() or self.path.stat().st_size < state['size']):
+            log.warning('Export %s is missing or shorter than its state, exporting from scratch', self.path)
+            return {'last_time': None, 'last_ids': [], 'rows': 0, 'size': 0}
+
+        return state
+
+    def since(self) -> Optional[datetime]:
+        """
+        The since function returns the time to fetch statements from for the next run.
+
+        :return: UTC time without tzinfo of the newest exported transaction, None before the first run
+        """
+        last_time = self.state['last_time']
+
+        return None if last_time is None else datetime.utcfromtimestamp(last_time)
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _save_state(self, state: dict) -> None:
+        temporary = self.state_path.with_name(self.state_path.name + '.tmp')
+        temporary.write_text(json.dumps(state))
+        os.replace(temporary, self.state_path)
+
+    async def write(self, statements: Union[AsyncIterable[Any], Iterable[Any]]) -> int:
+        """
+        The write function appends the statements newer than the state and saves the new state
+        when all of them are written.
+
+        :param statements: AsyncIterable | Iterable: Statement models, raw statement items or msgspec structs,
+            in any order
+        :return: The number of exported rows
+        """
+        state = self.state
+        last_time = state['last_time']
+        last_ids = set(state['last_ids'])
+        newest_time, newest_ids = last_time, set(last_ids)
+
+        if self.format == 'parquet':
+            writer = await self._run(_ParquetWriter, self.path)
+        else:
+            writer = await self._run(_TextWriter, self.path, self.format, state['size'])
+
+        exported = 0
+        chunk: list[tuple] = []
+
+        def add(statement: Any) -> None:
+            nonlocal newest_time, newest_ids
+            row = statement_row(statement)
+            row_id, row_time = row[0], row[1]
+
+            if last_time is not None and (row_time < last_time or row_time == last_time and row_id in last_ids):
+                return
+
+            if newest_time is None or row_time > newest_time:
+                newest_time, newest_ids = row_time, {row_id}
+            elif row_time == newest_time:
+                newest_ids.add(row_id)
+
+            chunk.append(row)
+
+        try:
+            if isinstance(statements, AsyncIterable):
+                async for statement in statements:
+                    add(statement)
+                    if len(chunk) >= self.chunk_size:
+                        await self._run(writer.write, chunk)
+                        exported += len(chunk)
+                        chunk = []
+            else:
+                for statement in statements:
+                    add(statement)
+                    if len(chunk) >= self.chunk_size:
+                        await self._run(writer.write, chunk)
+                        exported += len(chunk)
+                        chunk = []
+
+            if chunk:
+                await self._run(writer.write, chunk)
+                exported += len(chunk)
+        except BaseException:
+            await self._run(writer.abort)
+            raise
+
+        size = await self._run(writer.commit)
+        await self._run(self._save_state, {
+            'last_time': newest_time,
+            'last_ids': sorted(newest_ids),
+            'rows': state['rows'] + exported,
+            'size': size,
+        })
+
+        return exported
+
+    async def close(self) -> None:
+        """
+        Stop the writer thread
+        """
+        self._executor.shutdown()
+
+
+async def export_statement(client: MonoPersonal,
+                           path: Union[str, os.PathLike],
+                           account_id: str = '0',
+                           from_datetime: Optional[datetime] = None,
+                           format: Optional[str] = None,
+                           chunk_size: int = 10_000) -> int:
+    """
+    The export_statement function fetches the transactions of the account made after the last export
+    (or from from_datetime, or the last 31 days + 1 hour on the first run) and appends them to the export.
+    Raw items are exported without building models.
+
+    :param client: MonoPersonal: Client of the account
+    :param path: str: Export file, or the directory of a Parquet dataset
+    :param account_id: str: Account or jar identifier
+    :param from_datetime: datetime: Start of the first export (UTC)
+    :param format: str: csv, jsonl or parquet; taken from the suffix of path by default
+    :param chunk_size: int: Rows written at once
+    :return: The number of exported rows
+    :raise aiomonobank.utils.exceptions.RetryAfter: якщо запити частіше 1 разу в хвилину
+    """
+    export = StatementExport(path, format, chunk_size)
+    try:
+        since = export.since()
+        if since is not None:
+            # Transactions of the overlap already exported are skipped by the state
+            since -= EXPORT_OVERLAP
+        else:
+            since = from_datetime or datetime.utcnow() - STATEMENT_MAX_PERIOD
+
+        return await export.write(client._iter_statement_items(account_id, since, datetime.utcnow()))  # noqa
+    finally:
+        await export.close()
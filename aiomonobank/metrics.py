@@ -0,0 +1,204 @@
+"""
+Instrumentation of API requests.
+
+Every request of a client with an observer produces a RequestRecord with per-phase durations in seconds:
+
+ - dns - DNS resolution (only when a new connection is opened and the name is not cached)
+ - connect - opening a connection, including the TLS handshake
+ - ttfb - from sending the request to receiving the response headers
+ - body - reading the response body
+ - json - parsing JSON
+ - model - building the returned objects (decoders that parse and build at once report everything here)
+ - total - the whole request
+"""
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+import aiohttp
+
+from .utils import exceptions
+
+ENDPOINTS = ('/bank/currency', '/personal/client-info', '/personal/statement', '/personal/webhook')
+
+current_record: ContextVar[Optional['RequestRecord']] = ContextVar('aiomonobank_request_record', default=None)
+"""Record of the request being decoded in the current context"""
+
+
+def endpoint_name(path: str) -> str:
+    """
+    The endpoint_name function maps a request path to its endpoint, dropping path parameters.
+
+    :param path: str: Request path, e.g. /personal/statement/0/1680000000/1680100000
+    :return: The endpoint, e.g. /personal/statement
+    """
+    for endpoint in ENDPOINTS:
+        if path == endpoint or path.startswith(endpoint + '/'):
+            return endpoint
+
+    return path
+
+
+@dataclass
+class RequestRecord:
+    endpoint: str
+    """Endpoint of the request, without path parameters"""
+    method: str
+    """HTTP method"""
+    status: Optional[int] = None
+    """HTTP status of the response, None if there was no response"""
+    bytes: int = 0
+    """Size of the response body"""
+    phases: dict[str, float] = field(default_factory=lambda: defaultdict(float))
+    """Durations of the request phases in seconds, see the module description"""
+    error: Optional[BaseException] = None
+    """Exception raised by the request"""
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] += seconds
+
+
+class RequestObserver:
+    """
+    Base class of request observers. Subclasses override on_request, which is called after every request
+    (including failed ones) and must not block.
+    """
+
+    def on_request(self, record: RequestRecord) -> None:
+        pass
+
+
+def trace_config() -> aiohttp.TraceConfig:
+    """
+    The trace_config function creates an aiohttp trace config that records DNS resolution and connection
+    durations into the RequestRecord passed as trace_request_ctx.
+
+    :return: aiohttp trace config
+    """
+    config = aiohttp.TraceConfig()
+
+    def _start(name: str):
+        async def handler(session, context, params) -> None:
+            if context.trace_request_ctx is not None:
+                setattr(context, name, time.perf_counter())
+        return handler
+
+    def _end(name: str, phase: str):
+        async def handler(session, context, params) -> None:
+            record = context.trace_request_ctx
+            started = getattr(context, name, None)
+            if record is not None and started is not None:
+                record.add(phase, time.perf_counter() - started)
+        return handler
+
+    config.on_dns_resolvehost_start.append(_start('dns_started'))
+    config.on_dns_resolvehost_end.append(_end('dns_started', 'dns'))
+    config.on_connection_create_start.append(_start('connect_started'))
+    config.on_connection_create_end.append(_end('connect_started', 'connect'))
+
+    return config
+
+
+class PrometheusObserver(RequestObserver):
+    """
+    In-process histograms and counters of requests, rendered in the Prometheus text format:
+
+     - aiomonobank_request_phase_seconds{endpoint, phase} - histogram of phase durations
+     - aiomonobank_requests_total{endpoint, status} - requests by status ("error" when there was no response)
+     - aiomonobank_retry_after_total{endpoint} - 429 answers
+     - aiomonobank_response_bytes_total{endpoint} - received body bytes
+    """
+
+    buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    def __init__(self, buckets: Optional[tuple[float, ...]] = None) -> None:
+        """
+        :param buckets: tuple[float, ...]: Upper bounds of histogram buckets in seconds
+        """
+        if buckets is not None:
+            self.buckets = tuple(sorted(buckets))
+
+        # (endpoint, phase) -> [bucket counts..., +Inf count], sum
+        self._histograms: dict[tuple[str, str], list[int]] = {}
+        self._sums: dict[tuple[str, str], float] = defaultdict(float)
+        self._requests: dict[tuple[str, str], int] = defaultdict(int)
+        self._retry_after: dict[str, int] = defaultdict(int)
+        self._bytes: dict[str, int] = defaultdict(int)
+
+    def on_request(self, record: RequestRecord) -> None:
+        for phase, seconds in record.phases.items():
+            key = (record.endpoint, phase)
+            counts = self._histograms.get(key)
+            if counts is None:
+                counts = self._histograms[key] = [0] * (len(self.buckets) + 1)
+
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    counts[index] += 1
+                    break
+            else:
+                counts[-1] += 1
+
+            self._sums[key] += seconds
+
+        status = 'error' if record.status is None else str(record.status)
+        self._requests[record.endpoint, status] += 1
+        self._bytes[record.endpoint] += record.bytes
+
+        if isinstance(record.error, exceptions.RetryAfter):
+            self._retry_after[record.endpoint] += 1
+
+    def render(self) -> str:
+        """
+        The render function returns the metrics in the Prometheus text exposition format.
+
+        :return: Metrics text
+        """
+        lines = [
+            '# HELP aiomonobank_request_phase_seconds Duration of Monobank API request phases.',
+            '# TYPE aiomonobank_request_phase_seconds histogram',
+        ]
+        for (endpoint, phase), counts in sorted(self._histograms.items()):
+            labels = f'endpoint="{endpoint}",phase="{phase}"'
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'aiomonobank_request_phase_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'aiomonobank_request_phase_seconds_bucket{{{labels},le="+Inf"}} {cumulative}')
+            lines.append(f'aiomonobank_request_phase_seconds_sum{{{labels}}} {self._sums[endpoint, phase]}')
+            lines.append(f'aiomonobank_request_phase_seconds_count{{{labels}}} {cumulative}')
+
+        lines += [
+            '# HELP aiomonobank_requests_total Monobank API requests by response status.',
+            '# TYPE aiomonobank_requests_total counter',
+        ]
+        for (endpoint, status), count in sorted(self._requests.items()):
+            lines.append(f'aiomonobank_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+        lines += [
+            '# HELP aiomonobank_retry_after_total Monobank API answers with 429 Too Many Requests.',
+            '# TYPE aiomonobank_retry_after_total counter',
+        ]
+        for endpoint, count in sorted(self._retry_after.items()):
+            lines.append(f'aiomonobank_retry_after_total{{endpoint="{endpoint}"}} {count}')
+
+        lines += [
+            '# HELP aiomonobank_response_bytes_total Received Monobank API response body bytes.',
+            '# TYPE aiomonobank_response_bytes_total counter',
+        ]
+        for endpoint, count in sorted(self._bytes.items()):
+            lines.append(f'aiomonobank_response_bytes_total{{endpoint="{endpoint}"}} {count}')
+
+        return '\n'.join(lines) + '\n'
+
+    async def handler(self, request) -> 'aiohttp.web.Response':
+        """
+        aiohttp handler serving the metrics, e.g. app.router.add_get('/metrics', observer.handler)
+        """
+        from aiohttp import web
+
+        return web.Response(body=self.render().encode(),
+                            headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
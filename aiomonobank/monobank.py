@@ -1,13 +1,25 @@
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Optional, AsyncIterator, Any, Callable, TYPE_CHECKING
 from http import HTTPMethod  # noqa
 
-from aiocache import cached, Cache
-from aiocache.serializers import PickleSerializer
-
 from .api import MonobankAPIServer, MONOBANK_PRODUCTION
 from .base import BaseMonobank
-from .types import Statement, Client, Currency
+from .cache import ResponseCache, currency_cache as default_currency_cache
+from .decoders import BaseDecoder
+from .metrics import RequestObserver
+from .policy import RequestPolicy, DEFAULT_POLICY
+from .scheduler import RateScheduler
+
+if TYPE_CHECKING:
+    from .batch import StatementBatch
+    from .converter import CurrencyConverter
+    from .offload import DecodeExecutor
+    from .types import Statement, Client, Currency
+
+STATEMENT_MAX_PERIOD = timedelta(days=31, hours=1)
+"""Максимальний період, за який можливо отримати виписку одним запитом"""
+STATEMENT_PAGE_LIMIT = 500
+"""Максимальна кількість транзакцій у відповіді на один запит виписки"""
 
 
 class MonoPublic(BaseMonobank):
@@ -17,31 +29,74 @@ class MonoPublic(BaseMonobank):
     Джерело: https://api.monobank.ua/docs/#tag/Publichni-dani
     """
     def __init__(self, connections_limit: Optional[int] = None,
-                 server: MonobankAPIServer = MONOBANK_PRODUCTION, **kwargs) -> None:
+                 server: MonobankAPIServer = MONOBANK_PRODUCTION,
+                 scheduler: Optional[RateScheduler] = None,
+                 share_connector: bool = False,
+                 prewarm_connections: int = 0,
+                 decoder: Optional[BaseDecoder] = None,
+                 currency_cache: Optional[ResponseCache] = None,
+                 policy: RequestPolicy = DEFAULT_POLICY,
+                 observer: Optional[RequestObserver] = None,
+                 executor: Optional['DecodeExecutor'] = None, **kwargs) -> None:
+        """
+        :param currency_cache: ResponseCache: cache of get_currency, shared by the whole process by default
+        :param policy: RequestPolicy: timeouts and retries of requests
+        :param observer: RequestObserver: receives phase durations, status and size of every request
+        :param executor: DecodeExecutor: decode responses in worker processes instead of the event loop
+        """
         super().__init__(
             token=kwargs.get('token', ''),
             validate_token=kwargs.get('validate_token', False),
             connections_limit=connections_limit,
-            server=server
+            server=server,
+            scheduler=scheduler,
+            share_connector=share_connector,
+            prewarm_connections=prewarm_connections,
+            decoder=decoder,
+            policy=policy,
+            observer=observer,
+            executor=executor
         )
+        self.currency_cache = currency_cache or default_currency_cache
 
-    @cached(ttl=300, cache=Cache.MEMORY, serializer=PickleSerializer())
-    async def get_currency(self) -> list[Currency]:
+    async def get_currency(self) -> list['Currency']:
         """
         Отримання курсів валют:
             Отримати базовий перелік курсів валют monobank.
             Інформація кешується та оновлюється не частіше 1 разу на 5 хвилин.
 
+        Кеш спільний для всіх клієнтів процесу: застарілі дані віддаються, поки один фоновий запит їх оновлює,
+        а одночасні запити при порожньому кеші чекають на один спільний запит.
+
         `Джерело <https://api.monobank.ua/docs/#tag/Publichni-dani/paths/~1bank~1currency/get>`_
 
         :return: A list of currency objects
         """
-        currency = await self.request(
-            HTTPMethod.GET,
-            "/bank/currency"
+        return await self.currency_cache.get(
+            key=f"{self.server.base_url}/bank/currency#{type(self.decoder).__qualname__}",
+            fetch=self._fetch_currency,
+            decode=self.decoder.currency_list,
+            backend_key=f"{self.server.base_url}/bank/currency"
         )
 
-        return [Currency(**cur) for cur in currency]
+    async def get_converter(self) -> 'CurrencyConverter':
+        """
+        Конвертер валют:
+            Конвертер за курсами get_currency з попередньо побудованим індексом пар валют
+            та крос-курсами через гривню для пар, яких немає в переліку.
+
+        :return: A currency converter
+        """
+        from .converter import CurrencyConverter
+
+        return CurrencyConverter(await self.get_currency())
+
+    async def _fetch_currency(self) -> bytes:
+        return await self.request(
+            HTTPMethod.GET,
+            "/bank/currency",
+            decode=bytes
+        )
 
 
 class MonoPersonal(MonoPublic):
@@ -56,23 +111,50 @@ class MonoPersonal(MonoPublic):
             token: str,
             validate_token: Optional[bool] = True,
             connections_limit: Optional[int] = None,
-            server: MonobankAPIServer = MONOBANK_PRODUCTION
+            server: MonobankAPIServer = MONOBANK_PRODUCTION,
+            scheduler: Optional[RateScheduler] = None,
+            share_connector: bool = False,
+            prewarm_connections: int = 0,
+            decoder: Optional[BaseDecoder] = None,
+            currency_cache: Optional[ResponseCache] = None,
+            policy: RequestPolicy = DEFAULT_POLICY,
+            observer: Optional[RequestObserver] = None,
+            executor: Optional['DecodeExecutor'] = None
     ) -> None:
         """
         Create Monobank API token from https://api.monobank.ua/
 
         :param token: str: token from https://api.monobank.ua/
         :param server: MonobankAPIServer: Monobank API Server endpoint.
+        :param scheduler: RateScheduler: queue requests within the API rate limits instead of raising RetryAfter
+        :param share_connector: bool: use the connector shared by all clients of the process
+        :param prewarm_connections: int: number of connections to open in advance on `async with`
+        :param decoder: BaseDecoder: builds the returned objects from responses, pydantic models by default
+        :param currency_cache: ResponseCache: cache of get_currency, shared by the whole process by default
+        :param policy: RequestPolicy: timeouts and retries of requests
+        :param observer: RequestObserver: receives phase durations, status and size of every request
+        :param executor: DecodeExecutor: decode responses in worker processes instead of the event loop
         :raise aiomonobank.utils.exceptions.ValidationError: when the token is invalid
         """
         super().__init__(
             token=token,
             validate_token=validate_token,
             connections_limit=connections_limit,
-            server=server
+            server=server,
+            scheduler=scheduler,
+            share_connector=share_connector,
+            prewarm_connections=prewarm_connections,
+            decoder=decoder,
+            currency_cache=currency_cache,
+            policy=policy,
+            observer=observer,
+            executor=executor
         )
 
-    async def set_webhook(self, webhook_url: str) -> bool:
+    async def set_webhook(self,
+                          webhook_url: str,
+                          priority: int = 0,
+                          max_wait: Optional[float] = None) -> bool:
         """
         Встановлення URL користувача:
             Для підтвердження коректності наданої адреси, на неї надсилається GET-запит.
@@ -86,6 +168,8 @@ class MonoPersonal(MonoPublic):
             Відповідь сервера має строго містити HTTP статус-код 200.
 
         :param webhook_url: str:
+        :param priority: int: Пріоритет у черзі RateScheduler, запити з більшим пріоритетом відправляються першими.
+        :param max_wait: float: Скільки секунд запит може чекати в черзі RateScheduler (None - без обмеження).
         :raise aiomonobank.utils.exceptions.RetryAfter: якщо запити частіше 1 разу в хвилину
 
         `Джерело <https://api.monobank.ua/docs/#tag/Kliyentski-personalni-dani/paths/~1personal~1webhook/post>`_
@@ -93,12 +177,14 @@ class MonoPersonal(MonoPublic):
         await self.request(
             HTTPMethod.POST,
             "/personal/webhook",
+            priority=priority,
+            max_wait=max_wait,
             json={"webHookUrl": webhook_url}
         )
 
         return True
 
-    async def get_client_info(self) -> Client:
+    async def get_client_info(self, priority: int = 0, max_wait: Optional[float] = None) -> 'Client':
         """
         Інформація про клієнта:
             Отримання інформації про клієнта та переліку його рахунків і банок.
@@ -107,19 +193,24 @@ class MonoPersonal(MonoPublic):
 
         `Джерело <https://api.monobank.ua/docs/#tag/Kliyentski-personalni-dani/paths/~1personal~1client-info/get>`_
 
+        :param priority: int: Пріоритет у черзі RateScheduler, запити з більшим пріоритетом відправляються першими.
+        :param max_wait: float: Скільки секунд запит може чекати в черзі RateScheduler (None - без обмеження).
         :raise aiomonobank.utils.exceptions.RetryAfter: якщо запити частіше 1 разу в хвилину
         """
-        client = await self.request(
+        return await self.request(
             HTTPMethod.GET,
-            "/personal/client-info"
+            "/personal/client-info",
+            priority=priority,
+            max_wait=max_wait,
+            decode=self.decoder.client
         )
 
-        return Client(**client)
-
     async def get_statement(self,
                             account_id: str = '0',
                             from_datetime: datetime = None,
-                            to_datetime: datetime = None) -> list[Statement]:
+                            to_datetime: datetime = None,
+                            priority: int = 0,
+                            max_wait: Optional[float] = None) -> list['Statement']:
         """
         Виписка:
             Отримання виписки за час від {from_datetime} до {to_datetime} часу в секундах у форматі UTC time.
@@ -132,25 +223,199 @@ class MonoPersonal(MonoPublic):
         :param account_id: str: Ідентифікатор рахунку або банки з переліків Statement list або 0 - дефолтний рахунок.
         :param from_datetime: datetime: Початок часу виписки.
         :param to_datetime: datetime: Останній час виписки (якщо відсутній, буде використовуватись поточний час).
+        :param priority: int: Пріоритет у черзі RateScheduler, запити з більшим пріоритетом відправляються першими.
+        :param max_wait: float: Скільки секунд запит може чекати в черзі RateScheduler (None - без обмеження).
+        :raise aiomonobank.utils.exceptions.InvalidAccount: якщо некоректний account_id
+        :raise aiomonobank.utils.exceptions.PeriodError: якщо період більше 31 дня та 1 години
+        :raise aiomonobank.utils.exceptions.RetryAfter: якщо запити частіше 1 разу в хвилину
+        """
+        from_datetime = await timestamp(
+            from_datetime or datetime.utcnow() - STATEMENT_MAX_PERIOD
+        )
+        to_datetime = await timestamp(
+            to_datetime or datetime.utcnow()
+        )
+
+        return await self._get_statement_items(
+            account_id, from_datetime, to_datetime,
+            decode=self.decoder.statement_list,
+            priority=priority,
+            max_wait=max_wait
+        )
+
+    async def stream_statement(self,
+                               account_id: str = '0',
+                               from_datetime: datetime = None,
+                               to_datetime: datetime = None,
+                               priority: int = 0,
+                               max_wait: Optional[float] = None) -> AsyncIterator['Statement']:
+        """
+        Виписка потоком:
+            Те саме, що get_statement, але транзакції віддаються по одній по мірі надходження відповіді:
+            JSON-масив розбирається інкрементально, тож у пам'яті не тримаються одночасно все тіло відповіді,
+            розібраний список і список моделей, а обробка починається до завершення завантаження.
+
+        Обмеження на використання функції — не частіше ніж 1 раз на 60 секунд.
+
+        :param account_id: str: Ідентифікатор рахунку або банки з переліків Statement list або 0 - дефолтний рахунок.
+        :param from_datetime: datetime: Початок часу виписки.
+        :param to_datetime: datetime: Останній час виписки (якщо відсутній, буде використовуватись поточний час).
+        :param priority: int: Пріоритет у черзі RateScheduler, запити з більшим пріоритетом відправляються першими.
+        :param max_wait: float: Скільки секунд запит може чекати в черзі RateScheduler (None - без обмеження).
         :raise aiomonobank.utils.exceptions.InvalidAccount: якщо некоректний account_id
         :raise aiomonobank.utils.exceptions.PeriodError: якщо період більше 31 дня та 1 години
         :raise aiomonobank.utils.exceptions.RetryAfter: якщо запити частіше 1 разу в хвилину
         """
         from_datetime = await timestamp(
-            from_datetime or datetime.utcnow() - timedelta(days=31, hours=1)
+            from_datetime or datetime.utcnow() - STATEMENT_MAX_PERIOD
         )
         to_datetime = await timestamp(
             to_datetime or datetime.utcnow()
         )
 
-        path_params = f'/{account_id}/{from_datetime}/{to_datetime}'
+        async for statement in self.stream(
+                HTTPMethod.GET,
+                f"/personal/statement/{account_id}/{from_datetime}/{to_datetime}",
+                decode_item=self.decoder.statement,
+                priority=priority,
+                max_wait=max_wait
+        ):
+            yield statement
+
+    async def iter_statement(self,
+                             account_id: str = '0',
+                             from_datetime: datetime = None,
+                             to_datetime: datetime = None,
+                             priority: int = 0,
+                             max_wait: Optional[float] = None) -> AsyncIterator['Statement']:
+        """
+        Виписка за довільний період:
+            Отримання виписки за час від {from_datetime} до {to_datetime} без обмеження на довжину періоду.
+            Період розбивається на вікна не довші за 31 добу + 1 годину, а вікно, на яке API повернуло
+            500 транзакцій, догружається сторінками (кінець вікна зсувається на час останньої транзакції).
+
+        Транзакції віддаються по мірі надходження сторінок, від новіших до старіших, без накопичення
+        всієї виписки в пам'яті. Кожна сторінка — окремий запит, тож діє обмеження 1 раз на 60 секунд.
 
-        statements = await self.request(
+        :param account_id: str: Ідентифікатор рахунку або банки з переліків Statement list або 0 - дефолтний рахунок.
+        :param from_datetime: datetime: Початок часу виписки (якщо відсутній - 31 доба + 1 година до {to_datetime}).
+        :param to_datetime: datetime: Останній час виписки (якщо відсутній, буде використовуватись поточний час).
+        :param priority: int: Пріоритет у черзі RateScheduler, запити з більшим пріоритетом відправляються першими.
+        :param max_wait: float: Скільки секунд кожна сторінка може чекати в черзі RateScheduler (None - без обмеження).
+        :raise aiomonobank.utils.exceptions.InvalidAccount: якщо некоректний account_id
+        :raise aiomonobank.utils.exceptions.RetryAfter: якщо запити частіше 1 разу в хвилину
+        """
+        async for statement in self._iter_statement_items(account_id, from_datetime, to_datetime,
+                                                           priority=priority, max_wait=max_wait):
+            yield self.decoder.statement(statement)
+
+    async def get_statement_batch(self,
+                                  account_id: str = '0',
+                                  from_datetime: datetime = None,
+                                  to_datetime: datetime = None,
+                                  priority: int = 0,
+                                  max_wait: Optional[float] = None) -> 'StatementBatch':
+        """
+        Виписка у колонковому форматі:
+            Отримання виписки за довільний період (як iter_statement) одразу у вигляді StatementBatch —
+            numpy-колонок для векторних фільтрів та сум. Потребує numpy: pip install aiomonobank[numpy]
+
+        :param account_id: str: Ідентифікатор рахунку або банки з переліків Statement list або 0 - дефолтний рахунок.
+        :param from_datetime: datetime: Початок часу виписки (якщо відсутній - 31 доба + 1 година до {to_datetime}).
+        :param to_datetime: datetime: Останній час виписки (якщо відсутній, буде використовуватись поточний час).
+        :param priority: int: Пріоритет у черзі RateScheduler, запити з більшим пріоритетом відправляються першими.
+        :param max_wait: float: Скільки секунд кожна сторінка може чекати в черзі RateScheduler (None - без обмеження).
+        :raise aiomonobank.utils.exceptions.InvalidAccount: якщо некоректний account_id
+        :raise aiomonobank.utils.exceptions.RetryAfter: якщо запити частіше 1 разу в хвилину
+        """
+        from .batch import StatementBatch
+
+        batches = []
+        page = []
+
+        async for item in self._iter_statement_items(account_id, from_datetime, to_datetime,
+                                                     priority=priority, max_wait=max_wait):
+            page.append(item)
+
+            if len(page) == STATEMENT_PAGE_LIMIT:
+                batches.append(StatementBatch.from_items(page))
+                page = []
+
+        batches.append(StatementBatch.from_items(page))
+
+        return StatementBatch.concat(batches)
+
+    async def _get_statement_items(self,
+                                   account_id: str,
+                                   from_time: int,
+                                   to_time: int,
+                                   decode: Optional[Callable[[bytes], Any]] = None,
+                                   priority: int = 0,
+                                   max_wait: Optional[float] = None) -> list:
+        """
+        The _get_statement_items function makes a single statement request and returns the raw items.
+
+        :param account_id: str: Account or jar identifier
+        :param from_time: int: Start of the period as a unix timestamp
+        :param to_time: int: End of the period as a unix timestamp
+        :param decode: Callable: Build the result from the response body, raw items by default
+        :param priority: int: Scheduler priority, higher leaves the queue first
+        :param max_wait: float: Scheduler deadline in seconds, None waits as long as needed
+        :return: A list of raw statement items as returned by the API
+        """
+        return await self.request(
             HTTPMethod.GET,
-            "/personal/statement" + path_params
+            f"/personal/statement/{account_id}/{from_time}/{to_time}",
+            priority=priority,
+            max_wait=max_wait,
+            decode=decode or self.decoder.loads
         )
 
-        return [Statement(**statement) for statement in statements]
+    async def _iter_statement_items(self,
+                                    account_id: str,
+                                    from_datetime: Optional[datetime],
+                                    to_datetime: Optional[datetime],
+                                    priority: int = 0,
+                                    max_wait: Optional[float] = None) -> AsyncIterator[dict]:
+        """
+        The _iter_statement_items function walks the period from the newest window to the oldest one
+        and yields raw statement items, each one exactly once.
+
+        :param account_id: str: Account or jar identifier
+        :param from_datetime: datetime: Start of the period
+        :param to_datetime: datetime: End of the period
+        :param priority: int: Scheduler priority of every page request
+        :param max_wait: float: Scheduler deadline of every page request in seconds
+        :return: An async iterator over raw statement items
+        """
+        to_time = await timestamp(to_datetime or datetime.utcnow())
+        from_time = await timestamp(from_datetime) if from_datetime else \
+            to_time - int(STATEMENT_MAX_PERIOD.total_seconds())
+        max_period = int(STATEMENT_MAX_PERIOD.total_seconds())
+
+        window_to = to_time
+        # Transactions already yielded at the boundary second of the previous page
+        boundary_ids: set[str] = set()
+
+        while window_to > from_time:
+            window_from = max(from_time, window_to - max_period)
+            items = await self._get_statement_items(account_id, window_from, window_to,
+                                                    priority=priority, max_wait=max_wait)
+
+            for item in items:
+                if item['id'] not in boundary_ids:
+                    yield item
+
+            if len(items) < STATEMENT_PAGE_LIMIT:
+                window_to = window_from
+            elif items[-1]['time'] < window_to:
+                window_to = items[-1]['time']
+            else:
+                # The whole page shares one second, nothing older can be reached by moving `to`
+                window_to -= 1
+
+            # Both ends of the period are inclusive, so the boundary second is requested twice
+            boundary_ids = {item['id'] for item in items if item['time'] == window_to}
 
 
 async def timestamp(date_time: datetime) -> int:
@@ -0,0 +1,77 @@
+import random
+from dataclasses import dataclass, field
+from typing import Mapping, Optional
+
+import aiohttp
+
+
+@dataclass(frozen=True)
+class Timeouts:
+    """
+    Request timeouts in seconds, None disables a timeout
+    """
+    connect: Optional[float] = 10
+    """Getting a connection, including DNS resolution and the TLS handshake"""
+    read: Optional[float] = 30
+    """Waiting for the next chunk of the response"""
+    total: Optional[float] = 60
+    """The whole request"""
+
+    def client_timeout(self) -> aiohttp.ClientTimeout:
+        """
+        The client_timeout function converts the timeouts to aiohttp.ClientTimeout.
+
+        :return: aiohttp client timeout
+        """
+        return aiohttp.ClientTimeout(total=self.total, connect=self.connect, sock_read=self.read)
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    """
+    Timeouts and retries of API requests.
+
+    GET requests that failed with a network error, a timeout or a 5xx answer are retried
+    with exponential backoff and full jitter. A 429 answer of any request is retried after the delay
+    the API asked for. Retries stop after `retries` attempts or when the next one would end after `budget`
+    seconds since the first attempt.
+    """
+    timeouts: Timeouts = Timeouts()
+    """Timeouts of endpoints not listed in endpoint_timeouts"""
+    endpoint_timeouts: Mapping[str, Timeouts] = field(default_factory=dict)
+    """Timeouts per endpoint path prefix, e.g. {"/personal/statement": Timeouts(read=60, total=120)}"""
+    retries: int = 0
+    """Maximum number of retries of one request"""
+    backoff: float = 0.5
+    """Delay before the first retry, doubled for every next one"""
+    backoff_max: float = 10
+    """Maximum delay between retries"""
+    budget: float = 30
+    """Seconds all attempts of one request may take"""
+    retry_after_max: float = 60
+    """429 answers asking to wait longer than this are not retried"""
+
+    def timeouts_for(self, path: str) -> Timeouts:
+        """
+        The timeouts_for function returns the timeouts of the endpoint the path belongs to.
+
+        :param path: str: Request path
+        :return: Timeouts of the endpoint
+        """
+        for prefix, timeouts in self.endpoint_timeouts.items():
+            if path == prefix or path.startswith(prefix + '/'):
+                return timeouts
+
+        return self.timeouts
+
+    def backoff_delay(self, attempt: int) -> float:
+        """
+        The backoff_delay function returns the delay before a retry: a random value up to the exponential backoff.
+
+        :param attempt: int: Number of the failed attempt, starting from 0
+        :return: Seconds to wait
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff * 2 ** attempt))
+
+
+DEFAULT_POLICY = RequestPolicy()
@@ -0,0 +1,173 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterator, Optional, TYPE_CHECKING
+from http import HTTPMethod  # noqa
+
+import aiohttp
+
+from .api import MonobankAPIServer, MONOBANK_PRODUCTION
+from .base import BaseMonobank
+from .decoders import BaseDecoder
+from .metrics import RequestObserver
+from .policy import RequestPolicy, DEFAULT_POLICY
+from .monobank import MonoPersonal
+from .scheduler import RateScheduler
+
+if TYPE_CHECKING:
+    from .offload import DecodeExecutor
+
+
+class _FairLimiter:
+    """
+    Limits the number of requests in flight and hands free places to the waiting tokens in round-robin order,
+    so a token with a long queue of requests can't starve the others.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._active = 0
+        self._queues: dict[str, deque[asyncio.Future]] = {}
+
+    async def acquire(self, token: str) -> None:
+        if self._active < self.limit and not self._queues:
+            self._active += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(token, deque()).append(waiter)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The place was handed over right before the cancellation
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self._active -= 1
+        self._wake_up()
+
+    def _wake_up(self) -> None:
+        while self._active < self.limit and self._queues:
+            token = next(iter(self._queues))
+            queue = self._queues.pop(token)
+            waiter = queue.popleft()
+
+            if queue:
+                # Re-inserting moves the token to the end of the round
+                self._queues[token] = queue
+
+            if not waiter.done():
+                waiter.set_result(None)
+                self._active += 1
+
+
+class _PooledMonoPersonal(MonoPersonal):
+    """MonoPersonal client that sends its requests through the session of a MonoPersonalPool"""
+
+    def __init__(self, pool: 'MonoPersonalPool', token: str, validate_token: Optional[bool] = True) -> None:
+        super().__init__(
+            token=token,
+            validate_token=validate_token,
+            server=pool.server,
+            scheduler=pool.scheduler,
+            decoder=pool.decoder,
+            policy=pool.policy,
+            observer=pool.observer,
+            executor=pool.executor
+        )
+        self._pool = pool
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        return await self._pool.get_session()
+
+    async def close(self):
+        """
+        The session belongs to the pool, close the pool instead
+        """
+
+    async def _make_request(self, http_method: HTTPMethod, path: str, **kwargs) -> dict:
+        await self._pool.limiter.acquire(self._token)
+        try:
+            return await super()._make_request(http_method, path, **kwargs)
+        finally:
+            self._pool.limiter.release()
+
+    async def _stream_request(self, *args, **kwargs) -> AsyncIterator[Any]:
+        await self._pool.limiter.acquire(self._token)
+        try:
+            async for item in super()._stream_request(*args, **kwargs):
+                yield item
+        finally:
+            self._pool.limiter.release()
+
+
+class MonoPersonalPool(BaseMonobank):
+    """
+    Pool of MonoPersonal clients for many tokens that share one aiohttp session and connector.
+
+    Every request carries the `X-Token` header of its own client, the number of requests in flight is bounded
+    by `connections_limit` and free connections are handed out to the tokens in turn.
+    """
+
+    def __init__(
+            self,
+            connections_limit: int = 100,
+            server: MonobankAPIServer = MONOBANK_PRODUCTION,
+            scheduler: Optional[RateScheduler] = None,
+            prewarm_connections: int = 0,
+            decoder: Optional[BaseDecoder] = None,
+            policy: RequestPolicy = DEFAULT_POLICY,
+            observer: Optional[RequestObserver] = None,
+            executor: Optional['DecodeExecutor'] = None
+    ) -> None:
+        """
+        :param connections_limit: int: Maximum number of simultaneous connections and requests in flight
+        :param server: MonobankAPIServer: Monobank API Server endpoint.
+        :param scheduler: RateScheduler: queue requests within the API rate limits instead of raising RetryAfter
+        :param prewarm_connections: int: number of connections to open in advance on `async with`
+        :param decoder: BaseDecoder: builds the returned objects from responses, pydantic models by default
+        :param policy: RequestPolicy: timeouts and retries of requests
+        :param observer: RequestObserver: receives phase durations, status and size of every request
+        :param executor: DecodeExecutor: decode responses of all clients in worker processes instead of the event loop
+        """
+        super().__init__(
+            token='',
+            validate_token=False,
+            connections_limit=connections_limit,
+            server=server,
+            scheduler=scheduler,
+            prewarm_connections=prewarm_connections,
+            decoder=decoder,
+            policy=policy,
+            observer=observer,
+            executor=executor
+        )
+        self.limiter = _FairLimiter(connections_limit)
+        self._clients: dict[str, MonoPersonal] = {}
+
+    def client(self, token: str, validate_token: Optional[bool] = True) -> MonoPersonal:
+        """
+        The client function returns the MonoPersonal client of the token that works over the pool session.
+        Clients are created once per token and don't have to be closed.
+
+        :param token: str: token from https://api.monobank.ua/
+        :param validate_token: bool: Check the token before creating the client
+        :return: A MonoPersonal client
+        :raise aiomonobank.utils.exceptions.ValidationError: when the token is invalid
+        """
+        client = self._clients.get(token)
+
+        if client is None:
+            client = self._clients[token] = _PooledMonoPersonal(self, token, validate_token=validate_token)
+
+        return client
+
+    def remove(self, token: str) -> None:
+        """
+        The remove function forgets the client of the token, e.g. when the customer revoked it.
+
+        :param token: str: token from https://api.monobank.ua/
+        """
+        self._clients.pop(token, None)
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Mapping, Optional
+
+from .monobank import MonoPersonal, STATEMENT_MAX_PERIOD
+from .types import WebhookData
+from .utils import exceptions
+from .webhook import WebhookReceiver
+
+log = logging.getLogger('aiomonobank')
+
+
+class _AccountState:
+    __slots__ = ('last_time', 'last_received', 'interval', 'events', 'reconciled_to', 'quiet')
+
+    def __init__(self, last_time: Optional[int] = None) -> None:
+        self.last_time = last_time
+        """Unix time of the newest known transaction"""
+        self.last_received = time.time()
+        """Unix time the account was last heard of (an event or a backfill)"""
+        self.interval: Optional[float] = None
+        """Moving average of seconds between transactions"""
+        self.events = 0
+        self.reconciled_to: Optional[int] = None
+        """Unix time up to which the statement was last backfilled"""
+        self.quiet = 0
+        """Backfills in a row that found no new transactions"""
+
+
+class WebhookReconciler:
+    """
+    Backfills webhook events lost while the receiver was down, with MonoPersonal.get_statement requests
+    for exactly the missing range. Fetched transactions are put into the receiver queue,
+    so handlers get them like any other event (use a WebhookDeduplicator to drop the ones already received).
+
+    A gap is assumed after a restart (for accounts with a known last transaction time) and when a busy account
+    stays silent for `silence_factor` times its usual interval between events. Every backfill that finds nothing new
+    doubles the silence an account needs for the next one (up to `max_silence`), so accounts that simply have
+    no activity are not requested over and over; the next event resets it.
+    """
+
+    def __init__(self,
+                 client: MonoPersonal,
+                 receiver: WebhookReceiver,
+                 accounts: Iterable[str] = (),
+                 last_seen: Optional[Mapping[str, datetime]] = None,
+                 check_interval: float = 60,
+                 silence_factor: float = 5.0,
+                 min_silence: float = 600,
+                 min_events: int = 10,
+                 overlap: float = 60,
+                 max_silence: float = 86400) -> None:
+        """
+        :param client: MonoPersonal: Client of the token the webhook is set for
+        :param receiver: WebhookReceiver: Receiver the events go to
+        :param accounts: Iterable[str]: Accounts to watch; all accounts seen in events when empty
+        :param last_seen: Mapping[str, datetime]: Last transaction time (UTC) per account saved before a restart,
+            see `state`
+        :param check_interval: float: Seconds between checks for silent accounts
+        :param silence_factor: float: Silence longer than this many usual intervals is a gap
+        :param min_silence: float: Silence shorter than this many seconds is never a gap
+        :param min_events: int: Events needed to learn the usual interval of an account
+        :param overlap: float: Seconds before the last transaction (or the end of the last backfill)
+            that are fetched again
+        :param max_silence: float: Silence longer than this many seconds is always a gap
+        """
+        self.client = client
+        self.receiver = receiver
+        self.check_interval = check_interval
+        self.silence_factor = silence_factor
+        self.min_silence = min_silence
+        self.min_events = min_events
+        self.overlap = overlap
+        self.max_silence = max_silence
+
+        self._accounts = set(accounts)
+        self._states: dict[str, _AccountState] = {
+            account_id: _AccountState(int((last if last.tzinfo else last.replace(tzinfo=timezone.utc)).timestamp()))
+            for account_id, last in (last_seen or {}).items()
+        }
+        self._task: Optional[asyncio.Task] = None
+
+        receiver.handler(self._observe)
+
+    def state(self) -> dict[str, datetime]:
+        """
+        The state function returns the last transaction time (UTC, without tzinfo) per account,
+        to be saved and passed as `last_seen` after a restart.
+
+        :return: A dict of account id to time
+        """
+        return {
+            account_id: datetime.utcfromtimestamp(state.last_time)
+            for account_id, state in self._states.items() if state.last_time is not None
+        }
+
+    async def start(self) -> None:
+        """
+        Backfill the time the receiver was down and start watching for silent accounts
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Stop watching
+        """
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _observe(self, events: list[WebhookData]) -> None:
+        now = time.time()
+
+        for event in events:
+            account_id = event.data.account_id
+            if self._accounts and account_id not in self._accounts:
+                continue
+
+            state = self._states.get(account_id)
+            if state is None:
+                state = self._states[account_id] = _AccountState()
+
+            event_time = int(event.data.statement.time.timestamp())
+            if state.last_time is None or event_time > state.last_time:
+                if state.last_time is not None:
+                    # Transaction times are used, so backfilled bursts don't distort the interval
+                    interval = max(event_time - state.last_time, 1)
+                    state.interval = interval if state.interval is None else 0.8 * state.interval + 0.2 * interval
+                state.last_time = event_time
+                state.events += 1
+                state.quiet = 0
+
+            state.last_received = now
+
+    def _silent_accounts(self) -> list[str]:
+        now = time.time()
+
+        return [
+            account_id for account_id, state in self._states.items()
+            if state.last_time is not None and state.events >= self.min_events and state.interval is not None
+            and now - state.last_received > self._silence(state)
+        ]
+
+    def _silence(self, state: _AccountState) -> float:
+        silence = max(self.min_silence, self.silence_factor * state.interval) * 2 ** min(state.quiet, 32)
+
+        return min(silence, max(self.max_silence, self.min_silence))
+
+    async def _run(self) -> None:
+        # After a restart every account with a known last transaction may have missed events
+        pending = [account_id for account_id, state in self._states.items() if state.last_time is not None]
+
+        while True:
+            for account_id in pending:
+                try:
+                    await self.backfill(account_id)
+                except exceptions.RetryAfter as e:
+                    log.warning('Backfill of %s postponed: %s', account_id, e)
+                except exceptions.MonobankError as e:
+                    log.warning('Backfill of %s failed: %s', account_id, e)
+                except Exception:  # noqa
+                    # Anything else (e.g. an item the models reject) must not stop the reconciliation
+                    log.exception('Backfill of %s failed', account_id)
+
+            await asyncio.sleep(self.check_interval)
+            pending = self._silent_accounts()
+
+    async def backfill(self, account_id: str, from_time: Optional[int] = None) -> int:
+        """
+        The backfill function fetches the transactions of the account made after the last known one
+        or the end of the last backfill, whichever is later (or from_time), and puts them into the receiver queue.
+
+        :param account_id: str: Account identifier
+        :param from_time: int: Unix time to start from, the last known transaction time (or the end of the last
+            backfill) minus overlap by default
+        :return: The number of fetched transactions
+        :raise aiomonobank.utils.exceptions.RetryAfter: якщо запити частіше 1 разу в хвилину
+        """
+        state = self._states.get(account_id)
+        if state is None:
+            state = self._states[account_id] = _AccountState()
+
+        now = time.time()
+        if from_time is None:
+            if state.last_time is None:
+                return 0
+            from_time = max(state.last_time, state.reconciled_to or 0) - self.overlap
+
+        # Nothing older than the longest statement period is fetched automatically
+        from_time = max(from_time, int(now - STATEMENT_MAX_PERIOD.total_seconds()))
+
+        fetched = 0
+        last_time = state.last_time
+        new = False
+        async for item in self.client._iter_statement_items(  # noqa
+                account_id, datetime.utcfromtimestamp(from_time), datetime.utcfromtimestamp(now)):
+            await self.receiver.put(WebhookData(type="StatementItem", data={"account": account_id, "statementItem": item}))
+            fetched += 1
+            new = new or last_time is None or item['time'] > last_time
+
+        state.last_received = now
+        state.reconciled_to = int(now)
+        state.quiet = 0 if new else state.quiet + 1
+        if fetched:
+            log.info('Backfilled %d transactions of %s', fetched, account_id)
+
+        return fetched
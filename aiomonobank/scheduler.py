@@ -0,0 +1,162 @@
+import asyncio
+import heapq
+import itertools
+import math
+from typing import Optional, Mapping
+
+from .utils import exceptions
+
+# Documented request budgets: minimal interval in seconds between two calls of an endpoint with one token.
+# `/bank/currency` is not listed: `MonoPublic.get_currency` already caches it for 5 minutes.
+DEFAULT_LIMITS: dict[str, float] = {
+    "/personal/client-info": 60,
+    "/personal/statement": 60,
+    "/personal/webhook": 60,
+}
+
+# Slots are checked for idle ones when their number doubles, but not below this many
+_PRUNE_MIN = 1024
+
+
+class _Slot:
+    """Budget of one endpoint for one token"""
+    __slots__ = ('interval', 'next_at', 'waiters', 'timer')
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.next_at = 0.0
+        self.waiters: list[tuple[int, int, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class RateScheduler:
+    """
+    Client-side scheduler that holds requests back until the endpoint budget of the token allows them,
+    instead of letting them fail with 429 and :class:`aiomonobank.utils.exceptions.RetryAfter`.
+
+    One scheduler may be shared by any number of clients; budgets are tracked per token and per endpoint,
+    and the budgets of idle tokens are forgotten once their interval has passed.
+    """
+
+    def __init__(self, limits: Optional[Mapping[str, float]] = None, max_deferrals: int = 3) -> None:
+        """
+        :param limits: Mapping[str, float]: Minimal interval in seconds between calls per endpoint path prefix.
+            Defaults to :data:`DEFAULT_LIMITS`.
+        :param max_deferrals: int: Times a request answered with 429 is put back into the queue,
+            after that RetryAfter is handled by the request policy
+        """
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.max_deferrals = max_deferrals
+        self._slots: dict[tuple[str, str], _Slot] = {}
+        self._counter = itertools.count()
+        # Number of slots that triggers the next removal of idle ones
+        self._prune_at = _PRUNE_MIN
+
+    def endpoint(self, path: str) -> Optional[str]:
+        """
+        The endpoint function maps a request path to the limited endpoint it belongs to.
+
+        :param path: str: Request path, e.g. /personal/statement/0/1680000000/1680100000
+        :return: The endpoint prefix from limits or None if the path is not limited
+        """
+        for prefix in self.limits:
+            if path == prefix or path.startswith(prefix + '/'):
+                return prefix
+
+        return None
+
+    async def acquire(self,
+                      token: str,
+                      path: str,
+                      priority: int = 0,
+                      max_wait: Optional[float] = None) -> None:
+        """
+        The acquire function waits until a request to the path with the token may be sent.
+        Waiting requests are released one per interval, higher priority first and FIFO within one priority.
+
+        :param token: str: Token the request is made with
+        :param path: str: Request path
+        :param priority: int: Requests with higher priority leave the queue first
+        :param max_wait: float: Deadline in seconds; None waits as long as needed
+        :raise aiomonobank.utils.exceptions.RetryAfter: when the slot can't be acquired before the deadline
+        """
+        endpoint = self.endpoint(path)
+        if endpoint is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        slot = self._slot(token, endpoint, loop)
+        now = loop.time()
+
+        if not slot.waiters and slot.next_at <= now:
+            slot.next_at = now + slot.interval
+            return
+
+        if max_wait is not None and slot.next_at - now > max_wait:
+            raise exceptions.RetryAfter(math.ceil(slot.next_at - now))
+
+        waiter = loop.create_future()
+        heapq.heappush(slot.waiters, (-priority, next(self._counter), waiter))
+        self._schedule(slot, loop)
+
+        try:
+            await asyncio.wait_for(waiter, max_wait)
+        except asyncio.TimeoutError:
+            raise exceptions.RetryAfter(math.ceil(max(slot.next_at - loop.time(), 1)))
+
+    def defer(self, token: str, path: str, delay: float) -> None:
+        """
+        The defer function postpones the next request to the endpoint, e.g. after the API answered with 429
+        because the token was used somewhere else.
+
+        :param token: str: Token the request was made with
+        :param path: str: Request path
+        :param delay: float: Seconds to wait before the next request
+        """
+        endpoint = self.endpoint(path)
+        if endpoint is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        slot = self._slot(token, endpoint, loop)
+        slot.next_at = max(slot.next_at, loop.time() + delay)
+
+        if slot.timer is not None:
+            slot.timer.cancel()
+            slot.timer = None
+            self._schedule(slot, loop)
+
+    def _slot(self, token: str, endpoint: str, loop: asyncio.AbstractEventLoop) -> _Slot:
+        slot = self._slots.get((token, endpoint))
+
+        if slot is None:
+            if len(self._slots) >= self._prune_at:
+                self._prune(loop.time())
+            slot = self._slots[token, endpoint] = _Slot(self.limits[endpoint])
+
+        return slot
+
+    def _prune(self, now: float) -> None:
+        # A slot without waiters whose interval has passed behaves exactly like a new one
+        idle = [key for key, slot in self._slots.items() if not slot.waiters and slot.next_at <= now]
+        for key in idle:
+            del self._slots[key]
+
+        self._prune_at = max(_PRUNE_MIN, 2 * len(self._slots))
+
+    def _schedule(self, slot: _Slot, loop: asyncio.AbstractEventLoop) -> None:
+        if slot.timer is None:
+            slot.timer = loop.call_at(slot.next_at, self._release, slot, loop)
+
+    def _release(self, slot: _Slot, loop: asyncio.AbstractEventLoop) -> None:
+        slot.timer = None
+
+        while slot.waiters:
+            _, _, waiter = heapq.heappop(slot.waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                slot.next_at = loop.time() + slot.interval
+                break
+
+        if slot.waiters:
+            self._schedule(slot, loop)
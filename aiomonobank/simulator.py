@@ -0,0 +1,459 @@
+"""
+Local simulator of the Monobank API for load testing without the real API.
+
+Point a client at it with MonobankAPIServer.from_base(simulator.url):
+
+    async with MonobankSimulator(seed=1) as simulator:
+        async with MonoPersonal('any-token', server=MonobankAPIServer.from_base(simulator.url)) as client:
+            print(await client.get_client_info())
+
+Or run it standalone: python -m aiomonobank.simulator --port 8080
+
+Data is generated from the seed and the token, so every token (any string, or only the listed ones)
+gets the same accounts, jars and transactions on every run. The documented limits are enforced:
+one call per endpoint per token a minute (429 otherwise), at most 500 transactions per statement answer
+and a statement period of at most 31 days + 1 hour.
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import random
+import time
+from collections import defaultdict
+from http import HTTPStatus
+from typing import Iterable, Mapping, Optional
+
+import aiohttp
+from aiohttp import web
+
+from .monobank import STATEMENT_MAX_PERIOD, STATEMENT_PAGE_LIMIT
+from .scheduler import DEFAULT_LIMITS
+
+log = logging.getLogger('aiomonobank')
+
+DAY = 86400
+
+SIMULATOR_LIMITS: dict[str, float] = {
+    "/bank/currency": 60,
+    **DEFAULT_LIMITS,
+}
+"""Minimal interval in seconds between calls of an endpoint; per token, and per client address for /bank/currency"""
+
+_MERCHANTS = (
+    (5411, "Сільпо"), (5411, "АТБ"), (5812, "Пузата Хата"), (5814, "McDonald's"), (4121, "Uber"),
+    (4111, "Київ Цифровий"), (5541, "OKKO"), (5912, "Аптека Доброго Дня"), (4215, "Нова пошта"),
+    (5732, "Rozetka"), (4829, "Від: Тарас П."), (4829, "Переказ на картку"), (6011, "Банкомат"),
+)
+_CURRENCIES = ((840, 36.5, 37.4), (978, 39.4, 40.6), (985, 9.1, 9.9), (826, 45.8, 47.9), (203, 1.5, 1.7))
+
+
+def _rnd(*parts) -> random.Random:
+    return random.Random(hashlib.blake2b(':'.join(map(str, parts)).encode(), digest_size=8).digest())
+
+
+def _error(status: int, description: str) -> web.Response:
+    return web.json_response({"errorDescription": description}, status=status)
+
+
+class MonobankSimulator:
+    """
+    aiohttp application serving /bank/currency, /personal/client-info, /personal/statement and /personal/webhook
+    with deterministic generated data, per-token rate limits and injectable latency and errors.
+    """
+
+    def __init__(self,
+                 seed: int = 0,
+                 tokens: Optional[Iterable[str]] = None,
+                 accounts: int = 3,
+                 jars: int = 2,
+                 transactions_per_day: int = 20,
+                 limits: Optional[Mapping[str, float]] = None,
+                 latency: float = 0.0,
+                 latency_jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 error_status: int = HTTPStatus.INTERNAL_SERVER_ERROR) -> None:
+        """
+        :param seed: int: Seed of the generated data
+        :param tokens: Iterable[str]: Valid tokens; any token is accepted when None
+        :param accounts: int: Accounts per client
+        :param jars: int: Jars per client
+        :param transactions_per_day: int: Average transactions per account a day
+        :param limits: Mapping[str, float]: Minimal interval between calls per endpoint, see SIMULATOR_LIMITS;
+            pass {} to disable rate limiting
+        :param latency: float: Seconds every answer is delayed by
+        :param latency_jitter: float: Random extra delay up to this many seconds
+        :param error_rate: float: Share of requests (0..1) answered with error_status
+        :param error_status: int: HTTP status of the injected errors
+        """
+        self.seed = seed
+        self.tokens = None if tokens is None else set(tokens)
+        self.accounts = accounts
+        self.jars = jars
+        self.transactions_per_day = transactions_per_day
+        self.limits = dict(SIMULATOR_LIMITS if limits is None else limits)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+        self.url: Optional[str] = None
+        self.requests: dict[str, int] = defaultdict(int)
+        """Number of answered requests per endpoint"""
+
+        self._random = random.Random(seed)
+        self._failures: list[tuple[Optional[str], int]] = []
+        self._last_call: dict[tuple[str, str], float] = {}
+        self._webhooks: dict[str, str] = {}
+        self._emitted: dict[str, list[dict]] = defaultdict(list)
+        self._runner: Optional[web.AppRunner] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def fail(self,
+             status: int = HTTPStatus.INTERNAL_SERVER_ERROR,
+             count: int = 1,
+             endpoint: Optional[str] = None) -> None:
+        """
+        The fail function makes the next requests fail with the status, e.g. to test retries.
+
+        :param status: int: HTTP status of the answers
+        :param count: int: Number of requests to fail
+        :param endpoint: str: Fail only requests of this endpoint, e.g. /personal/statement
+        """
+        self._failures += [(endpoint, status)] * count
+
+    def app(self) -> web.Application:
+        """
+        The app function creates the aiohttp application of the simulator.
+
+        :return: An aiohttp application
+        """
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_get('/bank/currency', self._currency)
+        app.router.add_get('/personal/client-info', self._client_info)
+        app.router.add_get('/personal/statement/{account}/{from_time}', self._statement)
+        app.router.add_get('/personal/statement/{account}/{from_time}/{to_time}', self._statement)
+        app.router.add_post('/personal/webhook', self._set_webhook)
+        app.on_cleanup.append(self._on_cleanup)
+
+        return app
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """
+        The start function serves the simulator in the running event loop.
+
+        :param host: str: Address to listen on
+        :param port: int: Port to listen on, a free one when 0
+        :return: Base URL of the simulator
+        """
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+        host, port = self._runner.addresses[0][:2]
+        self.url = f'http://{host}:{port}'
+        return self.url
+
+    async def stop(self) -> None:
+        """
+        Stop serving
+        """
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'MonobankSimulator':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.stop()
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    # Generated data
+
+    def client_info(self, token: str) -> dict:
+        """
+        The client_info function returns the client-info answer of the token.
+
+        :param token: str: Client token
+        :return: A dict as returned by the API
+        """
+        rnd = _rnd(self.seed, token, 'client')
+        client_id = hashlib.blake2b(f'{self.seed}:{token}'.encode(), digest_size=5).hexdigest()
+
+        return {
+            "clientId": client_id,
+            "name": f"Клієнт {client_id[:4]}",
+            "webHookUrl": self._webhooks.get(token, ""),
+            "permissions": "psfj",
+            "accounts": [{
+                "id": self._account_id(token, index),
+                "sendId": f"{client_id}{index}",
+                "balance": rnd.randint(0, 5_000_000),
+                "creditLimit": rnd.choice((0, 0, 1_000_000, 5_000_000)),
+                "type": rnd.choice(("black", "white", "platinum", "fop")) if index else "black",
+                "currencyCode": 980 if index == 0 else rnd.choice((980, 840, 978)),
+                "cashbackType": "UAH",
+                "maskedPan": [f"537541******{rnd.randint(0, 9999):04d}"],
+                "iban": f"UA{rnd.randint(10, 99)}322001{rnd.randint(0, 10 ** 19 - 1):019d}",
+            } for index in range(self.accounts)],
+            "jars": [{
+                "id": self._account_id(token, f'jar{index}'),
+                "sendId": f"jar/{client_id}{index}",
+                "title": f"Банка {index + 1}",
+                "description": "",
+                "currencyCode": 980,
+                "balance": rnd.randint(0, 1_000_000),
+                "goal": rnd.choice((1_000_000, 5_000_000, 10_000_000)),
+            } for index in range(self.jars)],
+        }
+
+    def statement(self, token: str, account_id: str, from_time: int, to_time: int) -> list[dict]:
+        """
+        The statement function returns all transactions of the account in the period, newest first
+        (without the 500-item cap of the API answer).
+
+        :param token: str: Client token
+        :param account_id: str: Account or jar identifier, 0 for the first account
+        :param from_time: int: Start of the period as a unix timestamp
+        :param to_time: int: End of the period as a unix timestamp
+        :return: A list of statement items as returned by the API
+        """
+        if account_id == '0':
+            account_id = self._account_id(token, 0)
+
+        to_time = min(to_time, int(time.time()))
+        items = [
+            item
+            for day in range(from_time // DAY, to_time // DAY + 1)
+            for item in self._day(token, account_id, day)
+            if from_time <= item['time'] <= to_time
+        ]
+        items += [item for item in self._emitted[account_id] if from_time <= item['time'] <= to_time]
+        items.sort(key=lambda item: (item['time'], item['id']), reverse=True)
+
+        return items
+
+    def _account_id(self, token: str, index) -> str:
+        return hashlib.blake2b(f'{self.seed}:{token}:{index}'.encode(), digest_size=12).hexdigest()
+
+    def _account_ids(self, token: str) -> list[str]:
+        return [self._account_id(token, index) for index in range(self.accounts)] + \
+            [self._account_id(token, f'jar{index}') for index in range(self.jars)]
+
+    def _transaction(self, rnd: random.Random, account_id: str, index: str, at: int) -> dict:
+        mcc, description = rnd.choice(_MERCHANTS)
+        incoming = mcc == 4829 and rnd.random() < 0.5
+        amount = rnd.randint(100, 2_000_000) if incoming else -rnd.randint(100, 300_000)
+
+        return {
+            "id": hashlib.blake2b(f'{account_id}:{index}'.encode(), digest_size=12).hexdigest(),
+            "time": at,
+            "description": description,
+            "mcc": mcc,
+            "originalMcc": mcc,
+            "hold": rnd.random() < 0.05,
+            "amount": amount,
+            "operationAmount": amount,
+            "currencyCode": 980,
+            "commissionRate": 0,
+            "cashbackAmount": 0 if incoming else abs(amount) // 100,
+            "balance": rnd.randint(0, 10_000_000),
+            "comment": rnd.choice(("", "", "", "За каву", "Борг")),
+            "receiptId": "",
+            "invoiceId": "",
+            "counterEdrpou": "",
+            "counterIban": f"UA{rnd.randint(10, 99)}{rnd.randint(0, 10 ** 25 - 1):025d}" if mcc == 4829 else "",
+            "counterName": description if mcc == 4829 else "",
+        }
+
+    def _day(self, token: str, account_id: str, day: int) -> list[dict]:
+        if account_id not in self._account_ids(token):
+            return []
+
+        rnd = _rnd(self.seed, account_id, day)
+        count = rnd.randint(0, 2 * self.transactions_per_day)
+        times = sorted(day * DAY + rnd.randrange(DAY) for _ in range(count))
+
+        return [self._transaction(rnd, account_id, f'{day}:{index}', at) for index, at in enumerate(times)]
+
+    # Webhook events
+
+    async def emit(self, token: str, account_id: Optional[str] = None) -> dict:
+        """
+        The emit function makes a new transaction on the account: it appears in statements and is sent
+        to the webhook of the token, if it is set. Like the API, a delivery not answered with 200 in 5 seconds
+        is repeated after 60 and 600 seconds, after which the webhook is disabled.
+
+        :param token: str: Client token
+        :param account_id: str: Account or jar identifier, the first account by default
+        :return: The new statement item
+        """
+        account_id = account_id or self._account_id(token, 0)
+        index = len(self._emitted[account_id])
+        item = self._transaction(_rnd(self.seed, account_id, 'emitted', index), account_id, f'emitted:{index}',
+                                 int(time.time()))
+        self._emitted[account_id].append(item)
+
+        url = self._webhooks.get(token)
+        if url:
+            asyncio.create_task(self._deliver(token, url, {
+                "type": "StatementItem",
+                "data": {"account": account_id, "statementItem": item},
+            }))
+
+        return item
+
+    async def _deliver(self, token: str, url: str, event: dict) -> None:
+        for delay in (0, 60, 600):
+            await asyncio.sleep(delay)
+            if self._webhooks.get(token) != url:
+                return
+
+            try:
+                async with self._client_session().post(url, json=event, timeout=aiohttp.ClientTimeout(total=5)) as r:
+                    if r.status == HTTPStatus.OK:
+                        return
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                pass
+
+        log.info('Simulator: webhook %s of %s is disabled after three failed deliveries', url, token)
+        self._webhooks.pop(token, None)
+
+    def _client_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+
+        return self._session
+
+    # Handlers
+
+    def _limit(self, key: str, path: str) -> Optional[float]:
+        # Returns seconds to wait when the call is over the limit
+        for prefix, interval in self.limits.items():
+            if path == prefix or path.startswith(prefix + '/'):
+                now = time.monotonic()
+                last = self._last_call.get((key, prefix))
+                if last is not None and now - last < interval:
+                    return interval - (now - last)
+                self._last_call[key, prefix] = now
+                return None
+
+        return None
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        if self.latency or self.latency_jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.latency_jitter))
+
+        path = request.path
+        endpoint = next((prefix for prefix in SIMULATOR_LIMITS if path.startswith(prefix)), path)
+        self.requests[endpoint] += 1
+
+        for index, (failing, status) in enumerate(self._failures):
+            if failing is None or path.startswith(failing):
+                del self._failures[index]
+                return _error(status, HTTPStatus(status).phrase)
+
+        if self.error_rate and self._random.random() < self.error_rate:
+            return _error(self.error_status, HTTPStatus(self.error_status).phrase)
+
+        if path.startswith('/personal/'):
+            token = request.headers.get('X-Token')
+            if not token or (self.tokens is not None and token not in self.tokens):
+                return _error(HTTPStatus.FORBIDDEN, "Unknown 'X-Token'")
+            key = token
+        else:
+            key = request.remote or ''
+
+        if self._limit(key, path) is not None:
+            return _error(HTTPStatus.TOO_MANY_REQUESTS, "Too many requests")
+
+        return await handler(request)
+
+    async def _currency(self, request: web.Request) -> web.Response:
+        now = int(time.time())
+        rnd = _rnd(self.seed, 'currency', now // 300)
+        rates = []
+
+        for code, buy, sell in _CURRENCIES:
+            drift = rnd.uniform(0.99, 1.01)
+            rates.append({"currencyCodeA": code, "currencyCodeB": 980, "date": now - now % 300,
+                          "rateBuy": round(buy * drift, 4), "rateSell": round(sell * drift, 4)})
+        rates.append({"currencyCodeA": 978, "currencyCodeB": 840, "date": now - now % 300,
+                      "rateBuy": 1.075, "rateSell": 1.09})
+        for code in range(8, 1000, 7):
+            rates.append({"currencyCodeA": code, "currencyCodeB": 980, "date": now - now % 86400,
+                          "rateCross": round(_rnd(self.seed, 'cross', code).uniform(0.001, 500), 4)})
+
+        return web.json_response(rates)
+
+    async def _client_info(self, request: web.Request) -> web.Response:
+        return web.json_response(self.client_info(request.headers['X-Token']))
+
+    async def _statement(self, request: web.Request) -> web.Response:
+        token = request.headers['X-Token']
+        account_id = request.match_info['account']
+
+        try:
+            from_time = int(request.match_info['from_time'])
+            to_time = int(request.match_info.get('to_time') or time.time())
+        except ValueError:
+            return _error(HTTPStatus.BAD_REQUEST, "Invalid time format")
+
+        if account_id != '0' and account_id not in self._account_ids(token):
+            return _error(HTTPStatus.BAD_REQUEST, "invalid account")
+
+        if to_time - from_time > STATEMENT_MAX_PERIOD.total_seconds():
+            return _error(HTTPStatus.BAD_REQUEST, "Period must be no more than 31 days")
+
+        items = self.statement(token, account_id, from_time, to_time)
+
+        return web.json_response(items[:STATEMENT_PAGE_LIMIT])
+
+    async def _set_webhook(self, request: web.Request) -> web.Response:
+        token = request.headers['X-Token']
+
+        try:
+            url = (await request.json())['webHookUrl']
+        except (ValueError, KeyError, TypeError):
+            return _error(HTTPStatus.BAD_REQUEST, "Invalid webHookUrl")
+
+        if url:
+            try:
+                # The URL is validated with a GET request that must be answered with exactly 200
+                async with self._client_session().get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    if response.status != HTTPStatus.OK:
+                        return _error(HTTPStatus.BAD_REQUEST, f"webHookUrl answered {response.status}")
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return _error(HTTPStatus.REQUEST_TIMEOUT, "webHookUrl timeout")
+
+            self._webhooks[token] = url
+        else:
+            self._webhooks.pop(token, None)
+
+        return web.json_response({"status": "ok"})
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Local Monobank API simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds every answer is delayed by')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='share of requests answered with 500')
+    parser.add_argument('--no-limits', action='store_true', help='disable rate limiting')
+    args = parser.parse_args()
+
+    simulator = MonobankSimulator(seed=args.seed, latency=args.latency, error_rate=args.error_rate,
+                                  limits={} if args.no_limits else None)
+    web.run_app(simulator.app(), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == '__main__':
+    main()
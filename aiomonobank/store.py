@@ -0,0 +1,208 @@
+import asyncio
+import json
+import logging
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional, Callable, TypeVar
+
+from .monobank import MonoPersonal, STATEMENT_MAX_PERIOD, timestamp
+from .types import Statement
+
+log = logging.getLogger('aiomonobank')
+
+T = TypeVar('T')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS statement (
+    account_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    time INTEGER NOT NULL,
+    hold INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (account_id, id)
+);
+CREATE INDEX IF NOT EXISTS statement_account_time ON statement (account_id, time);
+CREATE TABLE IF NOT EXISTS sync_state (
+    account_id TEXT PRIMARY KEY,
+    synced_to INTEGER NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO statement (account_id, id, time, hold, data) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (account_id, id) DO UPDATE SET time = excluded.time, hold = excluded.hold, data = excluded.data
+"""
+
+
+class StatementStore:
+    """
+    Local SQLite copy of the statements of a MonoPersonal client.
+
+    `sync` fetches only transactions after the end of the last completed sync, plus an overlap to pick up
+    `hold` -> settled changes; `get_statement` answers from the local copy without API calls.
+    Transactions are stored as raw API items keyed by account id and `Statement.id`.
+
+    The end of a sync is recorded only when all its pages were stored, so a sync interrupted by RetryAfter
+    or a network error is repeated from the same point and leaves no gaps.
+    """
+
+    def __init__(self,
+                 client: MonoPersonal,
+                 path: str = ':memory:',
+                 overlap: timedelta = timedelta(days=1),
+                 initial_period: timedelta = STATEMENT_MAX_PERIOD) -> None:
+        """
+        :param client: MonoPersonal: Client used to fetch statements
+        :param path: str: Path to the SQLite database file
+        :param overlap: timedelta: Period before the end of the last sync that is fetched again on every sync
+        :param initial_period: timedelta: Period fetched by the first sync of an account
+        """
+        self.client = client
+        self.overlap = overlap
+        self.initial_period = initial_period
+
+        # sqlite3 connections must not be used concurrently, so all queries go through one thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='aiomonobank-store')
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+
+    async def _run(self, func: Callable[..., T], *args) -> T:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _synced_to(self, account_id: str) -> Optional[int]:
+        row = self._connection.execute(
+            "SELECT synced_to FROM sync_state WHERE account_id = ?", (account_id,)
+        ).fetchone()
+
+        return None if row is None else row[0]
+
+    def _finish(self, account_id: str, from_time: int, to_time: int, fetched_ids: set[str]) -> int:
+        with self._connection:
+            # Holds of the synced period that the API no longer returns were cancelled
+            cancelled = [
+                (account_id, id_) for id_, in self._connection.execute(
+                    "SELECT id FROM statement WHERE account_id = ? AND hold = 1 AND time BETWEEN ? AND ?",
+                    (account_id, from_time, to_time)
+                ) if id_ not in fetched_ids
+            ]
+            self._connection.executemany("DELETE FROM statement WHERE account_id = ? AND id = ?", cancelled)
+            self._connection.execute(
+                "INSERT INTO sync_state (account_id, synced_to) VALUES (?, ?) "
+                "ON CONFLICT (account_id) DO UPDATE SET synced_to = excluded.synced_to",
+                (account_id, to_time)
+            )
+
+        return len(cancelled)
+
+    def _last_time(self, account_id: str) -> Optional[int]:
+        row = self._connection.execute(
+            "SELECT MAX(time) FROM statement WHERE account_id = ?", (account_id,)
+        ).fetchone()
+
+        return row[0]
+
+    def _save(self, account_id: str, items: list[dict]) -> None:
+        with self._connection:
+            self._connection.executemany(_UPSERT, [
+                (account_id, item['id'], item['time'], int(item['hold']), json.dumps(item, ensure_ascii=False))
+                for item in items
+            ])
+
+    def _load(self, account_id: str, from_time: int, to_time: int) -> list[str]:
+        rows = self._connection.execute(
+            "SELECT data FROM statement WHERE account_id = ? AND time BETWEEN ? AND ? ORDER BY time DESC",
+            (account_id, from_time, to_time)
+        )
+
+        return [data for data, in rows]
+
+    async def last_time(self, account_id: str = '0') -> Optional[datetime]:
+        """
+        The last_time function returns the time of the newest stored transaction of the account.
+
+        :param account_id: str: Account or jar identifier
+        :return: UTC time without tzinfo or None if nothing is stored yet
+        """
+        last = await self._run(self._last_time, account_id)
+
+        return None if last is None else datetime.utcfromtimestamp(last)
+
+    async def synced_to(self, account_id: str = '0') -> Optional[datetime]:
+        """
+        The synced_to function returns the end of the last completed sync of the account.
+
+        :param account_id: str: Account or jar identifier
+        :return: UTC time without tzinfo or None if the account was never synced completely
+        """
+        synced_to = await self._run(self._synced_to, account_id)
+
+        return None if synced_to is None else datetime.utcfromtimestamp(synced_to)
+
+    async def sync(self, account_id: str = '0', batch_size: int = 500) -> int:
+        """
+        The sync function fetches the transactions of the account made after the end of the last completed sync
+        (minus the overlap) and stores them, updating transactions that were already stored.
+        Stored holds of the fetched period that the API doesn't return anymore are deleted.
+        The first sync of an account fetches the initial period.
+
+        Pages are stored as they arrive, but the end of the sync is recorded only after the last one:
+        when the sync is interrupted, the next one fetches the same period again.
+
+        :param account_id: str: Account or jar identifier, stored as given (so '0' is kept apart from its real id)
+        :param batch_size: int: Number of transactions written in one database transaction
+        :return: The number of fetched transactions
+        :raise aiomonobank.utils.exceptions.RetryAfter: якщо запити частіше 1 разу в хвилину
+        """
+        synced_to = await self.synced_to(account_id)
+        to_datetime = datetime.utcnow().replace(microsecond=0)
+        from_datetime = to_datetime - self.initial_period if synced_to is None else synced_to - self.overlap
+
+        fetched_ids: set[str] = set()
+        batch: list[dict] = []
+
+        async for item in self.client._iter_statement_items(account_id, from_datetime, to_datetime):  # noqa
+            batch.append(item)
+            fetched_ids.add(item['id'])
+
+            if len(batch) >= batch_size:
+                await self._run(self._save, account_id, batch)
+                batch = []
+
+        if batch:
+            await self._run(self._save, account_id, batch)
+
+        cancelled = await self._run(
+            self._finish, account_id, await timestamp(from_datetime), await timestamp(to_datetime), fetched_ids
+        )
+        if cancelled:
+            log.info('Deleted %d cancelled holds of %s', cancelled, account_id)
+
+        return len(fetched_ids)
+
+    async def get_statement(self,
+                            account_id: str = '0',
+                            from_datetime: datetime = None,
+                            to_datetime: datetime = None) -> list[Statement]:
+        """
+        The get_statement function returns stored transactions of the account, newest first.
+        Unlike MonoPersonal.get_statement the period is not limited.
+
+        :param account_id: str: Account or jar identifier
+        :param from_datetime: datetime: Start of the period (UTC), everything stored if not set
+        :param to_datetime: datetime: End of the period (UTC), everything stored if not set
+        :return: A list of statement objects
+        """
+        from_time = await timestamp(from_datetime) if from_datetime else 0
+        to_time = await timestamp(to_datetime) if to_datetime else 2 ** 63 - 1
+
+        rows = await self._run(self._load, account_id, from_time, to_time)
+
+        return [self.client.decoder.statement(json.loads(data)) for data in rows]
+
+    async def close(self) -> None:
+        """
+        Close the database connection
+        """
+        await self._run(self._connection.close)
+        self._executor.shutdown()
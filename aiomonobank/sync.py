@@ -0,0 +1,294 @@
+"""
+Blocking facade of the client for threaded code (WSGI apps, scripts, notebooks).
+
+One background thread runs an event loop with a MonoPersonalPool, and calls from any thread are executed
+in that loop, so all of them share one session and its keep-alive connections:
+
+    mono = SyncMonobank()
+
+    def view(request):
+        client = mono.client(request.user.monobank_token)
+        return client.get_client_info()
+
+Methods of the returned clients are the methods of MonoPersonal without `await`; async iterators
+(iter_statement, stream_statement) become plain iterators.
+"""
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar, TYPE_CHECKING
+
+from .api import MonobankAPIServer, MONOBANK_PRODUCTION
+from .decoders import BaseDecoder
+from .metrics import RequestObserver
+from .policy import RequestPolicy, DEFAULT_POLICY
+from .pool import MonoPersonalPool
+from .scheduler import RateScheduler
+
+if TYPE_CHECKING:
+    from .converter import CurrencyConverter
+    from .types import Currency
+
+log = logging.getLogger('aiomonobank')
+
+T = TypeVar('T')
+
+
+async def _await(awaitable: Awaitable[T]) -> T:
+    return await awaitable
+
+
+class BackgroundLoop:
+    """
+    Event loop running in a daemon thread. Coroutines are submitted from other threads and their results
+    are waited for in the calling thread.
+    """
+
+    def __init__(self, name: str = 'aiomonobank-loop') -> None:
+        """
+        :param name: str: Name of the thread
+        """
+        self.name = name
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """
+        The start function starts the thread of the loop, once.
+
+        :return: The running event loop
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self.loop = asyncio.new_event_loop()
+                started = threading.Event()
+                self._thread = threading.Thread(target=self._run, args=(started,), name=self.name, daemon=True)
+                self._thread.start()
+                started.wait()
+
+        return self.loop
+
+    def _run(self, started: threading.Event) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(started.set)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
+
+    def run(self, awaitable: Awaitable[T], timeout: Optional[float] = None) -> T:
+        """
+        The run function executes an awaitable in the loop and blocks the calling thread until it is done.
+
+        :param awaitable: Awaitable: Coroutine to execute
+        :param timeout: float: Seconds to wait, the coroutine is cancelled after that
+        :return: The result of the coroutine
+        :raise TimeoutError: when the timeout expires
+        """
+        loop = self.start()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Blocking calls can't be made from the background loop itself, await the client")
+
+        future = asyncio.run_coroutine_threadsafe(_await(awaitable), loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Timeout or KeyboardInterrupt of the calling thread
+            future.cancel()
+            raise
+
+    def iterate(self, iterator: AsyncIterator[T], timeout: Optional[float] = None) -> Iterator[T]:
+        """
+        The iterate function turns an async iterator into a blocking one, each step runs in the loop.
+
+        :param iterator: AsyncIterator: Async iterator to consume
+        :param timeout: float: Seconds to wait for each item
+        :return: An iterator over the same items
+        """
+        try:
+            while True:
+                try:
+                    yield self.run(iterator.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+        finally:
+            if hasattr(iterator, 'aclose'):
+                self.run(iterator.aclose(), timeout)
+
+    def stop(self) -> None:
+        """
+        Stop the loop and wait for its thread
+        """
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                return
+
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            if threading.current_thread() is not self._thread:
+                self._thread.join()
+            self._thread = None
+
+
+class SyncClient:
+    """
+    Blocking proxy of an async client: coroutine methods return their results, async generator methods
+    return iterators, other attributes are returned as they are.
+    """
+
+    def __init__(self, client: Any, loop: BackgroundLoop, timeout: Optional[float] = None) -> None:
+        self._client = client
+        self._loop = loop
+        self._timeout = timeout
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._client, name)
+
+        if inspect.iscoroutinefunction(attribute):
+            @functools.wraps(attribute)
+            def call(*args, **kwargs) -> Any:
+                return self._loop.run(attribute(*args, **kwargs), self._timeout)
+        elif inspect.isasyncgenfunction(attribute):
+            @functools.wraps(attribute)
+            def call(*args, **kwargs) -> Iterator[Any]:
+                return self._loop.iterate(attribute(*args, **kwargs), self._timeout)
+        else:
+            return attribute
+
+        # Wrappers are created once per method
+        setattr(self, name, call)
+        return call
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._client!r})"
+
+
+class SyncMonobank:
+    """
+    Thread-safe blocking client. All clients share the session of one MonoPersonalPool in a background loop,
+    so connections and DNS answers are reused by calls from every thread.
+    """
+
+    def __init__(self,
+                 connections_limit: int = 100,
+                 server: MonobankAPIServer = MONOBANK_PRODUCTION,
+                 scheduler: Optional[RateScheduler] = None,
+                 decoder: Optional[BaseDecoder] = None,
+                 policy: RequestPolicy = DEFAULT_POLICY,
+                 observer: Optional[RequestObserver] = None,
+                 timeout: Optional[float] = None) -> None:
+        """
+        :param connections_limit: int: Maximum number of simultaneous connections and requests in flight
+        :param server: MonobankAPIServer: Monobank API Server endpoint.
+        :param scheduler: RateScheduler: queue requests within the API rate limits instead of raising RetryAfter
+        :param decoder: BaseDecoder: builds the returned objects from responses, pydantic models by default
+        :param policy: RequestPolicy: timeouts and retries of requests
+        :param observer: RequestObserver: receives phase durations, status and size of every request
+        :param timeout: float: Seconds a blocking call waits for its result, None waits as long as the policy allows
+        """
+        self.timeout = timeout
+        self.background = BackgroundLoop()
+        # The pool is created on first use by the calling thread;
+        # its session is opened by the first request, in the background loop
+        self._pool: Optional[MonoPersonalPool] = None
+        self._pool_settings = dict(
+            connections_limit=connections_limit,
+            server=server,
+            scheduler=scheduler,
+            decoder=decoder,
+            policy=policy,
+            observer=observer
+        )
+        self._clients: dict[str, SyncClient] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pool(self) -> MonoPersonalPool:
+        """
+        The pool serving all clients; it must only be used in the background loop
+        """
+        with self._lock:
+            if self._pool is None:
+                self._pool = MonoPersonalPool(**self._pool_settings)
+
+            return self._pool
+
+    def client(self, token: str, validate_token: Optional[bool] = True) -> SyncClient:
+        """
+        The client function returns the blocking client of the token, created once per token.
+
+        :param token: str: token from https://api.monobank.ua/
+        :param validate_token: bool: Check the token before creating the client
+        :return: A SyncClient with the methods of MonoPersonal
+        :raise aiomonobank.utils.exceptions.ValidationError: when the token is invalid
+        """
+        client = self._clients.get(token)
+
+        if client is None:
+            pool = self.pool
+            with self._lock:
+                client = self._clients.get(token)
+                if client is None:
+                    client = self._clients[token] = SyncClient(
+                        pool.client(token, validate_token=validate_token), self.background, self.timeout
+                    )
+
+        return client
+
+    def remove(self, token: str) -> None:
+        """
+        The remove function forgets the client of the token, e.g. when the customer revoked it.
+
+        :param token: str: token from https://api.monobank.ua/
+        """
+        with self._lock:
+            self._clients.pop(token, None)
+            if self._pool is not None:
+                self._pool.remove(token)
+
+    def get_currency(self) -> list['Currency']:
+        """
+        The get_currency function returns the public exchange rates, see MonoPublic.get_currency.
+
+        :return: A list of currency objects
+        """
+        return self.client('', validate_token=False).get_currency()
+
+    def get_converter(self) -> 'CurrencyConverter':
+        """
+        The get_converter function returns a converter for the public exchange rates, see MonoPublic.get_converter.
+
+        :return: A currency converter
+        """
+        return self.client('', validate_token=False).get_converter()
+
+    def run(self, awaitable: Awaitable[T]) -> T:
+        """
+        The run function executes any coroutine in the background loop, e.g. one that uses several clients
+        of the pool at once.
+
+        :param awaitable: Awaitable: Coroutine to execute
+        :return: The result of the coroutine
+        """
+        return self.background.run(awaitable, self.timeout)
+
+    def close(self) -> None:
+        """
+        Close the session and stop the background loop
+        """
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._clients.clear()
+
+        if pool is not None and self.background.loop is not None and self.background.loop.is_running():
+            self.background.run(pool.close())
+        self.background.stop()
+
+    def __enter__(self) -> 'SyncMonobank':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
@@ -1,9 +1,25 @@
-from .currency import Currency
-from .client_info import Client
-from .account import Account
-from .jar import Jar
-from .statement_item import Statement
-from .webhook_data import WebhookData
+"""
+Models of the API objects. Every model is imported on first access, so pydantic builds only the models in use.
+"""
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .currency import Currency
+    from .client_info import Client
+    from .account import Account
+    from .jar import Jar
+    from .statement_item import Statement
+    from .webhook_data import WebhookData
+
+_MODULES = {
+    'Currency': '.currency',
+    'Client': '.client_info',
+    'Account': '.account',
+    'Jar': '.jar',
+    'Statement': '.statement_item',
+    'WebhookData': '.webhook_data',
+}
 
 __all__ = [
     'Currency',
@@ -13,3 +29,18 @@ __all__ = [
     'Statement',
     'WebhookData'
 ]
+
+
+def __getattr__(name: str):
+    module = _MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
@@ -21,6 +21,6 @@ class Client(BaseModel):
 
     class Config:
         fields = {
-            'client_id': 'clientId',
-            'web_hook_url': 'webHookUrl',
+            'id': 'clientId',
+            'webhook_url': 'webHookUrl',
         }
@@ -1,6 +1,6 @@
 from datetime import datetime
+from typing import Optional
 
-import pytz
 from pydantic import BaseModel
 
 
@@ -13,9 +13,12 @@ class Currency(BaseModel):
     """Код валюти рахунку відповідно ISO 4217"""
     date: datetime
     """Час курсу в форматі UTC time"""
-    rate_sell: float
-    rate_buy: float
-    rate_cross: float
+    rate_sell: Optional[float]
+    """Курс продажу валюти A за валюту B (відсутній для крос-курсів)"""
+    rate_buy: Optional[float]
+    """Курс купівлі валюти A за валюту B (відсутній для крос-курсів)"""
+    rate_cross: Optional[float]
+    """Крос-курс (присутній, якщо немає курсів купівлі та продажу)"""
 
     def get_time_for_timezone(self, timezone: str = 'Europe/Kyiv'):
         """
@@ -25,6 +28,8 @@ class Currency(BaseModel):
         :param timezone: str: Set the default timezone
         :return: The current time in the specified time zone
         """
+        import pytz
+
         return self.date.astimezone(pytz.timezone(timezone))
 
     class Config:
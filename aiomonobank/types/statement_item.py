@@ -1,7 +1,6 @@
 from datetime import datetime
 from typing import Optional
 
-import pytz
 from pydantic import BaseModel, validator
 
 
@@ -56,6 +55,8 @@ class Statement(BaseModel):
         :param timezone: str: Set the default timezone
         :return: The current time in the specified time zone
         """
+        import pytz
+
         return self.time.astimezone(pytz.timezone(timezone))
 
     class Config:
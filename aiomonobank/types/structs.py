@@ -0,0 +1,70 @@
+"""
+msgspec counterparts of the pydantic models, used by :class:`aiomonobank.decoders.MsgspecDecoder`.
+
+Values are kept as the API sends them: sums in minimal currency units (kopiykas, cents)
+and times as unix timestamps in seconds.
+"""
+from typing import Optional
+
+import msgspec
+
+
+class StatementStruct(msgspec.Struct, rename='camel', frozen=True):
+    id: str
+    time: int
+    description: str
+    mcc: int
+    original_mcc: int
+    hold: bool
+    amount: int
+    operation_amount: int
+    currency_code: int
+    commission_rate: int
+    cashback_amount: int
+    balance: int
+    comment: Optional[str] = None
+    receipt_id: Optional[str] = None
+    invoice_id: Optional[str] = None
+    counter_edrpou: Optional[str] = None
+    counter_iban: Optional[str] = None
+    counter_name: Optional[str] = None
+
+
+class AccountStruct(msgspec.Struct, rename='camel', frozen=True):
+    id: str
+    send_id: str
+    balance: int
+    credit_limit: int
+    type: str
+    currency_code: int
+    iban: str
+    masked_pan: list[str] = []
+    cashback_type: Optional[str] = None
+
+
+class JarStruct(msgspec.Struct, rename='camel', frozen=True):
+    id: str
+    send_id: str
+    title: str
+    description: str
+    currency_code: int
+    balance: int
+    goal: Optional[int] = None
+
+
+class ClientStruct(msgspec.Struct, frozen=True):
+    id: str = msgspec.field(name='clientId')
+    name: str
+    webhook_url: str = msgspec.field(name='webHookUrl')
+    permissions: str
+    accounts: list[AccountStruct]
+    jars: list[JarStruct] = []
+
+
+class CurrencyStruct(msgspec.Struct, rename='camel', frozen=True):
+    currency_code_a: int
+    currency_code_b: int
+    date: int
+    rate_sell: Optional[float] = None
+    rate_buy: Optional[float] = None
+    rate_cross: Optional[float] = None
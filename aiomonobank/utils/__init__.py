@@ -6,7 +6,9 @@ from .exceptions import (
     InvalidToken,
     WebhookUrlError,
     NetworkError,
+    ServerError,
     ValidationError,
+    UnknownCurrencyPair,
 )
 
 
@@ -18,5 +20,7 @@ __all__ = [
     'InvalidToken',
     'WebhookUrlError',
     'NetworkError',
-    'ValidationError'
+    'ServerError',
+    'ValidationError',
+    'UnknownCurrencyPair',
 ]
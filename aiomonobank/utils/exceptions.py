@@ -9,6 +9,8 @@
     - RetryAfter
     - WebhookUrlError
     - NetworkError
+    - ServerError
+    - UnknownCurrencyPair
 """
 
 
@@ -89,3 +91,11 @@ class WebhookUrlError(MonobankError):
 
 class NetworkError(MonobankError):
     pass
+
+
+class ServerError(MonobankError):
+    pass
+
+
+class UnknownCurrencyPair(MonobankError):
+    pass
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+from http import HTTPStatus
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import web
+
+from .decoders import json_loads
+from .dedup import WebhookDeduplicator
+from .types import WebhookData
+
+log = logging.getLogger('aiomonobank')
+
+WebhookHandler = Callable[[list[WebhookData]], Awaitable[None]]
+
+
+class WebhookReceiver:
+    """
+    aiohttp receiver of Monobank webhook events.
+
+    POST requests are acknowledged as soon as the body is read and put on a bounded queue: Monobank waits
+    only 5 seconds for the answer and disables the webhook after three failed attempts. Worker tasks
+    parse the queued bodies into WebhookData and pass them to the registered handlers in batches.
+
+    When the queue stays full for `ack_timeout` seconds the event is answered with 503,
+    so Monobank delivers it again later (after 60 and 600 seconds). With a deduplicator, repeated
+    deliveries are dropped before the model is built.
+    """
+
+    def __init__(self,
+                 queue_size: int = 10_000,
+                 workers: int = 4,
+                 batch_size: int = 100,
+                 batch_timeout: float = 0.05,
+                 ack_timeout: float = 4.0,
+                 dedup: Optional[WebhookDeduplicator] = None) -> None:
+        """
+        :param queue_size: int: Maximum number of events waiting for the handlers
+        :param workers: int: Number of worker tasks calling the handlers
+        :param batch_size: int: Maximum number of events passed to a handler at once
+        :param batch_timeout: float: Seconds a worker waits to fill up a batch
+        :param ack_timeout: float: Seconds a request waits for a place in a full queue before answering 503
+        :param dedup: WebhookDeduplicator: Drops events that were already received
+        """
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.ack_timeout = ack_timeout
+        self.dedup = dedup
+
+        self._queue_size = queue_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._handlers: list[WebhookHandler] = []
+        self._tasks: list[asyncio.Task] = []
+
+    @property
+    def queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(self._queue_size)
+
+        return self._queue
+
+    def handler(self, func: WebhookHandler) -> WebhookHandler:
+        """
+        Register a coroutine function that receives batches of events, usable as a decorator:
+
+            @receiver.handler
+            async def save(events: list[WebhookData]) -> None:
+                ...
+        """
+        self._handlers.append(func)
+        return func
+
+    def app(self, path: str = '/') -> web.Application:
+        """
+        The app function creates an aiohttp application that receives events on the path.
+        It can be run as is or added to another application with add_subapp.
+
+        :param path: str: Path of the webhook URL, a secret part in it protects from fake events
+        :return: An aiohttp application
+        """
+        app = web.Application()
+        self.setup(app, path)
+
+        return app
+
+    def setup(self, app: web.Application, path: str = '/') -> None:
+        """
+        The setup function adds the webhook routes to an existing application
+        and starts/stops the workers together with it.
+
+        :param app: web.Application: Application to add the routes to
+        :param path: str: Path of the webhook URL
+        """
+        app.router.add_get(path, self._check_url)
+        app.router.add_post(path, self._receive)
+        app.on_startup.append(self._on_startup)
+        app.on_cleanup.append(self._on_cleanup)
+
+    async def _on_startup(self, app: web.Application) -> None:
+        await self.start()
+
+    async def _on_cleanup(self, app: web.Application) -> None:
+        await self.stop()
+
+    async def start(self) -> None:
+        """
+        Start the worker tasks
+        """
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """
+        Let the workers handle the queued events and stop them
+
+        :param timeout: float: Seconds to wait for the queue to drain
+        """
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            log.warning('Webhook receiver stopped with %d unhandled events', self.queue.qsize())
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def put(self, body: bytes | WebhookData) -> None:
+        """
+        The put function queues an event as if it was received, e.g. a transaction fetched by other means.
+
+        :param body: bytes | WebhookData: Raw request body or a parsed event
+        """
+        await self.queue.put(body)
+
+    async def _check_url(self, request: web.Request) -> web.Response:
+        # Monobank checks the URL with a GET request before sending events to it
+        return web.Response(status=HTTPStatus.OK)
+
+    async def _receive(self, request: web.Request) -> web.Response:
+        body = await request.read()
+
+        try:
+            self.queue.put_nowait(body)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self.queue.put(body), self.ack_timeout)
+            except asyncio.TimeoutError:
+                log.warning('Webhook queue is full, the event is left for redelivery')
+                return web.Response(status=HTTPStatus.SERVICE_UNAVAILABLE)
+
+        return web.Response(status=HTTPStatus.OK)
+
+    async def _next_batch(self) -> list:
+        batch = [await self.queue.get()]
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.batch_timeout
+
+        while len(batch) < self.batch_size:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def parse(self, body: bytes | WebhookData) -> Optional[WebhookData]:
+        """
+        The parse function builds the event from the request body.
+        Duplicates are recognized on the parsed JSON, before the model is built.
+
+        :param body: bytes | WebhookData: Raw request body or an already parsed event
+        :return: The event or None if it can't be parsed or is a duplicate
+        """
+        if isinstance(body, WebhookData):
+            if self.dedup is not None and await self.dedup.is_duplicate(body):
+                return None
+
+            return body
+
+        try:
+            data = json_loads(body)
+
+            if self.dedup is not None and await self.dedup.is_duplicate(data):
+                return None
+
+            return WebhookData(**data)
+        except (ValueError, TypeError) as e:
+            log.warning('Invalid webhook event %r: %s', body[:200], e)
+            return None
+
+    async def _work(self) -> None:
+        while True:
+            batch = await self._next_batch()
+
+            try:
+                events = []
+                for body in batch:
+                    try:
+                        event = await self.parse(body)
+                    except Exception:  # noqa
+                        # A dead worker would leave the acknowledged events in the queue for good
+                        log.exception('Webhook event %r failed', body[:200] if isinstance(body, bytes) else body)
+                        continue
+
+                    if event is not None:
+                        events.append(event)
+
+                if events:
+                    for handler in self._handlers:
+                        try:
+                            await handler(events)
+                        except Exception:  # noqa
+                            log.exception('Webhook handler %r failed', handler)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
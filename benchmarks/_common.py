@@ -0,0 +1,54 @@
+"""
+Helpers shared by the benchmark scripts.
+
+Every benchmark module has a `run(number)` function returning a list of results:
+{'benchmark': ..., 'variant': ..., 'value': ..., 'unit': ...} and optional extra keys.
+"""
+import argparse
+import json
+import statistics
+import sys
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def percentiles(samples: list[float]) -> dict[str, float]:
+    samples = sorted(samples)
+    quantiles = statistics.quantiles(samples, n=100, method='inclusive') if len(samples) > 1 else samples * 99
+
+    return {'p50': quantiles[49], 'p95': quantiles[94], 'p99': quantiles[98]}
+
+
+def format_result(result: dict) -> str:
+    value = result['value']
+    unit = result['unit']
+    if unit == 's':
+        text = f'{value * 1000:12.3f} ms'
+    elif unit == 'bytes':
+        text = f'{value / 1024 / 1024:12.1f} MiB'
+    else:
+        text = f'{value:12.0f} {unit}'
+
+    line = f"{result['benchmark']:<28} {result['variant']:<10} {text}"
+    if 'speedup' in result:
+        line += f"  x{result['speedup']:.1f}"
+
+    return line
+
+
+def main(description: str, run: Callable[[int], list[dict]], number: int = 20) -> None:
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--json', action='store_true', help='print machine-readable results')
+    parser.add_argument('--number', type=int, default=number, help='repetitions per measurement')
+    args = parser.parse_args()
+
+    results = run(args.number)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for result in results:
+        print(format_result(result))
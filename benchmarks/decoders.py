@@ -0,0 +1,89 @@
+"""
+Decoding throughput of API responses: response bytes -> returned objects.
+
+`baseline` is the pipeline before decoders were added: bytes -> str -> json.loads -> pydantic models.
+
+`check_result` rows measure the whole response check the client runs: content type, status and decoding.
+
+Usage: python benchmarks/decoders.py [--json]
+"""
+import json
+import timeit
+
+from _common import main
+from payloads import statement_payload, client_payload, currency_payload
+
+from aiomonobank import api
+from aiomonobank.decoders import PydanticDecoder, RawDecoder, MsgspecDecoder
+from aiomonobank.types import Statement, Client, Currency
+
+
+def _baseline():
+    return {
+        'statement': lambda body: [Statement(**item) for item in json.loads(body.decode())],
+        'client': lambda body: Client(**json.loads(body.decode())),
+        'currency': lambda body: [Currency(**item) for item in json.loads(body.decode())],
+    }
+
+
+def _decoder(decoder):
+    return {
+        'statement': decoder.statement_list,
+        'client': decoder.client,
+        'currency': decoder.currency_list,
+    }
+
+
+def run(number: int = 20) -> list[dict]:
+    payloads = {
+        'statement': statement_payload(),
+        'client': client_payload(),
+        'currency': currency_payload(),
+    }
+    variants = {
+        'baseline': _baseline(),
+        'pydantic': _decoder(PydanticDecoder()),
+        'raw': _decoder(RawDecoder()),
+    }
+    try:
+        variants['msgspec'] = _decoder(MsgspecDecoder())
+    except ImportError:
+        pass
+
+    results = []
+    for kind, body in payloads.items():
+        baseline = None
+        for name, funcs in variants.items():
+            best = min(timeit.repeat(lambda: funcs[kind](body), number=number, repeat=5)) / number
+            baseline = baseline or best
+            results.append({
+                'benchmark': f'decode.{kind}',
+                'variant': name,
+                'value': best,
+                'unit': 's',
+                'bytes': len(body),
+                'speedup': baseline / best,
+            })
+
+    body = payloads['statement']
+    items = len(json.loads(body))
+    for name in ('pydantic', 'msgspec'):
+        if name not in variants:
+            continue
+        decode = variants[name]['statement']
+        best = min(timeit.repeat(
+            lambda: api.check_result('/personal/statement', 'application/json', 200, body, decode),
+            number=number, repeat=5
+        )) / number
+        results.append({
+            'benchmark': 'check_result.statement',
+            'variant': name,
+            'value': items / best,
+            'unit': 'items/s',
+        })
+
+    return results
+
+
+if __name__ == '__main__':
+    main(__doc__, run)
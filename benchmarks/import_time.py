@@ -0,0 +1,87 @@
+"""
+Import cost of aiomonobank in a fresh interpreter, checked against a budget.
+
+`import aiomonobank` must not load aiohttp, pydantic or any optional dependency; touching MonoPublic
+may load aiohttp but still no models, numpy, msgspec or pytz until they are used. Exits with status 1
+when a budget is exceeded or a heavy module is loaded, so it can run in CI.
+
+Usage: python benchmarks/import_time.py [--json] [--number N]
+"""
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+from _common import main
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = {
+    # name: (statement, budget in seconds, modules that must stay unloaded)
+    'import': ('import aiomonobank', 0.05,
+               ('aiohttp', 'pydantic', 'numpy', 'msgspec', 'pytz', 'orjson', 'sqlite3', 'aiomonobank.types.currency')),
+    'MonoPublic': ('import aiomonobank; aiomonobank.MonoPublic', 0.5,
+                   ('pydantic', 'numpy', 'msgspec', 'pytz', 'sqlite3', 'aiohttp.web')),
+}
+
+_PROBE = '''
+import json, sys, time
+baseline = set(sys.modules)
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "modules": sorted(set(sys.modules) - baseline)}}))
+'''
+
+
+def _probe(statement: str) -> dict:
+    output = subprocess.run([sys.executable, '-c', _PROBE.format(statement=statement)],
+                            cwd=ROOT, check=True, capture_output=True, text=True).stdout
+
+    return json.loads(output)
+
+
+def run(number: int = 5) -> list[dict]:
+    results = []
+    for name, (statement, budget, forbidden) in SCENARIOS.items():
+        probes = [_probe(statement) for _ in range(number)]
+        loaded = {module for probe in probes for module in probe['modules']}
+        results.append({
+            'benchmark': f'import_time.{name}',
+            'variant': 'cold',
+            'value': statistics.median(probe['seconds'] for probe in probes),
+            'unit': 's',
+            'budget': budget,
+            'unexpected_modules': sorted({
+                name for name in forbidden for module in loaded if module == name or module.startswith(name + '.')
+            }),
+        })
+
+    return results
+
+
+def check(results: list[dict]) -> bool:
+    ok = True
+    for result in results:
+        if result['value'] > result['budget']:
+            print(f"{result['benchmark']}: {result['value'] * 1000:.1f} ms is over the budget "
+                  f"of {result['budget'] * 1000:.0f} ms", file=sys.stderr)
+            ok = False
+        if result['unexpected_modules']:
+            print(f"{result['benchmark']}: loads {', '.join(result['unexpected_modules'])}", file=sys.stderr)
+            ok = False
+
+    return ok
+
+
+def _run_and_check(number: int) -> list[dict]:
+    results = run(number)
+    if not check(results):
+        sys.exit(1)
+
+    return results
+
+
+if __name__ == '__main__':
+    main(__doc__, _run_and_check, number=5)
@@ -0,0 +1,64 @@
+"""
+Memory held by 100 000 statement items in each representation, measured with tracemalloc
+(the parsed objects only, without the response bodies).
+
+Usage: python benchmarks/memory.py [--json] [--number N]
+"""
+import gc
+import json
+import tracemalloc
+
+from _common import main
+from payloads import statement_payload
+
+from aiomonobank.decoders import PydanticDecoder, RawDecoder, MsgspecDecoder
+
+PAGE = 500
+
+
+def _measure(build) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        result = build()
+        gc.collect()
+        size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    del result
+    return size
+
+
+def run(number: int = 100_000) -> list[dict]:
+    pages = [statement_payload(PAGE, seed) for seed in range(number // PAGE)]
+
+    variants = {
+        'raw': lambda: [item for body in pages for item in RawDecoder().statement_list(body)],
+        'pydantic': lambda: [item for body in pages for item in PydanticDecoder().statement_list(body)],
+    }
+    try:
+        decoder = MsgspecDecoder()
+        variants['msgspec'] = lambda: [item for body in pages for item in decoder.statement_list(body)]
+    except ImportError:
+        pass
+    try:
+        from aiomonobank.batch import StatementBatch
+
+        variants['batch'] = lambda: StatementBatch.concat(
+            [StatementBatch.from_items(json.loads(body)) for body in pages]
+        )
+    except ImportError:
+        pass
+
+    return [{
+        'benchmark': 'memory.statement',
+        'variant': name,
+        'value': _measure(build),
+        'unit': 'bytes',
+        'items': len(pages) * PAGE,
+    } for name, build in variants.items()]
+
+
+if __name__ == '__main__':
+    main(__doc__, run, number=100_000)
@@ -0,0 +1,85 @@
+"""
+Synthetic API payloads shared by the benchmarks. Generation is deterministic for a given seed.
+"""
+import json
+import random
+
+
+def statement_item(rnd: random.Random, index: int, now: int = 1_700_000_000) -> dict:
+    amount = -rnd.randint(100, 500_000)
+
+    return {
+        "id": f"ZuHWzqkKGVo={index:08d}",
+        "time": now - index * 600,
+        "description": rnd.choice(["Сільпо", "АТБ", "Нова пошта", "Uber", "Від: Тарас П."]),
+        "mcc": rnd.choice([5411, 5812, 4121, 4829]),
+        "originalMcc": rnd.choice([5411, 5812, 4121, 4829]),
+        "hold": rnd.random() < 0.1,
+        "amount": amount,
+        "operationAmount": amount,
+        "currencyCode": 980,
+        "commissionRate": 0,
+        "cashbackAmount": rnd.randint(0, 1000),
+        "balance": rnd.randint(0, 10_000_000),
+        "comment": "За каву",
+        "receiptId": "XXXX-XXXX-XXXX-XXXX",
+        "counterIban": "UA898999980000355639201001404",
+        "counterName": "ТОВАРИСТВО З ОБМЕЖЕНОЮ ВІДПОВІДАЛЬНІСТЮ «ВОРОНА»",
+    }
+
+
+def statement_payload(size: int = 500, seed: int = 1) -> bytes:
+    rnd = random.Random(seed)
+
+    return json.dumps([statement_item(rnd, i) for i in range(size)], ensure_ascii=False).encode()
+
+
+def client_payload(accounts: int = 10, jars: int = 10) -> bytes:
+    return json.dumps({
+        "clientId": "3MSaMMtczs",
+        "name": "Мазепа Іван",
+        "webHookUrl": "https://example.com/some_random_data_for_security",
+        "permissions": "psfj",
+        "accounts": [{
+            "id": f"kKGVoZuHWzqVoZuH{i}",
+            "sendId": "uHWzqVoZu",
+            "balance": 10000000,
+            "creditLimit": 10000000,
+            "type": "black",
+            "currencyCode": 980,
+            "cashbackType": "UAH",
+            "maskedPan": ["537541******1234"],
+            "iban": "UA733220010000026201234567890",
+        } for i in range(accounts)],
+        "jars": [{
+            "id": f"kKGVoZuHWzqVoZuH{i}",
+            "sendId": "uHWzqVoZu",
+            "title": "На тепловізор",
+            "description": "На тепловізор",
+            "currencyCode": 980,
+            "balance": 1000000,
+            "goal": 10000000,
+        } for i in range(jars)],
+    }, ensure_ascii=False).encode()
+
+
+def currency_payload(size: int = 160, seed: int = 1) -> bytes:
+    rnd = random.Random(seed)
+    items = []
+
+    for i in range(size):
+        item = {"currencyCodeA": 1 + i, "currencyCodeB": 980, "date": 1_700_000_000}
+        if i % 4 == 0:
+            item.update(rateBuy=rnd.uniform(1, 50), rateSell=rnd.uniform(1, 50))
+        else:
+            item.update(rateCross=rnd.uniform(0.001, 500))
+        items.append(item)
+
+    return json.dumps(items).encode()
+
+
+def webhook_event(rnd: random.Random, index: int, account_id: str = "kKGVoZuHWzqVoZuH0") -> bytes:
+    return json.dumps({
+        "type": "StatementItem",
+        "data": {"account": account_id, "statementItem": statement_item(rnd, index)},
+    }, ensure_ascii=False).encode()
@@ -0,0 +1,65 @@
+"""
+End-to-end latency of client calls against a local stand-in server: request, response check and decoding.
+The network is loopback, so the numbers show the overhead of the client itself.
+
+Usage: python benchmarks/request.py [--json] [--number N]
+"""
+import asyncio
+import time
+
+from _common import main, percentiles
+from server import StandInServer
+
+from aiomonobank import MonoPersonal
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.decoders import PydanticDecoder, MsgspecDecoder
+
+
+async def _measure(client: MonoPersonal, call, number: int) -> list[float]:
+    await call(client)  # opens the connection
+
+    samples = []
+    for _ in range(number):
+        started = time.perf_counter()
+        await call(client)
+        samples.append(time.perf_counter() - started)
+
+    return samples
+
+
+async def _run(number: int) -> list[dict]:
+    decoders = {'pydantic': PydanticDecoder()}
+    try:
+        decoders['msgspec'] = MsgspecDecoder()
+    except ImportError:
+        pass
+
+    calls = {
+        'get_statement': lambda client: client.get_statement(),
+        'get_client_info': lambda client: client.get_client_info(),
+    }
+
+    results = []
+    async with StandInServer() as server:
+        for name, decoder in decoders.items():
+            async with MonoPersonal('benchmark', validate_token=False, decoder=decoder,
+                                    server=MonobankAPIServer.from_base(server.url)) as client:
+                for call_name, call in calls.items():
+                    samples = await _measure(client, call, number)
+                    for percentile, value in percentiles(samples).items():
+                        results.append({
+                            'benchmark': f'request.{call_name}.{percentile}',
+                            'variant': name,
+                            'value': value,
+                            'unit': 's',
+                        })
+
+    return results
+
+
+def run(number: int = 200) -> list[dict]:
+    return asyncio.run(_run(number))
+
+
+if __name__ == '__main__':
+    main(__doc__, run, number=200)
@@ -0,0 +1,74 @@
+"""
+Run all benchmarks and save the results as JSON, optionally comparing them with an earlier run.
+
+Usage: python benchmarks/run.py [--output results.json] [--compare old.json] [--only decoders,request]
+"""
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+
+from _common import format_result
+
+import aiomonobank
+
+SUITES = ('import_time', 'decoders', 'request', 'webhook', 'memory')
+
+# Units where a bigger value is better, for the comparison
+HIGHER_IS_BETTER = {'items/s', 'events/s'}
+
+
+def metadata() -> dict:
+    return {
+        'aiomonobank': aiomonobank.__version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+    }
+
+
+def compare(results: list[dict], old: list[dict]) -> None:
+    previous = {(result['benchmark'], result['variant']): result['value'] for result in old}
+
+    for result in results:
+        before = previous.get((result['benchmark'], result['variant']))
+        line = format_result(result)
+        if before:
+            ratio = result['value'] / before
+            if result['unit'] not in HIGHER_IS_BETTER:
+                ratio = 1 / ratio if ratio else float('inf')
+            line += f'  {ratio:5.2f}x vs old'
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--output', help='file to save the results to')
+    parser.add_argument('--compare', help='results of an earlier run, ratios above 1 are improvements')
+    parser.add_argument('--only', help='comma-separated suites to run: ' + ', '.join(SUITES))
+    args = parser.parse_args()
+
+    suites = args.only.split(',') if args.only else SUITES
+    results = []
+    for name in suites:
+        module = __import__(name)
+        print(f'Running {name}...', file=sys.stderr)
+        results += module.run()
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump({'metadata': metadata(), 'results': results}, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file)['results'])
+    else:
+        for result in results:
+            print(format_result(result))
+
+
+if __name__ == '__main__':
+    main()
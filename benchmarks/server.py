@@ -0,0 +1,52 @@
+"""
+Local stand-in for the Monobank API serving synthetic payloads, so the request path can be measured
+without the network and the API rate limits.
+"""
+import asyncio
+from typing import Optional
+
+from aiohttp import web
+
+from payloads import statement_payload, client_payload, currency_payload
+
+
+class StandInServer:
+    def __init__(self, statement_size: int = 500, latency: float = 0.0) -> None:
+        """
+        :param statement_size: int: Number of transactions in a statement response
+        :param latency: float: Seconds every response is delayed by
+        """
+        self.latency = latency
+        self.bodies = {
+            'statement': statement_payload(statement_size),
+            'client': client_payload(),
+            'currency': currency_payload(),
+        }
+        self.url: Optional[str] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    def _respond(self, name: str):
+        async def handler(request: web.Request) -> web.Response:
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return web.Response(body=self.bodies[name], content_type='application/json')
+        return handler
+
+    async def __aenter__(self) -> 'StandInServer':
+        app = web.Application()
+        app.router.add_get('/bank/currency', self._respond('currency'))
+        app.router.add_get('/personal/client-info', self._respond('client'))
+        app.router.add_get('/personal/statement/{account}/{from_time}/{to_time}', self._respond('statement'))
+        app.router.add_get('/personal/statement/{account}/{from_time}', self._respond('statement'))
+
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, '127.0.0.1', 0)
+        await site.start()
+
+        port = self._runner.addresses[0][1]
+        self.url = f'http://127.0.0.1:{port}'
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self._runner.cleanup()
@@ -0,0 +1,101 @@
+"""
+Webhook ingestion throughput of WebhookReceiver, in handled events per second.
+
+`http` posts events to a running receiver over loopback with 32 concurrent senders,
+`queue` puts raw bodies straight into the queue (parsing, deduplication and handler dispatch only).
+
+Usage: python benchmarks/webhook.py [--json] [--number N]
+"""
+import asyncio
+import random
+import time
+
+import aiohttp
+from aiohttp import web
+
+from _common import main
+from payloads import webhook_event
+
+from aiomonobank import WebhookReceiver, WebhookDeduplicator
+
+SENDERS = 32
+
+
+def _receiver(dedup: bool, expected: int) -> tuple[WebhookReceiver, asyncio.Event]:
+    receiver = WebhookReceiver(dedup=WebhookDeduplicator() if dedup else None)
+    done = asyncio.Event()
+    handled = 0
+
+    @receiver.handler
+    async def count(events) -> None:
+        nonlocal handled
+        handled += len(events)
+        if handled >= expected:
+            done.set()
+
+    return receiver, done
+
+
+async def _queue(bodies: list[bytes], dedup: bool) -> float:
+    receiver, done = _receiver(dedup, len(bodies))
+    await receiver.start()
+
+    started = time.perf_counter()
+    for body in bodies:
+        await receiver.put(body)
+    await done.wait()
+    elapsed = time.perf_counter() - started
+
+    await receiver.stop()
+    return elapsed
+
+
+async def _http(bodies: list[bytes], dedup: bool) -> float:
+    receiver, done = _receiver(dedup, len(bodies))
+    runner = web.AppRunner(receiver.app('/webhook'), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    url = f'http://127.0.0.1:{runner.addresses[0][1]}/webhook'
+
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=SENDERS)) as session:
+        pending = iter(bodies)
+
+        async def send() -> None:
+            for body in pending:
+                async with session.post(url, data=body) as response:
+                    await response.read()
+
+        started = time.perf_counter()
+        await asyncio.gather(*[send() for _ in range(SENDERS)])
+        await done.wait()
+        elapsed = time.perf_counter() - started
+
+    await runner.cleanup()
+    return elapsed
+
+
+async def _run(number: int) -> list[dict]:
+    rnd = random.Random(1)
+    bodies = [webhook_event(rnd, i) for i in range(number)]
+
+    results = []
+    for transport, measure in (('queue', _queue), ('http', _http)):
+        for dedup in (False, True):
+            elapsed = await measure(bodies, dedup)
+            results.append({
+                'benchmark': f'webhook.{transport}' + ('.dedup' if dedup else ''),
+                'variant': 'receiver',
+                'value': len(bodies) / elapsed,
+                'unit': 'events/s',
+            })
+
+    return results
+
+
+def run(number: int = 5000) -> list[dict]:
+    return asyncio.run(_run(number))
+
+
+if __name__ == '__main__':
+    main(__doc__, run, number=5000)
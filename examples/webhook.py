@@ -1,8 +1,7 @@
 import logging
-from http import HTTPStatus
 
 from aiohttp import web
-from aiomonobank import MonoPersonal, types
+from aiomonobank import MonoPersonal, WebhookReceiver, types
 
 WEBHOOK_HOST = "https://example.com"
 WEBAPP_HOST = "localhost"
@@ -13,48 +12,26 @@ logger = logging.getLogger(__name__)
 
 mono_client = MonoPersonal(MONOBANK_API_TOKEN)
 
-router = web.RouteTableDef()
+# Events are acknowledged at once and handled by 4 workers in batches of up to 100 events
+receiver = WebhookReceiver(workers=4, batch_size=100)
 
 
-@router.get("/{token}")
-async def check_webhook_url(request: web.Request) -> web.Response:
+@receiver.handler
+async def new_transactions(events: list[types.WebhookData]) -> None:
     """
-    The check_webhook_url function is used to check the webhook URL.
+    The new_transactions function is a webhook handler for the new transaction events.
+    It receives a batch of events after Monobank has already got its HTTP 200 response,
+    so slow processing here doesn't delay the acknowledgement.
 
-    :param request: web.Request: Get the request object
-    :return: A response with the status code 200
+    :param events: list[types.WebhookData]: Received events
+    :return: None
     """
-    token = request.match_info.get('token')
+    for webhook_data in events:
+        if webhook_data.type == "StatementItem":
+            logger.debug(f"The account ID of the new transaction: {webhook_data.data.account_id}. "
+                         f"Sum: {webhook_data.data.statement.amount} UAH")
 
-    if token == MONOBANK_API_TOKEN:
-        logger.debug(f"Successful check webhook URL path: {request.path}")
-
-        return web.json_response(status=HTTPStatus.OK)
-
-    return web.json_response(status=HTTPStatus.FORBIDDEN)
-
-
-@router.post("/{token}")
-async def new_transaction(request: web.Request) -> web.Response:
-    """
-    The new_transaction function is a webhook handler for the new transaction event.
-    It receives a request from the Monobank API and returns an HTTP response with status code 200.
-    The function also logs information about the new transaction.
-
-    :param request: web.Request: Receive the request data
-    :return: The status code 200
-    """
-    webhook_data = types.WebhookData(
-        **await request.json()
-    )
-
-    if webhook_data.type == "StatementItem":
-        logger.debug(f"The account ID of the new transaction: {webhook_data.data.account_id}. "
-                     f"Sum: {webhook_data.data.statement.amount} UAH")
-
-        print(webhook_data)
-
-    return web.json_response(status=HTTPStatus.OK)
+            print(webhook_data)
 
 
 async def on_startup(app: web.Application):
@@ -77,7 +54,8 @@ def main() -> None:
     try:
         app = web.Application()
 
-        app.add_routes(routes=router)
+        # The secret part of the URL protects from fake events
+        receiver.setup(app, path=f"/{MONOBANK_API_TOKEN}")
 
         app.on_startup.append(on_startup)
         app.on_shutdown.append(on_shutdown)
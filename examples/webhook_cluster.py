@@ -0,0 +1,44 @@
+import logging
+
+from aiomonobank import WebhookCluster, types
+
+WEBAPP_HOST = "0.0.0.0"
+WEBAPP_PORT = 8822
+WEBHOOK_SECRET = 'your_secret_path_here'  # TODO don't forget to replace with a random string
+
+logger = logging.getLogger(__name__)
+
+# 4 worker processes accept and parse the events on one port, the handlers run in this process
+cluster = WebhookCluster(host=WEBAPP_HOST, port=WEBAPP_PORT, path=f"/{WEBHOOK_SECRET}", processes=4)
+
+
+@cluster.handler
+async def new_transactions(events: list[types.WebhookData]) -> None:
+    """
+    The new_transactions function receives batches of new transaction events from all worker processes.
+
+    :param events: list[types.WebhookData]: Received events
+    :return: None
+    """
+    for webhook_data in events:
+        if webhook_data.type == "StatementItem":
+            logger.debug(f"The account ID of the new transaction: {webhook_data.data.account_id}. "
+                         f"Sum: {webhook_data.data.statement.amount} UAH")
+
+            print(webhook_data)
+
+
+def main() -> None:
+    """
+    The main function starts the workers and serves until SIGINT or SIGTERM,
+    then stops them gracefully: queued events are still handled.
+
+    :return: None
+    """
+    logging.basicConfig(level=logging.INFO)
+    cluster.run()
+
+
+# Workers are spawned processes, so the cluster must only be started by the main module
+if __name__ == '__main__':
+    main()
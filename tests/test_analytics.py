@@ -0,0 +1,59 @@
+import time
+from collections import defaultdict
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from aiomonobank.analytics import StatementAggregator, aggregate
+from aiomonobank.simulator import MonobankSimulator
+from aiomonobank.types import Statement
+
+KYIV = ZoneInfo('Europe/Kyiv')
+
+
+def _item(id_: str, at: int, amount: int, hold: bool = False, mcc: int = 5411) -> dict:
+    return {"id": id_, "time": at, "description": "", "mcc": mcc, "originalMcc": mcc, "hold": hold,
+            "amount": amount, "operationAmount": amount, "currencyCode": 980, "commissionRate": 0,
+            "cashbackAmount": 0, "balance": 0}
+
+
+def _reference(items: list[dict], direction: str = None) -> list[dict]:
+    groups = defaultdict(list)
+    for item in items:
+        if direction == 'debit' and item['amount'] >= 0:
+            continue
+        local = datetime.fromtimestamp(item['time'], KYIV)
+        groups[local.date().replace(day=1), item['mcc']].append(item['amount'])
+
+    return [
+        {'month': month, 'mcc': mcc, 'count': len(values), 'sum': sum(values), 'min': min(values), 'max': max(values)}
+        for (month, mcc), values in sorted(groups.items())
+    ]
+
+
+def test_aggregate_matches_local_time_grouping():
+    now = int(time.time())
+    items = MonobankSimulator(seed=1).statement('token', '0', now - 90 * 86400, now)
+    # Around the end of daylight saving time and the midnight of a month boundary in Kyiv
+    items += [
+        _item('dst', int(datetime(2023, 10, 29, 3, 30, tzinfo=KYIV).timestamp()), -100),
+        _item('month-end', int(datetime(2023, 10, 31, 23, 59, tzinfo=KYIV).timestamp()), -200),
+        _item('month-start', int(datetime(2023, 11, 1, 0, 1, tzinfo=KYIV).timestamp()), -300),
+    ]
+
+    assert aggregate(items) == _reference(items)
+    assert aggregate(items, direction='debit') == _reference(items, direction='debit')
+    assert aggregate([Statement(**item) for item in items]) == _reference(items)
+
+
+def test_overlapping_pages_and_settled_holds():
+    at = int(datetime(2024, 5, 10, 12, tzinfo=KYIV).timestamp())
+    aggregator = StatementAggregator(by=('day',))
+
+    assert aggregator.add([_item('a', at, -100), _item('b', at, -50, hold=True)]) == 2
+    # The same page again, then the hold settles with another amount
+    assert aggregator.add([_item('a', at, -100), _item('b', at, -50, hold=True)]) == 0
+    assert aggregator.add([_item('b', at, -70)]) == 1
+    assert aggregator.add([_item('b', at, -70)]) == 0
+
+    [row] = aggregator.rows()
+    assert (row['day'], row['count'], row['sum']) == (datetime(2024, 5, 10).date(), 2, -170)
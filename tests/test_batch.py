@@ -0,0 +1,74 @@
+import asyncio
+import time
+from datetime import datetime
+
+import numpy as np
+
+from aiomonobank import MonoPersonal
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.batch import StatementBatch
+from aiomonobank.simulator import MonobankSimulator
+
+
+def _item(id_: str, description):
+    item = {"id": id_, "time": 0, "mcc": 5411, "originalMcc": 5411, "hold": False, "amount": -100,
+            "operationAmount": -100, "currencyCode": 980, "commissionRate": 0, "cashbackAmount": 0, "balance": 0}
+    if description is not None:
+        item['description'] = description
+    return item
+
+
+def _statement(transactions_per_day: int, days: int):
+    to_time = int(time.time())
+    from_time = to_time - days * 86400
+
+    async def main():
+        async with MonobankSimulator(seed=1, limits={}, transactions_per_day=transactions_per_day) as simulator:
+            async with MonoPersonal('token', server=MonobankAPIServer.from_base(simulator.url)) as client:
+                batch = await client.get_statement_batch(
+                    '0', datetime.utcfromtimestamp(from_time), datetime.utcfromtimestamp(to_time)
+                )
+                statements = await client.get_statement(
+                    '0', datetime.utcfromtimestamp(to_time - 86400), datetime.utcfromtimestamp(to_time)
+                )
+                return batch, simulator.statement('token', '0', from_time, to_time), statements
+
+    return asyncio.run(main())
+
+
+def test_batch_of_several_pages_matches_the_statement():
+    batch, expected, _ = _statement(transactions_per_day=100, days=10)
+
+    assert len(expected) > 500
+    assert [batch.item(index) for index in range(len(batch))] == expected
+    assert batch.sum() == sum(item['amount'] for item in expected)
+
+    spent = batch.amount < 0
+    assert batch.sum(mask=spent) == sum(item['amount'] for item in expected if item['amount'] < 0)
+
+    description = expected[0]['description']
+    selected = batch.filter(batch.description == description)
+    assert list(selected.id) == [item['id'] for item in expected if item['description'] == description]
+
+
+def test_batch_from_statements_round_trips_sums():
+    _, _, statements = _statement(transactions_per_day=20, days=1)
+
+    batch = StatementBatch.from_statements(statements)
+
+    assert list(batch.id) == [statement.id for statement in statements]
+    assert [statement.amount for statement in batch] == [statement.amount for statement in statements]
+    assert batch.amount.dtype == np.int64
+
+
+def test_concat_merges_dictionaries():
+    first = StatementBatch.from_items([_item('a', 'Coffee'), _item('b', 'Taxi')])
+    second = StatementBatch.from_items([_item('c', 'Taxi'), _item('d', None)])
+
+    batch = StatementBatch.concat([first, second])
+
+    assert batch.description.categories == ['Coffee', 'Taxi']
+    assert list(batch.description.to_numpy()) == ['Coffee', 'Taxi', 'Taxi', None]
+    assert list(batch[batch.description == 'Taxi'].id) == ['b', 'c']
+    assert len(StatementBatch.concat([])) == 0
+
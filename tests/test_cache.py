@@ -0,0 +1,126 @@
+import asyncio
+import json
+import logging
+import time
+
+import pytest
+
+from aiomonobank.cache import ResponseCache
+from aiomonobank.utils import exceptions
+
+
+class _Backend:
+    def __init__(self) -> None:
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl):
+        self.values[key] = value
+
+
+class _Upstream:
+    def __init__(self) -> None:
+        self.calls = 0
+        self.error = None
+
+    async def fetch(self) -> bytes:
+        self.calls += 1
+        await asyncio.sleep(0)
+        if self.error is not None:
+            raise self.error
+        return json.dumps({'version': self.calls}).encode()
+
+
+def test_stale_value_is_served_while_one_request_refreshes_it():
+    async def main():
+        cache, upstream = ResponseCache(ttl=0.05, stale_ttl=10), _Upstream()
+
+        first = await cache.get('key', upstream.fetch, json.loads)
+        concurrent = await asyncio.gather(*(cache.get('key', upstream.fetch, json.loads) for _ in range(10)))
+        await asyncio.sleep(0.06)
+
+        stale = await asyncio.gather(*(cache.get('key', upstream.fetch, json.loads) for _ in range(10)))
+        await asyncio.sleep(0.01)
+        refreshed = await cache.get('key', upstream.fetch, json.loads)
+
+        return first, concurrent, stale, refreshed, upstream.calls
+
+    first, concurrent, stale, refreshed, calls = asyncio.run(main())
+
+    assert first == {'version': 1}
+    assert all(value == first for value in concurrent + stale)
+    assert refreshed == {'version': 2}
+    assert calls == 2
+
+
+def test_failed_refresh_backs_off():
+    async def main():
+        cache, upstream = ResponseCache(ttl=0.01, stale_ttl=10, failure_backoff=10), _Upstream()
+        await cache.get('key', upstream.fetch, json.loads)
+        await asyncio.sleep(0.02)
+
+        upstream.error = exceptions.ServerError('Internal Server Error [500]')
+        values = []
+        for _ in range(50):
+            values.append(await cache.get('key', upstream.fetch, json.loads))
+            await asyncio.sleep(0)
+
+        return values, upstream.calls
+
+    values, calls = asyncio.run(main())
+
+    assert all(value == {'version': 1} for value in values)
+    assert calls == 2
+
+
+def test_cold_miss_failure_is_not_logged_as_stale(caplog):
+    async def main():
+        upstream = _Upstream()
+        upstream.error = exceptions.NetworkError('Request to /bank/currency timed out')
+        with pytest.raises(exceptions.NetworkError):
+            await ResponseCache().get('key', upstream.fetch, json.loads)
+
+    with caplog.at_level(logging.DEBUG, logger='aiomonobank'):
+        asyncio.run(main())
+
+    assert 'stale' not in caplog.text
+
+
+def test_backend_value_is_fresh_only_for_the_rest_of_its_ttl():
+    async def main():
+        backend, upstream = _Backend(), _Upstream()
+        cache = ResponseCache(ttl=1, backend=backend)
+
+        # Another process fetched the body 0.9 seconds ago
+        backend.values['key'] = b'%.3f\n' % (time.time() - 0.9) + b'{"version": 0}'
+        from_backend = await cache.get('key', upstream.fetch, json.loads)
+        calls_before = upstream.calls
+
+        await asyncio.sleep(0.15)
+        await cache.get('key', upstream.fetch, json.loads)
+        await asyncio.sleep(0.01)
+
+        return from_backend, calls_before, upstream.calls, await cache.get('key', upstream.fetch, json.loads)
+
+    from_backend, calls_before, calls, refreshed = asyncio.run(main())
+
+    assert from_backend == {'version': 0}
+    assert calls_before == 0
+    assert calls == 1
+    assert refreshed == {'version': 1}
+
+
+def test_backend_values_are_shared():
+    async def main():
+        backend, upstream = _Backend(), _Upstream()
+        await ResponseCache(backend=backend).get('key', upstream.fetch, json.loads)
+        value = await ResponseCache(backend=backend).get('key', upstream.fetch, json.loads)
+        return value, upstream.calls, backend.values['key']
+
+    value, calls, stored = asyncio.run(main())
+
+    assert value == {'version': 1}
+    assert calls == 1
+    assert stored.endswith(b'{"version": 1}')
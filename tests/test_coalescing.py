@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+
+from aiomonobank import MonoPersonal, RateScheduler
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.simulator import MonobankSimulator
+from aiomonobank.utils import exceptions
+
+CLIENT_INFO = "/personal/client-info"
+
+
+def _run(test, scheduler=None):
+    async def main():
+        async with MonobankSimulator(seed=1, limits={}) as simulator:
+            server = MonobankAPIServer.from_base(simulator.url)
+            async with MonoPersonal('token', server=server, scheduler=scheduler) as client:
+                return await test(simulator, client)
+
+    return asyncio.run(main())
+
+
+def test_identical_requests_are_coalesced():
+    async def test(simulator, client):
+        first, second = await asyncio.gather(client.get_client_info(), client.get_client_info())
+        return first, second, simulator.requests[CLIENT_INFO]
+
+    first, second, requests = _run(test)
+
+    assert first == second
+    assert requests == 1
+
+
+def test_abandoned_request_is_cancelled():
+    async def test(simulator, client):
+        await client.get_client_info()
+
+        # Waits for the next slot of the scheduler, then its only caller gives up
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.get_client_info(), 0.1)
+
+        await asyncio.sleep(0.6)
+        return simulator.requests[CLIENT_INFO]
+
+    assert _run(test, RateScheduler({CLIENT_INFO: 0.5})) == 1
+
+
+def test_joiner_keeps_its_own_deadline():
+    async def test(simulator, client):
+        await client.get_client_info()
+
+        waiting = asyncio.create_task(client.get_client_info())
+        await asyncio.sleep(0)
+
+        started = time.monotonic()
+        with pytest.raises(exceptions.RetryAfter):
+            await client.get_client_info(max_wait=0.1)
+        elapsed = time.monotonic() - started
+
+        await waiting
+        return elapsed
+
+    assert _run(test, RateScheduler({CLIENT_INFO: 0.5})) < 0.3
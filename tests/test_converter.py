@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from aiomonobank.converter import CurrencyConverter, UAH
+from aiomonobank.utils import exceptions
+
+USD, EUR, PLN = 840, 978, 985
+
+CURRENCIES = [
+    {'currencyCodeA': USD, 'currencyCodeB': UAH, 'date': 0, 'rateBuy': 40.0, 'rateSell': 41.0},
+    {'currencyCodeA': EUR, 'currencyCodeB': UAH, 'date': 0, 'rateBuy': 44.0, 'rateSell': 45.0},
+    {'currencyCodeA': PLN, 'currencyCodeB': UAH, 'date': 0, 'rateCross': 10.0},
+]
+
+
+def test_rates():
+    converter = CurrencyConverter(CURRENCIES)
+
+    assert converter.rate(USD, UAH) == 40.0
+    assert converter.rate(UAH, USD) == pytest.approx(1 / 41.0)
+    assert converter.rate(UAH, PLN) == pytest.approx(1 / 10.0)
+    assert converter.rate(USD, EUR) == pytest.approx(40.0 / 45.0)
+    assert converter.rate(USD, USD) == 1.0
+
+    with pytest.raises(exceptions.UnknownCurrencyPair):
+        converter.rate(USD, 826)
+
+
+def test_convert_matches_per_amount_rates():
+    converter = CurrencyConverter(CURRENCIES)
+    amounts, codes = [1.0, 2.0, 3.0, 4.0], [USD, EUR, USD, PLN]
+
+    expected = [amount * converter.rate(code, UAH) for amount, code in zip(amounts, codes)]
+
+    assert converter.convert(amounts, codes) == pytest.approx(expected)
+    assert converter.convert(np.array(amounts), np.array(codes)) == pytest.approx(expected)
+    assert converter.convert(amounts, USD) == pytest.approx([amount * 40.0 for amount in amounts])
+    assert converter.convert(5.0, USD) == 200.0
+
+
+def test_convert_numpy_scalars():
+    converter = CurrencyConverter(CURRENCIES)
+    codes = np.array([USD, EUR])
+
+    assert converter.convert(np.float64(5.0), codes[0]) == 200.0
+    assert converter.convert(np.array([1.0, 2.0]), codes[1]) == pytest.approx([44.0, 88.0])
+    assert converter.convert([1.0, 2.0], np.int32(USD)) == pytest.approx([40.0, 80.0])
@@ -0,0 +1,96 @@
+import asyncio
+import csv
+import json
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from aiomonobank import MonoPersonal
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.export import COLUMNS, StatementExport, export_statement
+from aiomonobank.simulator import MonobankSimulator
+
+PERIOD = timedelta(days=5)
+
+
+def _export(path, runs: int = 2):
+    async def main():
+        async with MonobankSimulator(seed=1, limits={}) as simulator:
+            async with MonoPersonal('token', server=MonobankAPIServer.from_base(simulator.url)) as client:
+                started = int(time.time())
+                exported = []
+                for run in range(runs):
+                    if run:
+                        await simulator.emit('token')
+                    exported.append(await export_statement(client, path, from_datetime=datetime.utcnow() - PERIOD))
+
+                expected = simulator.statement('token', '0', started - int(PERIOD.total_seconds()) + 10,
+                                               int(time.time()))
+                return exported, {item['id'] for item in expected}
+
+    return asyncio.run(main())
+
+
+def _read(path) -> list[dict]:
+    if path.suffix == '.csv':
+        with open(path, newline='', encoding='utf-8') as file:
+            rows = list(csv.DictReader(file))
+    elif path.suffix == '.jsonl':
+        rows = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    else:
+        import pyarrow.parquet as pq
+        rows = pq.read_table(path).to_pylist()
+
+    return rows
+
+
+@pytest.mark.parametrize('name', ['statement.csv', 'statement.jsonl', 'statement.parquet'])
+def test_runs_append_only_new_transactions(tmp_path, name):
+    path = tmp_path / name
+    exported, expected = _export(path, runs=3)
+
+    rows = _read(path)
+    ids = [row['id'] for row in rows]
+
+    assert len(ids) == len(set(ids)) == sum(exported)
+    # Each run after the first exports the transaction emitted after the previous one
+    assert exported[1:] == [1, 1]
+    assert expected <= set(ids)
+    assert list(rows[0]) == list(COLUMNS)
+
+
+def test_failed_run_leaves_the_last_complete_export(tmp_path):
+    path = tmp_path / 'statement.csv'
+
+    def item(index: int) -> dict:
+        return {"id": str(index), "time": 1_700_000_000 + index, "description": "", "mcc": 5411,
+                "originalMcc": 5411, "hold": False, "amount": -100, "operationAmount": -100, "currencyCode": 980,
+                "commissionRate": 0, "cashbackAmount": 0, "balance": 0}
+
+    async def failing():
+        for index in range(10, 20):
+            yield item(index)
+        raise ConnectionError
+
+    async def main():
+        export = StatementExport(path, chunk_size=3)
+        assert await export.write([item(index) for index in range(10)]) == 10
+        complete = path.read_bytes()
+
+        with pytest.raises(ConnectionError):
+            await export.write(failing())
+        assert path.read_bytes() == complete
+
+        # A process killed during a run leaves its rows behind, the next run truncates them
+        with open(path, 'ab') as file:
+            file.write(b'20,1700000020,partial')
+        assert await export.write([item(index) for index in range(5, 15)]) == 5
+        await export.close()
+
+        return complete
+
+    complete = asyncio.run(main())
+
+    assert path.read_bytes().startswith(complete)
+    assert [row['id'] for row in _read(path)] == [str(index) for index in range(15)]
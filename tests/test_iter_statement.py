@@ -0,0 +1,60 @@
+import asyncio
+import time
+from datetime import datetime
+
+from aiomonobank import MonoPersonal
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.simulator import MonobankSimulator
+
+
+def _run(test, **simulator_options):
+    async def main():
+        async with MonobankSimulator(seed=1, limits={}, **simulator_options) as simulator:
+            server = MonobankAPIServer.from_base(simulator.url)
+            async with MonoPersonal('token', server=server) as client:
+                return await test(simulator, client)
+
+    return asyncio.run(main())
+
+
+def test_long_period_is_paginated_without_gaps_or_duplicates():
+    to_time = int(time.time())
+    from_time = to_time - 70 * 86400
+
+    async def test(simulator, client):
+        statements = [
+            statement async for statement in client.iter_statement(
+                '0', datetime.utcfromtimestamp(from_time), datetime.utcfromtimestamp(to_time)
+            )
+        ]
+        return statements, simulator.statement('token', '0', from_time, to_time), simulator.requests
+
+    statements, expected, requests = _run(test, transactions_per_day=30)
+
+    ids = [statement.id for statement in statements]
+    assert len(ids) == len(set(ids))
+    assert ids == [item['id'] for item in expected]
+    # Three windows of at most 31 days, two of them over the 500 items of one answer
+    assert requests['/personal/statement'] > 3
+
+
+def test_page_of_one_second_moves_past_it():
+    async def test(simulator, client):
+        to_time = int(time.time())
+        # 600 transactions in one second: the page can't be continued by its last time
+        item = simulator.statement('token', '0', to_time - 7 * 86400, to_time)[0]
+        account_id = simulator.client_info('token')['accounts'][0]['id']
+        simulator._emitted[account_id] = [dict(item, id=f'same-second-{index}', time=to_time - 10)
+                                          for index in range(600)]
+
+        return [
+            statement.id async for statement in client.iter_statement(
+                '0', datetime.utcfromtimestamp(to_time - 86400), datetime.utcfromtimestamp(to_time - 10)
+            )
+        ]
+
+    ids = _run(test)
+
+    assert len(ids) == len(set(ids))
+    # The API can't return more than 500 items of one second
+    assert len([id_ for id_ in ids if id_.startswith('same-second-')]) == 500
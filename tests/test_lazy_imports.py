@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _run(code: str) -> subprocess.CompletedProcess:
+    # A fresh interpreter, so nothing is imported yet
+    return subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True)
+
+
+def test_submodules_resolve_after_bare_import():
+    result = _run(
+        "import aiomonobank\n"
+        "print(aiomonobank.types.Statement.__name__, aiomonobank.utils.exceptions.__name__,"
+        " aiomonobank.api.check_result.__name__)"
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ['Statement', 'aiomonobank.utils.exceptions', 'check_result']
+
+
+def test_public_names_are_lazy():
+    result = _run(
+        "import sys, aiomonobank\n"
+        "assert 'aiomonobank.monobank' not in sys.modules\n"
+        "print(aiomonobank.MonoPersonal.__name__)"
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'MonoPersonal'
+
+
+def test_unknown_name_raises_attribute_error():
+    result = _run(
+        "import aiomonobank\n"
+        "try:\n"
+        "    aiomonobank.no_such_name\n"
+        "except AttributeError:\n"
+        "    print('ok')"
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == 'ok'
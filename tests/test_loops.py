@@ -0,0 +1,46 @@
+import asyncio
+import gc
+import logging
+
+from aiomonobank import MonoPersonal
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.simulator import MonobankSimulator
+
+
+def test_every_loop_gets_its_own_session(caplog):
+    client = MonoPersonal('token', server=MonobankAPIServer.from_base('http://127.0.0.1:1'))
+
+    async def session():
+        return await client.get_session()
+
+    first = asyncio.run(session())
+    # The session of the first, closed loop is dropped when the second loop creates its own
+    second = asyncio.run(session())
+
+    assert first is not second
+    assert first.closed
+    assert len(client._sessions.items()) == 1
+
+    async def close():
+        await client.close()
+
+    asyncio.run(close())
+    assert second.closed
+
+    with caplog.at_level(logging.ERROR, logger='asyncio'):
+        del first, second
+        gc.collect()
+    assert 'Unclosed' not in caplog.text
+
+
+def test_session_is_reused_and_closed_with_the_client():
+    async def main():
+        async with MonobankSimulator(seed=1, limits={}) as simulator:
+            server = MonobankAPIServer.from_base(simulator.url)
+            async with MonoPersonal('token', server=server) as client:
+                session = await client.get_session()
+                await client.get_client_info()
+                reused = session is await client.get_session()
+            return reused, session.closed
+
+    assert asyncio.run(main()) == (True, True)
@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from aiomonobank import MonoPersonal
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.offload import DecodeExecutor, _portable
+from aiomonobank.simulator import MonobankSimulator
+from aiomonobank.utils import exceptions
+
+CLIENT_INFO = "/personal/client-info"
+
+
+class _Unpicklable(ValueError):
+    def __reduce__(self):
+        raise TypeError("can't pickle")
+
+
+def _run(test):
+    executor = DecodeExecutor(max_workers=1)
+
+    async def main():
+        async with MonobankSimulator(seed=1, limits={}) as simulator:
+            server = MonobankAPIServer.from_base(simulator.url)
+            async with MonoPersonal('token', server=server, executor=executor) as client:
+                return await test(client)
+
+    try:
+        return asyncio.run(main())
+    finally:
+        executor.shutdown()
+
+
+def test_responses_are_decoded_in_worker_processes():
+    async def test(client):
+        return await asyncio.gather(client.get_client_info(), client.request('GET', CLIENT_INFO, decode=bytes))
+
+    client_info, body = _run(test)
+
+    assert client_info.id
+    assert client_info.id.encode() in body
+
+
+def test_rejected_bodies_raise_network_error():
+    async def test(client):
+        # int() rejects a JSON body with ValueError in the worker process
+        with pytest.raises(exceptions.NetworkError) as info:
+            await client.request('GET', CLIENT_INFO, decode=int)
+        return info.value
+
+    error = _run(test)
+
+    assert isinstance(error.__cause__, ValueError)
+
+
+def test_unpicklable_errors_keep_their_kind():
+    error = _portable(_Unpicklable('invalid statement'))
+
+    assert type(error) is ValueError
+    assert '_Unpicklable: invalid statement' in str(error)
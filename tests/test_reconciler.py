@@ -0,0 +1,82 @@
+import asyncio
+import time
+from datetime import datetime
+
+from aiomonobank import MonoPersonal
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.reconciler import WebhookReconciler
+from aiomonobank.simulator import MonobankSimulator
+from aiomonobank.webhook import WebhookReceiver
+
+
+def _run(test, **simulator_options):
+    async def main():
+        async with MonobankSimulator(seed=1, limits={}, **simulator_options) as simulator:
+            server = MonobankAPIServer.from_base(simulator.url)
+            async with MonoPersonal('token', server=server) as client:
+                account_id = simulator.client_info('token')['accounts'][0]['id']
+                return await test(simulator, client, account_id)
+
+    return asyncio.run(main())
+
+
+def test_backfill_after_restart():
+    async def test(simulator, client, account_id):
+        receiver = WebhookReceiver()
+        last_seen = datetime.utcfromtimestamp(time.time() - 3 * 86400)
+        reconciler = WebhookReconciler(client, receiver, last_seen={account_id: last_seen})
+
+        fetched = await reconciler.backfill(account_id)
+        expected = simulator.statement('token', account_id, int(time.time()) - 3 * 86400 - 60, int(time.time()))
+        return fetched, receiver.queue.qsize(), len(expected)
+
+    fetched, queued, expected = _run(test)
+
+    assert fetched == queued == expected > 0
+
+
+def test_failing_backfill_does_not_stop_reconciliation():
+    class FailingReconciler(WebhookReconciler):
+        calls = 0
+
+        async def backfill(self, account_id, from_time=None):
+            self.calls += 1
+            raise ValueError('invalid statement item')
+
+    async def test(simulator, client, account_id):
+        reconciler = FailingReconciler(client, WebhookReceiver(), check_interval=0.01,
+                                       last_seen={account_id: datetime.utcnow()})
+        await reconciler.start()
+        await asyncio.sleep(0.05)
+
+        alive = not reconciler._task.done()
+        await reconciler.stop()
+        return alive, reconciler.calls
+
+    alive, calls = _run(test)
+
+    assert alive
+    assert calls == 1
+
+
+def test_idle_account_is_checked_less_often():
+    async def test(simulator, client, account_id):
+        reconciler = WebhookReconciler(client, WebhookReceiver(), min_silence=10, min_events=0,
+                                       last_seen={account_id: datetime.utcfromtimestamp(time.time() - 86400)})
+        state = reconciler._states[account_id]
+        state.interval = 1
+
+        silences = []
+        for _ in range(3):
+            await reconciler.backfill(account_id)
+            silences.append(reconciler._silence(state))
+
+        from_time = max(state.last_time, state.reconciled_to) - reconciler.overlap
+        return silences, from_time, simulator.requests['/personal/statement']
+
+    silences, from_time, requests = _run(test, transactions_per_day=0)
+
+    assert silences == [20, 40, 80]
+    # The next backfill starts from the end of the last one, not from the last transaction
+    assert from_time > time.time() - 120
+    assert requests == 3
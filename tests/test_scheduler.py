@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+from aiomonobank import MonoPersonal, RateScheduler
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.simulator import MonobankSimulator
+from aiomonobank.utils import exceptions
+
+CLIENT_INFO = "/personal/client-info"
+
+
+class _FastScheduler(RateScheduler):
+    """Waits 10 ms instead of the Retry-After delay of a 429 answer"""
+
+    def defer(self, token: str, path: str, delay: float) -> None:
+        super().defer(token, path, 0.01)
+
+
+def _run(test, scheduler):
+    async def main():
+        async with MonobankSimulator(seed=1, limits={}) as simulator:
+            server = MonobankAPIServer.from_base(simulator.url)
+            async with MonoPersonal('token', server=server, scheduler=scheduler) as client:
+                return await test(simulator, client)
+
+    return asyncio.run(main())
+
+
+def test_requests_are_spaced_by_the_interval():
+    async def test(simulator, client):
+        started = time.monotonic()
+        await asyncio.gather(client.get_client_info(), client.get_client_info(priority=1),
+                             client.get_statement(), client.get_statement(priority=1))
+        return time.monotonic() - started, simulator.requests
+
+    elapsed, requests = _run(test, RateScheduler({CLIENT_INFO: 0.2, "/personal/statement": 0.2}))
+
+    assert requests[CLIENT_INFO] == 2
+    assert requests["/personal/statement"] == 2
+    assert 0.2 <= elapsed < 1
+
+
+def test_max_wait_raises_retry_after():
+    async def test(simulator, client):
+        await client.get_client_info()
+        with pytest.raises(exceptions.RetryAfter):
+            await client.get_client_info(max_wait=0.1)
+        return simulator.requests[CLIENT_INFO]
+
+    assert _run(test, RateScheduler({CLIENT_INFO: 60})) == 1
+
+
+def test_repeated_429_answers_are_deferred_a_limited_number_of_times():
+    async def test(simulator, client):
+        simulator.fail(429, count=100, endpoint=CLIENT_INFO)
+        with pytest.raises(exceptions.RetryAfter):
+            await client.get_client_info()
+        return simulator.requests[CLIENT_INFO]
+
+    # The first answer and three deferrals
+    assert _run(test, _FastScheduler({CLIENT_INFO: 0}, max_deferrals=3)) == 4
+
+
+def test_idle_slots_are_forgotten():
+    async def main():
+        scheduler = RateScheduler({CLIENT_INFO: 0})
+        for index in range(5000):
+            await scheduler.acquire(f'token-{index}', CLIENT_INFO)
+        return len(scheduler._slots)
+
+    assert asyncio.run(main()) <= 2048
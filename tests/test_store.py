@@ -0,0 +1,69 @@
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+
+from aiomonobank import MonoPersonal, StatementStore
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.simulator import MonobankSimulator
+from aiomonobank.utils import exceptions
+
+PERIOD = timedelta(days=10)
+
+
+def _item(id_: str, at: int, hold: bool) -> dict:
+    return {"id": id_, "time": at, "description": "", "mcc": 5411, "originalMcc": 5411, "hold": hold,
+            "amount": -100, "operationAmount": -100, "currencyCode": 980, "commissionRate": 0,
+            "cashbackAmount": 0, "balance": 0}
+
+
+def test_interrupted_sync_leaves_no_gap():
+    async def main():
+        async with MonobankSimulator(seed=1, transactions_per_day=100) as simulator:
+            async with MonoPersonal('token', server=MonobankAPIServer.from_base(simulator.url)) as client:
+                store = StatementStore(client, initial_period=PERIOD)
+                started = int(time.time())
+
+                # The second page of the first sync is over the rate limit
+                with pytest.raises(exceptions.RetryAfter):
+                    await store.sync()
+                assert await store.synced_to() is None
+
+                simulator.limits = {}
+                await store.sync()
+
+                stored = {statement.id for statement in await store.get_statement()}
+                expected = simulator.statement('token', '0', started - int(PERIOD.total_seconds()) + 10, started)
+                await store.close()
+
+                return stored, {item['id'] for item in expected}
+
+    stored, expected = asyncio.run(main())
+
+    assert len(expected) > 500
+    assert expected <= stored
+
+
+def test_sync_deletes_cancelled_holds():
+    async def main():
+        async with MonobankSimulator(seed=1, limits={}) as simulator:
+            async with MonoPersonal('token', server=MonobankAPIServer.from_base(simulator.url)) as client:
+                store = StatementStore(client, initial_period=PERIOD)
+                await store.sync()
+
+                now = int(time.time())
+                # A hold within the overlap that the API doesn't return anymore, and one before it
+                await store._run(store._save, '0', [_item('cancelled', now - 60, True),
+                                                    _item('old', now - 3 * 86400, True)])
+                await store.sync()
+
+                stored = {statement.id for statement in await store.get_statement()}
+                await store.close()
+
+                return stored
+
+    stored = asyncio.run(main())
+
+    assert 'cancelled' not in stored
+    assert 'old' in stored
@@ -0,0 +1,51 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from aiomonobank import MonoPersonal
+from aiomonobank.api import MonobankAPIServer
+from aiomonobank.metrics import PrometheusObserver
+from aiomonobank.simulator import MonobankSimulator
+from aiomonobank.utils import exceptions
+
+
+def _run(test, **kwargs):
+    async def main():
+        async with MonobankSimulator(seed=1, limits={}) as simulator:
+            server = MonobankAPIServer.from_base(simulator.url)
+            async with MonoPersonal('token', server=server, **kwargs) as client:
+                return await test(client)
+
+    return asyncio.run(main())
+
+
+def test_stream_matches_buffered_statement():
+    async def test(client):
+        to_datetime = datetime.utcnow()
+        from_datetime = to_datetime - timedelta(days=7)
+
+        streamed = [statement async for statement in client.stream_statement('0', from_datetime, to_datetime)]
+        buffered = await client.get_statement('0', from_datetime, to_datetime)
+        return streamed, buffered
+
+    streamed, buffered = _run(test)
+
+    assert streamed
+    assert streamed == buffered
+
+
+@pytest.mark.parametrize('observer', [None, PrometheusObserver()])
+def test_rejected_items_raise_network_error(observer):
+    async def test(client):
+        path = f"/personal/statement/0/{int(time.time()) - 7 * 86400}"
+        # int() rejects a dict with TypeError
+        with pytest.raises(exceptions.NetworkError) as info:
+            async for _ in client.stream('GET', path, decode_item=int):
+                pass
+        return info.value
+
+    error = _run(test, observer=observer)
+
+    assert isinstance(error.__cause__, TypeError)
@@ -0,0 +1,87 @@
+import asyncio
+import json
+import sqlite3
+import time
+
+from aiomonobank.dedup import WebhookDeduplicator
+from aiomonobank.simulator import MonobankSimulator
+from aiomonobank.types import WebhookData
+from aiomonobank.webhook import WebhookReceiver
+
+
+def _bodies(count: int) -> list[bytes]:
+    now = int(time.time())
+    items = MonobankSimulator(seed=1, transactions_per_day=50).statement('token', '0', now - 7 * 86400, now)
+    assert len(items) >= count
+
+    return [
+        json.dumps({"type": "StatementItem", "data": {"account": "account", "statementItem": item}}).encode()
+        for item in items[:count]
+    ]
+
+
+def _receive(receiver: WebhookReceiver, bodies: list[bytes]) -> list[WebhookData]:
+    received = []
+
+    @receiver.handler
+    async def save(events: list[WebhookData]) -> None:
+        received.extend(events)
+
+    async def main():
+        await receiver.start()
+        for body in bodies:
+            await receiver.put(body)
+        await receiver.stop()
+
+    asyncio.run(main())
+    return received
+
+
+class _FailingReceiver(WebhookReceiver):
+    def __init__(self, failures: int, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    async def parse(self, body):
+        if self.failures:
+            self.failures -= 1
+            raise OSError('parse failed')
+        return await super().parse(body)
+
+
+def test_events_are_handled_in_batches():
+    bodies = _bodies(10)
+    received = _receive(WebhookReceiver(workers=2, batch_size=4), bodies)
+
+    assert sorted(event.data.statement.id for event in received) == \
+        sorted(json.loads(body)['data']['statementItem']['id'] for body in bodies)
+
+
+def test_workers_survive_failing_events():
+    bodies = _bodies(10)
+    # Every worker fails on its first event
+    received = _receive(_FailingReceiver(failures=2, workers=2, batch_size=1), bodies)
+
+    assert len(received) == 8
+
+
+class _FailingBackend:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def add(self, key: int, ttl: float) -> bool:
+        self.calls += 1
+        raise sqlite3.OperationalError('database is locked')
+
+
+def test_failing_dedup_backend_falls_back_to_memory():
+    bodies = _bodies(5)
+    backend = _FailingBackend()
+    receiver = WebhookReceiver(workers=1, dedup=WebhookDeduplicator(backend=backend))
+
+    # Every event is delivered twice
+    received = _receive(receiver, bodies + bodies)
+
+    assert backend.calls == 5
+    assert sorted(event.data.statement.id for event in received) == \
+        sorted(json.loads(body)['data']['statementItem']['id'] for body in bodies)